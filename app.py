@@ -5,13 +5,24 @@ Author: WERBEAUTY Development Team
 Version: 1.0.0
 """
 
+import contextlib
+
 import streamlit as st
 from config.theme import apply_custom_theme, initialize_session_state
-from components.navbar import render_navbar
-from components.footer import render_footer
-from components.ai_assistant_toggle import render_ai_assistant
-from components.onboarding_gender_selector import render_onboarding
-from router import route_to_page
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.auth_manager import reset_user_memo
+from utils.profiling import PROFILE_ALLOW_QUERY, PROFILE_ENABLED, ProfileCapture
+from utils.tracing import TRACE_LOG, TRACE_PANEL, finish_trace, start_trace
+
+# Components and the router are imported where they are first needed, so a
+# cold process only loads what its first page renders
+# (python -m benchmarks.import_audit reports what each page imports)
+
+
+def _session_id() -> str:
+    """Get the Streamlit session ID of the current run, if any."""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else ""
 
 
 def main():
@@ -30,14 +41,50 @@ def main():
     # Initialize session state
     initialize_session_state()
     
+    # Parse the user store at most once during this run
+    reset_user_memo()
+    
+    # Time this rerun when tracing is on
+    page = st.session_state.get("current_page", "home")
+    show_trace_panel = TRACE_PANEL or (PROFILE_ALLOW_QUERY and st.query_params.get("trace") == "1")
+    if show_trace_panel or TRACE_LOG:
+        start_trace(page, _session_id())
+    
+    # Keep a cProfile/tracemalloc capture of this rerun if it turns out slow
+    if PROFILE_ENABLED or (PROFILE_ALLOW_QUERY and st.query_params.get("profile") == "1"):
+        capture = ProfileCapture(page, _session_id())
+    else:
+        capture = contextlib.nullcontext()
+    
+    try:
+        with capture:
+            render_app()
+    finally:
+        trace = finish_trace()
+    
+    if trace is not None and show_trace_panel:
+        from components.trace_panel import render_trace_panel
+        render_trace_panel(trace)
+
+
+def render_app():
+    """
+    Render the current page with the theme, navigation and footer.
+    """
     # Apply custom theme and CSS
     apply_custom_theme()
     
     # Check if onboarding is needed
     if not st.session_state.get("onboarding_complete", False):
+        from components.onboarding_gender_selector import render_onboarding
         render_onboarding()
         return
     
+    from components.ai_assistant_toggle import render_ai_assistant
+    from components.footer import render_footer
+    from components.navbar import render_navbar
+    from router import route_to_page
+    
     # Render navigation bar
     render_navbar()
     
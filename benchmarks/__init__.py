@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for WERBEAUTY.
+Synthetic data sets and a standalone runner; see benchmarks/README.md.
+"""
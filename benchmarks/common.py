@@ -0,0 +1,145 @@
+"""
+Shared helpers for the WERBEAUTY benchmark runners.
+Percentiles, baselines, regression reports and the per-size driver
+that generates a data set and runs a benchmark on it in a child process.
+"""
+
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.synthetic import write_dataset
+
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A p50 this much slower than the baseline counts as a regression
+REGRESSION_TOLERANCE = 0.25
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Get the q-th percentile (0-100) of samples by nearest rank."""
+    ordered = sorted(samples)
+    rank = min(len(ordered), max(1, math.ceil(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def baseline_path(prefix: str, size: int) -> str:
+    """Get the baseline file of a runner ('products' or 'app') and size."""
+    return os.path.join(BASELINE_DIR, f"{prefix}_{size}.json")
+
+
+def load_baseline(prefix: str, size: int) -> Optional[Dict]:
+    try:
+        with open(baseline_path(prefix, size), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(prefix: str, size: int, result: Dict) -> None:
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(prefix, size), "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"✓ Baseline saved to {os.path.relpath(baseline_path(prefix, size))}")
+
+
+def report(result: Dict, baseline: Optional[Dict], section: str, label: str,
+           columns: Sequence[Tuple[str, str, int, str]], name_width: int = 24) -> List[str]:
+    """
+    Print one result section as a table compared against the baseline.
+
+    Args:
+        result: Results of one size
+        baseline: Saved results of the same size, if any
+        section: Key of the section to print, e.g. 'operations' or 'scenarios'
+        label: Header of the name column
+        columns: (header, key, width, format spec) per value column, after
+            which the p50 change against the baseline is printed
+        name_width: Width of the name column
+
+    Returns:
+        Names of entries whose p50 regressed past REGRESSION_TOLERANCE
+    """
+    print(f"{label:<{name_width}}" + "".join(f"{header:>{width}}" for header, _, width, _ in columns)
+          + f"{'vs baseline':>14}")
+    regressions = []
+    for name, values in result[section].items():
+        change = ""
+        previous = (baseline or {}).get(section, {}).get(name)
+        if previous and previous["p50_ms"] > 0:
+            ratio = values["p50_ms"] / previous["p50_ms"] - 1
+            change = f"{ratio:+.0%}"
+            if ratio > REGRESSION_TOLERANCE:
+                change += " ✗"
+                regressions.append(name)
+        print(f"{name:<{name_width}}"
+              + "".join(f"{values.get(key, 0):>{width}{spec}}" for _, key, width, spec in columns)
+              + f"{change:>14}")
+    return regressions
+
+
+def run_child(module: str, args: List[str], data_dir: str, env: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    Run a benchmark module's child mode in a fresh interpreter.
+
+    Args:
+        module: Module to run with ``python -m``
+        args: Command line arguments for the child
+        data_dir: Data set directory; WERBEAUTY_DATA_DIR and WERBEAUTY_PRODUCT_DIR point at it
+        env: Extra environment variables
+
+    Returns:
+        The JSON the child printed on its last line
+    """
+    child_env = dict(os.environ, WERBEAUTY_DATA_DIR=data_dir, WERBEAUTY_PRODUCT_DIR=data_dir, **(env or {}))
+    completed = subprocess.run([sys.executable, "-m", module] + args,
+                               env=child_env, cwd=ROOT_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "benchmark failed")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_sizes(sizes: Sequence[int], prefix: str, run: Callable[[int, str], Dict],
+              report_size: Callable[[Dict, Optional[Dict]], List[str]],
+              save: bool = False, check: bool = False) -> int:
+    """
+    Generate a data set per size, benchmark it and compare with the baselines.
+
+    Args:
+        sizes: Catalog sizes to run
+        prefix: Baseline file prefix, e.g. 'products' or 'app'
+        run: Callable taking (size, data directory) returning that size's results
+        report_size: Callable taking (result, baseline) that prints it and
+            returns the names of regressed entries
+        save: Save the results as the new baselines
+        check: Return status 1 if anything regressed
+
+    Returns:
+        Process exit status
+    """
+    regressions = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix=f"werbeauty-{prefix}-bench-{size}-") as data_dir:
+            print(f"Generating {size:,} products...", end=" ", flush=True)
+            write_dataset(data_dir, size)
+            print("running...", flush=True)
+            try:
+                result = run(size, data_dir)
+            except RuntimeError as e:
+                print(f"✗ {size:,} products: {e}")
+                return 1
+
+        regressions += [f"{size}:{name}" for name in report_size(result, load_baseline(prefix, size))]
+        if save:
+            save_baseline(prefix, size, result)
+
+    if regressions:
+        print(f"\n✗ Regressions: {', '.join(regressions)}")
+        return 1 if check else 0
+    return 0
@@ -0,0 +1,201 @@
+"""
+WERBEAUTY Import-Time Audit
+===========================
+Measures what a cold session imports before its first page is painted.
+
+Each scenario (onboarding or one page) runs in a fresh interpreter under
+``python -X importtime``: the child loads Streamlit's AppTest, then runs
+app.py once. Only the imports made during that first script run are
+counted, so the report shows exactly what the app itself pulls in for
+that page, module by module, and the wall time of the first run.
+
+Heavy dependencies listed in requirements.txt but unused by the app
+(HOT_PATH_FORBIDDEN) must never appear; --check fails if they do.
+
+Usage:
+    python -m benchmarks.import_audit [--pages onboarding home women] [--repeat 3]
+                                      [--top 15] [--check]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.synthetic import write_dataset
+
+
+DEFAULT_PAGES = ("onboarding", "home", "women", "men", "cart", "recommended", "login")
+DEFAULT_REPEAT = 3
+DEFAULT_TOP = 15
+DATASET_SIZE = 1000
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# Top-level packages that must not be imported while serving a page
+HOT_PATH_FORBIDDEN = ("pandas", "PIL", "streamlit_lottie")
+
+# Written to stderr around the first run, so its imports can be told apart
+START_MARKER = "--- werbeauty first run start ---"
+END_MARKER = "--- werbeauty first run end ---"
+
+
+def run_child(page: str) -> None:
+    """Run app.py once on a page and print the first run's wall time."""
+    import logging
+    from streamlit.testing.v1 import AppTest
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    if page != "onboarding":
+        at.session_state["onboarding_complete"] = True
+        at.session_state["gender"] = "women"
+        at.session_state["current_page"] = page
+
+    sys.stderr.write(START_MARKER + "\n")
+    sys.stderr.flush()
+    start = time.perf_counter_ns()
+    at.run()
+    elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+    sys.stderr.write(END_MARKER + "\n")
+    sys.stderr.flush()
+
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+    print(json.dumps({"first_run_ms": elapsed_ms}))
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """
+    Parse the -X importtime lines written during the first run.
+
+    Args:
+        stderr: Child process stderr
+
+    Returns:
+        One entry per imported module with module, self_us, cumulative_us
+        and depth (0 for modules imported directly by the app run)
+    """
+    lines = stderr.splitlines()
+    try:
+        lines = lines[lines.index(START_MARKER) + 1:lines.index(END_MARKER)]
+    except ValueError:
+        return []
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Column header
+        name = parts[2].rstrip()
+        modules.append({
+            "module": name.strip(),
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            "indent": len(name) - len(name.lstrip()),
+        })
+    base = min((module["indent"] for module in modules), default=0)
+    for module in modules:
+        module["depth"] = (module.pop("indent") - base) // 2
+    return modules
+
+
+def audit_page(page: str, repeat: int, env: Dict[str, str]) -> Dict:
+    """
+    Audit one scenario in fresh interpreters.
+
+    Args:
+        page: 'onboarding' or a page name
+        repeat: Number of cold runs; the median first-run time is reported
+        env: Environment for the child processes
+
+    Returns:
+        Dictionary with first_run_ms, import_ms, modules and forbidden
+    """
+    root = os.path.dirname(APP_PATH)
+    timings = []
+    modules: List[Dict] = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "benchmarks.import_audit", "--child", page],
+            env=env, cwd=root, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+            raise RuntimeError(errors[-1] if errors else f"{page}: audit failed")
+        timings.append(json.loads(completed.stdout.strip().splitlines()[-1])["first_run_ms"])
+        modules = parse_importtime(completed.stderr)
+
+    top_level = {module["module"].split(".")[0] for module in modules}
+    return {
+        "page": page,
+        "first_run_ms": statistics.median(timings),
+        "import_ms": sum(module["self_us"] for module in modules) / 1000,
+        "modules": modules,
+        "forbidden": sorted(name for name in HOT_PATH_FORBIDDEN if name in top_level),
+    }
+
+
+def report(result: Dict, top: int) -> None:
+    """Print one scenario's audit, slowest direct imports first."""
+    print(f"\n{result['page']}: first run {result['first_run_ms']:.0f} ms, "
+          f"{len(result['modules'])} modules imported in {result['import_ms']:.0f} ms")
+    direct = sorted((module for module in result["modules"] if module["depth"] == 0),
+                    key=lambda module: -module["cumulative_us"])
+    shown = direct[:top] if top else direct
+    if shown:
+        print(f"  {'module':<56}{'self ms':>10}{'cum ms':>10}")
+        for module in shown:
+            print(f"  {module['module'][:54]:<56}{module['self_us'] / 1000:>10.1f}{module['cumulative_us'] / 1000:>10.1f}")
+    if result["forbidden"]:
+        print(f"  ✗ Imported on the hot path: {', '.join(result['forbidden'])}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Audit WERBEAUTY's cold-start imports per page.")
+    parser.add_argument("--pages", nargs="+", default=list(DEFAULT_PAGES),
+                        help="Scenarios to audit: 'onboarding' or page names")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Cold runs per scenario (default: 3)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help="Direct imports listed per scenario, 0 for all (default: 15)")
+    parser.add_argument("--json", action="store_true", help="Print the full results as JSON")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with status 1 if a forbidden package is imported")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child is not None:
+        run_child(args.child)
+        return 0
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="werbeauty-import-audit-") as data_dir:
+        write_dataset(data_dir, DATASET_SIZE)
+        env = dict(os.environ, WERBEAUTY_DATA_DIR=data_dir, WERBEAUTY_PRODUCT_DIR=data_dir)
+        for page in args.pages:
+            try:
+                results.append(audit_page(page, args.repeat, env))
+            except RuntimeError as e:
+                print(f"✗ {e}")
+                return 1
+            if not args.json:
+                report(results[-1], args.top)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+    forbidden = [f"{result['page']}:{name}" for result in results for name in result["forbidden"]]
+    if forbidden:
+        print(f"\n✗ Forbidden imports: {', '.join(forbidden)}")
+        return 1 if args.check else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+WERBEAUTY End-to-End Rerun Benchmark
+====================================
+Drives app.py headlessly with Streamlit's AppTest against synthetic data
+sets and records how long each full script run takes and how many
+elements it renders: onboarding, page views, a filter change,
+add-to-cart and checkout.
+
+Each catalog size runs in its own process with WERBEAUTY_DATA_DIR and
+WERBEAUTY_PRODUCT_DIR pointing at a generated data set. Results can be
+saved as baselines in benchmarks/baselines/ and compared on later runs.
+
+Usage:
+    python -m benchmarks.run_app_benchmark [--sizes 1000 10000] [--reruns 10] [--save] [--check]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.common import ROOT_DIR, percentile, report, run_child, run_sizes
+
+
+DEFAULT_SIZES = (1000,)
+DEFAULT_RERUNS = 10
+PAGES = ("home", "women", "men", "cart", "recommended", "profile")
+APP_TIMEOUT = 120
+APP_PATH = os.path.join(ROOT_DIR, "app.py")
+BASELINE_PREFIX = "app"
+
+# Synthetic account used for the logged-in scenarios (see synthetic.write_dataset)
+BENCH_USER = "user0@example.com"
+
+
+def count_elements(at) -> int:
+    """Count the rendered elements and blocks of an app run."""
+    def count(node) -> int:
+        children = getattr(node, "children", None)
+        return 1 + sum(count(child) for child in children.values()) if children else 1
+    return count(at.main) + count(at.sidebar)
+
+
+def new_app(page: Optional[str] = None, logged_in: bool = False, cart: Optional[List] = None):
+    """Create an AppTest past onboarding, optionally logged in with a cart."""
+    from streamlit.testing.v1 import AppTest
+    from utils.storage import get_store
+
+    at = AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT)
+    if page is not None:
+        at.session_state["onboarding_complete"] = True
+        at.session_state["gender"] = "women"
+        at.session_state["current_page"] = page
+    if logged_in:
+        at.session_state["user_email"] = BENCH_USER
+        at.session_state["user"] = get_store("users").get(BENCH_USER)
+    if cart is not None:
+        at.session_state["cart"] = cart
+    return at
+
+
+def measure(name: str, results: Dict, step: Callable, at, reruns: int) -> None:
+    """
+    Time one scenario step over several script runs.
+
+    A step's time covers every script run it triggers, including reruns
+    requested by the app itself (e.g. st.rerun() after a button click).
+
+    Args:
+        name: Scenario name
+        results: Dictionary the summary is stored in
+        step: Callable taking (at, iteration) that triggers one script run
+        at: AppTest instance
+        reruns: Number of timed runs
+    """
+    samples = []
+    for i in range(reruns):
+        start = time.perf_counter_ns()
+        step(at, i)
+        samples.append((time.perf_counter_ns() - start) / 1e6)
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].message}")
+    results[name] = {
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+        "elements": count_elements(at),
+    }
+
+
+def run_size(size: int, reruns: int) -> Dict:
+    """
+    Run every scenario against the data set the environment points at.
+
+    Args:
+        size: Catalog size, for reporting
+        reruns: Timed script runs per scenario
+
+    Returns:
+        Dictionary with per-scenario results
+    """
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    from utils.product_loader import get_catalog
+
+    catalog = get_catalog()
+    cart = [(product["id"], 1) for product in catalog.gender_products("women")[:3]]
+    results: Dict[str, Dict] = {}
+
+    # First run of a new session, then picking a collection
+    def onboarding(at, i):
+        at.session_state["onboarding_complete"] = False
+        at.run()
+        at.button(key="onboard_women").click().run()
+    measure("onboarding", results, onboarding, new_app(), reruns)
+
+    for page in PAGES:
+        at = new_app(page, logged_in=page == "profile", cart=list(cart))
+        at.run()  # Warm up caches and imports
+        measure(f"page:{page}", results, lambda at, i: at.run(), at, reruns)
+
+    categories = ["Skincare", "All", "Makeup", "Perfumes"]
+    at = new_app("women")
+    at.run()
+    measure("filter_change", results,
+            lambda at, i: at.selectbox[0].set_value(categories[i % len(categories)]).run(), at, reruns)
+
+    def add_to_cart(at, i):
+        at.session_state["cart"] = []
+        at.run()
+        next(button for button in at.button if button.key and button.key.startswith("cart_")).click().run()
+    at = new_app("women", logged_in=True)
+    at.run()
+    measure("add_to_cart", results, add_to_cart, at, reruns)
+
+    def checkout(at, i):
+        at.session_state["cart"] = list(cart)
+        at.session_state["order_complete"] = False
+        at.session_state["current_page"] = "payment"
+        at.run()
+        fields = {
+            "billing_first_name": "Bench", "billing_last_name": "User", "billing_email": BENCH_USER,
+            "billing_phone": "5550100", "billing_address": "1 Test Street", "billing_city": "Paris",
+            "billing_state": "IDF", "billing_zip": "75001", "card_number": "4111 1111 1111 1111",
+            "card_name": "BENCH USER", "cvv": "123",
+        }
+        for key, value in fields.items():
+            at.text_input(key=key).set_value(value)
+        at.selectbox(key="exp_year").set_value(at.selectbox(key="exp_year").options[-1])
+        at.checkbox(key="agree_terms").check()
+        at.button(key="place_order").click().run()
+        if not at.session_state["order_complete"]:
+            raise RuntimeError("checkout did not complete")
+    at = new_app("payment", logged_in=True)
+    measure("checkout", results, checkout, at, reruns)
+
+    return {"size": size, "products": len(catalog), "scenarios": results}
+
+
+def report_size(result: Dict, baseline: Optional[Dict]) -> List[str]:
+    """
+    Print one size's results.
+
+    Returns:
+        Names of scenarios whose p50 regressed past REGRESSION_TOLERANCE
+    """
+    print(f"\n{result['products']:,} products")
+    print("-" * 74)
+    return report(result, baseline, "scenarios", "scenario",
+                  [("p50 ms", "p50_ms", 10, ".1f"), ("p99 ms", "p99_ms", 10, ".1f"), ("elements", "elements", 10, "")],
+                  name_width=22)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full WERBEAUTY reruns with AppTest.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Catalog sizes to run (default: 1000)")
+    parser.add_argument("--reruns", type=int, default=DEFAULT_RERUNS,
+                        help="Timed script runs per scenario (default: 10)")
+    parser.add_argument("--save", action="store_true", help="Save the results as the new baselines")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any scenario regressed")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_size(args.child, args.reruns)))
+        return 0
+
+    def run(size: int, data_dir: str) -> Dict:
+        return run_child("benchmarks.run_app_benchmark", ["--child", str(size), "--reruns", str(args.reruns)], data_dir)
+
+    return run_sizes(args.sizes, BASELINE_PREFIX, run, report_size, save=args.save, check=args.check)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+WERBEAUTY Hot Path Benchmarks
+=============================
+Times catalog lookups, filtering, search and recommendations against
+synthetic catalogs, and reports p50/p99 latency and peak traced memory.
+
+Each catalog size runs in its own process with WERBEAUTY_DATA_DIR and
+WERBEAUTY_PRODUCT_DIR pointing at a generated data set. Results can be
+saved as baselines in benchmarks/baselines/ and compared on later runs.
+
+Usage:
+    python -m benchmarks.run_benchmarks [--sizes 1000 10000 100000] [--iterations 200]
+                                        [--save] [--check]
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.common import percentile, report, run_child as run_module, run_sizes
+from benchmarks.synthetic import ADJECTIVES, INGREDIENTS, NOUNS
+
+
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_ITERATIONS = 200
+BASELINE_PREFIX = "products"
+
+
+def time_calls(fn: Callable, inputs: List, memory: bool = False) -> Dict[str, float]:
+    """
+    Call fn once per input and summarize the latencies.
+
+    Args:
+        fn: Function taking one input
+        inputs: Inputs to call fn with
+        memory: Also record the peak traced allocation of a single call
+
+    Returns:
+        Dictionary with p50_ms, p99_ms and mean_ms (and peak_kb with memory)
+    """
+    fn(inputs[0])  # Warm up
+    samples = []
+    peak = 0
+    for value in inputs:
+        if memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter_ns()
+        fn(value)
+        samples.append((time.perf_counter_ns() - start) / 1e6)
+        if memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    result = {
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+        "mean_ms": sum(samples) / len(samples),
+    }
+    if memory:
+        result["peak_kb"] = peak / 1024
+    return result
+
+
+def run_size(size: int, iterations: int, memory: bool = False) -> Dict:
+    """
+    Benchmark the data set the environment points at.
+
+    Args:
+        size: Catalog size, for reporting
+        iterations: Calls per operation
+        memory: Trace allocations instead of measuring pure latency
+
+    Returns:
+        Dictionary with setup and per-operation results
+    """
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    if memory:
+        tracemalloc.start()
+
+    import streamlit as st
+    from utils.co_purchase import get_co_purchase_index
+    from utils.product_loader import (get_catalog, get_product_by_id, filter_products,
+                                      load_men_products, load_women_products, search_products)
+    from utils.recommendation_engine import get_also_bought, get_recommendations, get_similar_products
+    from utils.review_manager import get_review_aggregates
+
+    setup = {}
+
+    def measure_setup(name: str, fn: Callable) -> None:
+        if memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter_ns()
+        fn()
+        setup[name] = {"ms": (time.perf_counter_ns() - start) / 1e6}
+        if memory:
+            setup[name]["peak_kb"] = (tracemalloc.get_traced_memory()[1] - base) / 1024
+
+    measure_setup("load_catalog", get_catalog)
+    catalog = get_catalog()
+    measure_setup("filter_engine", catalog.filter_engine)
+    measure_setup("search_index", catalog.search_index)
+    measure_setup("product_features", catalog.product_features)
+    measure_setup("similarity_index", catalog.similarity_index)
+    measure_setup("co_purchase_index", get_co_purchase_index)
+    measure_setup("review_aggregates", get_review_aggregates)
+
+    rng = random.Random(size)
+    ids = [catalog.products[rng.randrange(len(catalog))]["id"] for _ in range(iterations)]
+    women, men = load_women_products(), load_men_products()
+    words = ADJECTIVES + NOUNS + INGREDIENTS
+    queries = [rng.choice(words).split()[0].lower() for _ in range(iterations)]
+    categories = ["All", "Skincare", "Perfumes", "Self-Care"]
+    filters = [
+        {
+            "category": rng.choice(categories),
+            "price_range": (rng.choice([0, 20, 50]), rng.choice([100, 250, 500])),
+            "sort_by": rng.choice(["popularity", "price_low", "price_high", "rating"]),
+        }
+        for _ in range(iterations)
+    ]
+    sessions = [
+        {
+            "gender": rng.choice(["women", "men"]),
+            "favorites": rng.sample(ids, 3),
+            "cart": [(product_id, 1) for product_id in rng.sample(ids, 2)],
+            "view_history": rng.sample(ids, 5),
+        }
+        for _ in range(iterations)
+    ]
+
+    def recommend(session: Dict) -> None:
+        for key, value in session.items():
+            st.session_state[key] = value
+        get_recommendations(limit=8)
+
+    operations = {
+        "get_product_by_id": time_calls(get_product_by_id, ids, memory),
+        "filter_products": time_calls(
+            lambda f: filter_products(women if f["category"] != "Perfumes" else men, f), filters, memory),
+        "search_products": time_calls(lambda q: search_products(women, q), queries, memory),
+        "get_recommendations": time_calls(recommend, sessions, memory),
+        "get_similar_products": time_calls(lambda pid: get_similar_products(pid, limit=4), ids, memory),
+        "get_also_bought": time_calls(lambda pid: get_also_bought(pid, limit=4), ids, memory),
+    }
+    return {"size": size, "products": len(catalog), "setup": setup, "operations": operations}
+
+
+def run_child(size: int, data_dir: str, iterations: int, memory: bool) -> Dict:
+    """Run one size in a fresh interpreter and return its results."""
+    args = ["--child", str(size), "--iterations", str(iterations)]
+    if memory:
+        args.append("--memory")
+    # The similarity index is timed as a setup step, not built in the background
+    return run_module("benchmarks.run_benchmarks", args, data_dir, env={"WERBEAUTY_SIMILARITY_PREBUILD": "0"})
+
+
+def merge_memory(timing: Dict, traced: Dict) -> Dict:
+    """Add the traced peaks of a memory run to a timing run."""
+    for section in ("setup", "operations"):
+        for name, values in traced[section].items():
+            timing[section][name]["peak_kb"] = values["peak_kb"]
+    return timing
+
+
+def report_size(result: Dict, baseline: Optional[Dict]) -> List[str]:
+    """
+    Print one size's results.
+
+    Returns:
+        Names of operations whose p50 regressed past REGRESSION_TOLERANCE
+    """
+    print(f"\n{result['products']:,} products")
+    print("-" * 78)
+    print(f"{'setup':<24}{'ms':>12}{'peak KB':>14}")
+    for name, values in result["setup"].items():
+        print(f"{name:<24}{values['ms']:>12.1f}{values.get('peak_kb', 0):>14,.0f}")
+    print()
+    return report(result, baseline, "operations", "operation",
+                  [("p50 ms", "p50_ms", 10, ".3f"), ("p99 ms", "p99_ms", 10, ".3f"), ("peak KB", "peak_kb", 12, ",.0f")])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WERBEAUTY hot paths on synthetic catalogs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Catalog sizes to run (default: 1000 10000)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS,
+                        help="Calls per operation (default: 200)")
+    parser.add_argument("--save", action="store_true", help="Save the results as the new baselines")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any operation regressed")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_size(args.child, args.iterations, memory=args.memory)))
+        return 0
+
+    def run(size: int, data_dir: str) -> Dict:
+        result = run_child(size, data_dir, args.iterations, memory=False)
+        if not args.no_memory:
+            result = merge_memory(result, run_child(size, data_dir, args.iterations, memory=True))
+        return result
+
+    return run_sizes(args.sizes, BASELINE_PREFIX, run, report_size, save=args.save, check=args.check)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Synthetic data sets for WERBEAUTY benchmarks.
+Generates product catalogs, users, orders and reviews of any size with
+the same shape as the files in data/.
+"""
+
+import json
+import os
+import random
+from typing import Dict, List, Optional
+
+
+CATEGORIES = {
+    "women": ["Skincare", "Makeup", "Perfumes", "Self-Care", "Hair-Care"],
+    "men": ["Skincare", "Grooming", "Beard-Care", "Perfumes", "Self-Care", "Hair-Care"],
+}
+BADGES = ["", "", "", "Bestseller", "Exclusive", "Luxury", "New", "Popular", "Trending"]
+SKIN_TYPES = ["All Skin Types", "Dry", "Oily", "Sensitive", "Mature", "Combination"]
+HAIR_TYPES = ["", "All Hair Types", "Fine", "Curly", "Thick"]
+ADJECTIVES = ["Radiant", "Velvet", "Midnight", "Golden", "Pure", "Silk", "Noir", "Rose",
+              "Diamond", "Luminous", "Hydra", "Matte", "Intense", "Gentle", "Royal", "Crystal"]
+NOUNS = ["Serum", "Cream", "Lipstick", "Palette", "Cologne", "Perfume", "Balm", "Oil",
+         "Cleanser", "Mask", "Toner", "Shampoo", "Foundation", "Mist", "Scrub", "Elixir"]
+# Common ingredients; each product has a few, and search benchmarks query them
+INGREDIENTS = ["Vitamin C", "Vitamin E", "Hyaluronic Acid", "Niacinamide", "Retinol", "Shea Butter",
+               "Argan Oil", "Rose Extract", "Aloe Vera", "Collagen", "Peptides", "Green Tea",
+               "Charcoal", "Jojoba Oil", "Squalane", "Ceramides", "Salicylic Acid", "Caffeine",
+               "Bergamot", "Sandalwood", "Vanilla", "Musk", "Oud", "Mica", "Tea Tree Oil"]
+
+# Long tail of the ingredient vocabulary: 20 x 30 x 6 = 3,600 names, so that, as
+# in a real catalog, most ingredients are shared by only a handful of products
+_INGREDIENT_PREFIXES = ["Hydrolyzed", "Sodium", "Potassium", "Glyceryl", "Cetyl", "Caprylyl", "Stearyl",
+                        "Behenyl", "Isopropyl", "Ethylhexyl", "Methyl", "Hydrogenated", "Fermented",
+                        "Organic", "Cold-Pressed", "Wild", "Acetyl", "Palmitoyl", "Lauryl", "Myristyl"]
+_INGREDIENT_BASES = ["Rice", "Oat", "Soy", "Silk", "Wheat", "Almond", "Avocado", "Coconut", "Olive",
+                     "Sunflower", "Camellia", "Lotus", "Bamboo", "Ginseng", "Licorice", "Chamomile",
+                     "Calendula", "Lavender", "Rosemary", "Cucumber", "Papaya", "Pomegranate", "Seaweed",
+                     "Marula", "Baobab", "Moringa", "Hibiscus", "Turmeric", "Kaolin", "Honey"]
+_INGREDIENT_SUFFIXES = ["Extract", "Oil", "Protein", "Ester", "Ferment", "Powder"]
+INGREDIENT_TAIL = [f"{prefix} {base} {suffix}" for prefix in _INGREDIENT_PREFIXES
+                   for base in _INGREDIENT_BASES for suffix in _INGREDIENT_SUFFIXES]
+
+
+def generate_products(count: int, gender: str, seed: int = 0) -> List[Dict]:
+    """
+    Generate synthetic products.
+
+    Args:
+        count: Number of products
+        gender: 'women' or 'men'; sets the ID prefix and categories
+        seed: Random seed; the same arguments always give the same products
+
+    Returns:
+        List of product dictionaries
+    """
+    rng = random.Random(f"{gender}-{seed}")
+    prefix = gender[0]
+    products = []
+    for i in range(count):
+        category = rng.choice(CATEGORIES[gender])
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+        product = {
+            "id": f"{prefix}{i + 1:06d}",
+            "name": name,
+            "price": round(rng.uniform(8, 400), 2),
+            "category": category,
+            "description": f"{name} for everyday {category.lower()} with a luxurious finish.",
+            "image": f"https://images.example.com/{prefix}{i + 1:06d}.jpg",
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "badge": rng.choice(BADGES),
+            "skin_type": rng.choice(SKIN_TYPES),
+            "ingredients": rng.sample(INGREDIENTS, rng.randint(2, 4)) + rng.sample(INGREDIENT_TAIL, rng.randint(4, 10)),
+            "popularity": rng.randint(1, 100),
+        }
+        hair_type = rng.choice(HAIR_TYPES)
+        if hair_type:
+            product["hair_type"] = hair_type
+        products.append(product)
+    return products
+
+
+def generate_orders(products: List[Dict], users: int, orders_per_user: int = 3,
+                    seed: int = 0) -> Dict[str, List[Dict]]:
+    """
+    Generate order histories over a set of products.
+
+    Args:
+        products: Products the orders draw from
+        users: Number of customers
+        orders_per_user: Orders per customer
+        seed: Random seed
+
+    Returns:
+        Dictionary of user email to order list, as stored in orders.json
+    """
+    rng = random.Random(f"orders-{seed}")
+    orders = {}
+    for u in range(users):
+        email = f"user{u}@example.com"
+        user_orders = []
+        for o in range(orders_per_user):
+            items = [
+                {"id": p["id"], "name": p["name"], "price": p["price"], "image": p["image"],
+                 "brand": "", "quantity": rng.randint(1, 3)}
+                for p in rng.sample(products, min(len(products), rng.randint(1, 5)))
+            ]
+            user_orders.append({
+                "order_id": f"WER-BENCH-{u:05d}-{o}",
+                "date": "2025-01-01 12:00:00",
+                "items": items,
+                "status": "Cancelled" if rng.random() < 0.05 else "Delivered",
+                "total": round(sum(item["price"] * item["quantity"] for item in items), 2),
+            })
+        orders[email] = user_orders
+    return orders
+
+
+def generate_reviews(products: List[Dict], count: int, seed: int = 0) -> Dict[str, List[Dict]]:
+    """
+    Generate product reviews.
+
+    Args:
+        products: Products to review
+        count: Number of reviews
+        seed: Random seed
+
+    Returns:
+        Dictionary of product ID to review list, as stored in reviews.json
+    """
+    rng = random.Random(f"reviews-{seed}")
+    reviews: Dict[str, List[Dict]] = {}
+    for r in range(count):
+        product = rng.choice(products)
+        reviews.setdefault(product["id"], []).append({
+            "user_email": f"user{r}@example.com",
+            "user_name": f"User {r}",
+            "rating": rng.randint(1, 5),
+            "comment": "Synthetic review.",
+            "date": "2025-01-01 12:00:00",
+        })
+    return reviews
+
+
+def write_dataset(directory: str, product_count: int, seed: int = 0,
+                  users: Optional[int] = None, jsonl: bool = False) -> Dict[str, int]:
+    """
+    Write a complete synthetic data directory.
+
+    The directory can be used as both WERBEAUTY_DATA_DIR and
+    WERBEAUTY_PRODUCT_DIR.
+
+    Args:
+        directory: Target directory, created if needed
+        product_count: Total products, split evenly between women and men
+        seed: Random seed
+        users: Number of customers with orders (default: product_count // 10)
+        jsonl: Write product files as JSON Lines instead of JSON
+
+    Returns:
+        Dictionary of collection name to number of records written
+    """
+    os.makedirs(directory, exist_ok=True)
+    women = generate_products(product_count - product_count // 2, "women", seed)
+    men = generate_products(product_count // 2, "men", seed)
+    for stem, products in (("women_products", women), ("men_products", men)):
+        if jsonl:
+            with open(os.path.join(directory, stem + ".jsonl"), "w") as f:
+                for product in products:
+                    f.write(json.dumps(product) + "\n")
+        else:
+            with open(os.path.join(directory, stem + ".json"), "w") as f:
+                json.dump(products, f)
+
+    users = max(1, product_count // 10) if users is None else users
+    orders = generate_orders(women + men, users, seed=seed)
+    reviews = generate_reviews(women + men, product_count, seed=seed)
+    accounts = {
+        email: {"name": email.split("@")[0], "email": email, "password": "", "cart": [], "favorites": []}
+        for email in orders
+    }
+    for name, data in (("orders", orders), ("reviews", reviews), ("users", accounts)):
+        with open(os.path.join(directory, f"{name}.json"), "w") as f:
+            json.dump(data, f)
+
+    return {"products": len(women) + len(men), "users": len(accounts),
+            "orders": sum(len(o) for o in orders.values()), "reviews": product_count}
@@ -0,0 +1,64 @@
+"""
+WERBEAUTY Catalog Snapshot Builder
+==================================
+Reads the product files in data/ and writes a memory-mapped binary
+snapshot to data/catalog.snapshot. The app opens the snapshot instead of
+parsing the product files while they are unchanged.
+
+With --jsonl, data/women_products.json and data/men_products.json are
+first converted to JSON Lines (one product per line), which the app
+streams instead of parsing as a whole.
+
+Usage:
+    python build_catalog_snapshot.py [--jsonl]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from utils.catalog_snapshot import write_snapshot
+from utils.product_loader import PRODUCT_FILES, _catalog_version, _product_path, build_catalog, snapshot_dir
+
+
+def convert_to_jsonl(stem: str) -> int:
+    """Rewrite data/<stem>.json as data/<stem>.jsonl and return the product count."""
+    with open(_product_path(stem + ".json"), "r", encoding="utf-8") as f:
+        products = json.load(f)
+    tmp_path = _product_path(stem + ".jsonl.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for product in products:
+            f.write(json.dumps(product, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, _product_path(stem + ".jsonl"))
+    return len(products)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the WERBEAUTY binary catalog snapshot.")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Convert the JSON product files to JSON Lines first")
+    args = parser.parse_args()
+
+    if args.jsonl:
+        for _, stem, _ in PRODUCT_FILES:
+            try:
+                count = convert_to_jsonl(stem)
+            except (OSError, ValueError) as e:
+                print(f"✗ {stem}.json: {e}")
+                return 1
+            print(f"✓ {stem}.json -> {stem}.jsonl: {count} products")
+
+    def progress(done, total):
+        print(f"  read {done / 1e6:.1f} / {total / 1e6:.1f} MB", end="\r")
+
+    version = _catalog_version()
+    catalog = build_catalog(progress)
+    print()
+    write_snapshot(snapshot_dir(), catalog, version)
+    print(f"✓ {len(catalog)} products -> {snapshot_dir()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
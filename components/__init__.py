@@ -1,14 +1,37 @@
 """
 Components package for WERBEAUTY application. 
+
+Components are imported on first use (PEP 562), so importing one
+component does not load every other component and the managers they use.
 """
 
-from .navbar import render_navbar
-from .footer import render_footer
-from .product_card import render_product_card, render_product_grid
-from .filters_panel import render_filters_panel
-from .ai_assistant_toggle import render_ai_assistant
-from .animated_header import render_animated_header
-from .category_carousel import render_category_carousel
-from .testimonials_slider import render_testimonials_slider
-from .onboarding_gender_selector import render_onboarding
-from .comments_section import render_comments_section
\ No newline at end of file
+import importlib
+
+_EXPORTS = {
+    "render_navbar": ".navbar",
+    "render_footer": ".footer",
+    "render_product_card": ".product_card",
+    "render_product_grid": ".product_card",
+    "render_filters_panel": ".filters_panel",
+    "render_ai_assistant": ".ai_assistant_toggle",
+    "render_animated_header": ".animated_header",
+    "render_category_carousel": ".category_carousel",
+    "render_testimonials_slider": ".testimonials_slider",
+    "render_onboarding": ".onboarding_gender_selector",
+    "render_comments_section": ".comments_section",
+    "render_trace_panel": ".trace_panel",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -4,8 +4,10 @@ Hero sections with parallax and typewriter effects.
 """
 
 import streamlit as st
+from utils.tracing import traced
 
 
+@traced()
 def render_animated_header(
     title: str,
     subtitle: str = "",
@@ -56,6 +58,7 @@ def render_animated_header(
     st.markdown(header_html, unsafe_allow_html=True)
 
 
+@traced()
 def render_section_header(title: str, subtitle: str = ""):
     """
     Render a section header with title and optional subtitle.
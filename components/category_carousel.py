@@ -5,8 +5,10 @@ Horizontal scrolling category cards.
 
 import streamlit as st
 from config.constants import PLACEHOLDER_IMAGES
+from utils.tracing import traced
 
 
+@traced()
 def render_category_carousel(gender: str = "women"):
     """
     Render a horizontal carousel of category cards.
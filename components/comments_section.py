@@ -5,8 +5,10 @@ Customer reviews and ratings display.
 
 import streamlit as st
 from datetime import datetime
+from utils.tracing import traced
 
 
+@traced()
 def render_comments_section(product_id: str = None):
     """
     Render customer reviews and comments section.
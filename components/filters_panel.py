@@ -5,8 +5,10 @@ Advanced filtering options for product listings.
 
 import streamlit as st
 from config.constants import WOMEN_CATEGORIES, MEN_CATEGORIES, SKIN_TYPES, HAIR_TYPES, SORT_OPTIONS
+from utils.tracing import traced
 
 
+@traced()
 def render_filters_panel(gender: str = "women"):
     """
     Render the filters panel with all filtering options.
@@ -6,8 +6,10 @@ Elegant footer with links, newsletter, and branding.
 import streamlit as st
 from config.constants import BRAND_NAME
 from utils.auth_manager import is_logged_in, get_current_user
+from utils.tracing import traced
 
 
+@traced()
 def render_footer():
     """
     Render the application footer with links and newsletter signup.
@@ -6,8 +6,10 @@ Fixed top navigation with transparent to solid scroll effect.
 import streamlit as st
 from config.constants import NAV_ITEMS, BRAND_NAME
 from utils.auth_manager import is_logged_in, get_current_user, logout_user
+from utils.tracing import traced
 
 
+@traced()
 def render_navbar():
     """
     Render the main navigation bar with logo, links, and cart/favorites badges.
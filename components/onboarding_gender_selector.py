@@ -5,8 +5,10 @@ Full-screen modal for initial gender preference selection.
 
 import streamlit as st
 from config.constants import BRAND_NAME
+from utils.tracing import traced
 
 
+@traced()
 def render_onboarding():
     """
     Render the onboarding gender selection screen.
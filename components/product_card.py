@@ -4,12 +4,27 @@ Displays individual products with animations and interactions.
 """
 
 import streamlit as st
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
 from utils.cart_manager import add_to_cart, remove_from_cart, is_in_cart
 from utils.favorites_manager import add_to_favorites, remove_from_favorites, is_favorite
-from utils.review_manager import get_product_reviews, get_average_rating, get_review_count, add_review
+from utils.review_manager import get_product_reviews, get_ratings_for, add_review
 from utils.auth_manager import is_logged_in
+from utils.product_catalog import ProductCatalog
+from utils.product_loader import get_catalog
+from utils.recommendation_engine import record_view
+from utils.tracing import traced
 
 
+# Maximum number of rendered card HTML fragments kept in memory
+CARD_HTML_CACHE_SIZE = 512
+
+_card_html_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_card_html_lock = threading.Lock()
+
+
+@traced()
 def render_star_rating(rating: float) -> str:
     """
     Generate HTML for star rating display.
@@ -32,7 +47,87 @@ def render_star_rating(rating: float) -> str:
     return f'<div class="star-rating">{stars_html}</div>'
 
 
-def render_product_card(product: dict, index: int, show_actions: bool = True, key_prefix: str = ""):
+def build_card_html(product: dict, index: int, display_rating: float, review_count: int, in_favorites: bool) -> str:
+    """
+    Build the HTML of a product card.
+    
+    Args:
+        product: Product dictionary with details
+        index: Position of the card in its grid
+        display_rating: Rating shown as stars
+        review_count: Number of reviews shown
+        in_favorites: Whether the product is in the user's favorites
+    
+    Returns:
+        Card HTML as a single line
+    """
+    name = product.get("name", "Product Name")
+    price = product.get("price", 0)
+    image = product.get("image", "https://images.unsplash.com/photo-1596462502278-27bfdc403348?w=400&h=400&fit=crop")
+    badge = product.get("badge", "")
+    category = product.get("category", "")
+    
+    # Badge HTML
+    badge_html = f'<div class="product-card-badge">{badge}</div>' if badge else ""
+    
+    # Favorite icon
+    fav_icon = "❤️" if in_favorites else "🤍"
+    
+    # Favorite title
+    fav_title = 'Remove from' if in_favorites else 'Add to'
+    
+    # Build card HTML as single line
+    card_html = f'<div class="product-card animate-fadeInUp delay-{(index % 5) + 1}" style="animation-delay: {index * 0.1}s;">{badge_html}<div class="product-card-favorite" title="{fav_title} favorites">{fav_icon}</div><img src="{image}" alt="{name}" class="product-card-image" onerror="this.src=\'https://via.placeholder.com/400x400?text=WERBEAUTY\'"><div class="product-card-content"><p style="color: #888; font-size: 0.85rem; margin-bottom: 0.3rem;">{category}</p><h3 class="product-card-title">{name}</h3><div style="display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.5rem;">{render_star_rating(display_rating)}<span style="color: #888; font-size: 0.85rem;">({review_count} reviews)</span></div><p class="product-card-price">${price:.2f}</p></div></div>'
+    return card_html
+
+
+def get_card_html(product: dict, index: int, display_rating: float, review_count: int, in_favorites: bool,
+                  catalog: Optional[ProductCatalog] = None) -> str:
+    """
+    Get a product card's HTML from the fragment cache, building it on a miss.
+    
+    Fragments are keyed on the product id and catalog version plus every
+    value the HTML shows, so a changed rating, favorite or theme simply
+    misses. Products that are not the catalog's own dictionaries are
+    built every time, since their contents cannot be versioned.
+    
+    Args:
+        product: Product dictionary with details
+        index: Position of the card in its grid
+        display_rating: Rating shown as stars
+        review_count: Number of reviews shown
+        in_favorites: Whether the product is in the user's favorites
+        catalog: Catalog the product came from; the current one if omitted
+    
+    Returns:
+        Card HTML as a single line
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    product_id = product.get("id")
+    if catalog.get(product_id) is not product:
+        return build_card_html(product, index, display_rating, review_count, in_favorites)
+    
+    key = (product_id, catalog.version, display_rating, review_count, in_favorites,
+           st.session_state.get("gender"), index)
+    with _card_html_lock:
+        card_html = _card_html_cache.get(key)
+        if card_html is not None:
+            _card_html_cache.move_to_end(key)
+            return card_html
+    
+    card_html = build_card_html(product, index, display_rating, review_count, in_favorites)
+    with _card_html_lock:
+        _card_html_cache[key] = card_html
+        while len(_card_html_cache) > CARD_HTML_CACHE_SIZE:
+            _card_html_cache.popitem(last=False)
+    return card_html
+
+
+@traced()
+def render_product_card(product: dict, index: int, show_actions: bool = True, key_prefix: str = "",
+                        rating_info: Optional[Tuple[float, int]] = None,
+                        catalog: Optional[ProductCatalog] = None):
     """
     Render a single product card with image, details, and actions.
     
@@ -41,18 +136,16 @@ def render_product_card(product: dict, index: int, show_actions: bool = True, ke
         index: Unique index for the product
         show_actions: Whether to show add to cart/favorites buttons
         key_prefix: Prefix for unique keys to avoid duplicates
+        rating_info: Prefetched (average rating, review count); looked up if omitted
+        catalog: Catalog the product came from; the current one if omitted
     """
     product_id = product.get("id", index)
-    name = product.get("name", "Product Name")
-    price = product.get("price", 0)
-    image = product.get("image", "https://images.unsplash.com/photo-1596462502278-27bfdc403348?w=400&h=400&fit=crop")
     rating = product.get("rating", 4.5)
-    badge = product.get("badge", "")
-    category = product.get("category", "")
     
     # Get actual reviews data
-    avg_rating = get_average_rating(product_id)
-    review_count = get_review_count(product_id)
+    if rating_info is None:
+        rating_info = get_ratings_for([product_id])[product_id]
+    avg_rating, review_count = rating_info
     
     # Use actual rating if reviews exist, otherwise use product default rating
     display_rating = avg_rating if review_count > 0 else rating
@@ -63,17 +156,7 @@ def render_product_card(product: dict, index: int, show_actions: bool = True, ke
     in_cart = is_in_cart(product_id)
     in_favorites = is_favorite(product_id)
     
-    # Badge HTML
-    badge_html = f'<div class="product-card-badge">{badge}</div>' if badge else ""
-    
-    # Favorite icon
-    fav_icon = "❤️" if in_favorites else "🤍"
-    
-    # Favorite title
-    fav_title = 'Remove from' if in_favorites else 'Add to'
-    
-    # Build card HTML as single line
-    card_html = f'<div class="product-card animate-fadeInUp delay-{(index % 5) + 1}" style="animation-delay: {index * 0.1}s;">{badge_html}<div class="product-card-favorite" title="{fav_title} favorites">{fav_icon}</div><img src="{image}" alt="{name}" class="product-card-image" onerror="this.src=\'https://via.placeholder.com/400x400?text=WERBEAUTY\'"><div class="product-card-content"><p style="color: #888; font-size: 0.85rem; margin-bottom: 0.3rem;">{category}</p><h3 class="product-card-title">{name}</h3><div style="display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.5rem;">{render_star_rating(display_rating)}<span style="color: #888; font-size: 0.85rem;">({review_count} reviews)</span></div><p class="product-card-price">${price:.2f}</p></div></div>'
+    card_html = get_card_html(product, index, display_rating, review_count, in_favorites, catalog=catalog)
     
     st.markdown(card_html, unsafe_allow_html=True)
     
@@ -103,34 +186,69 @@ def render_product_card(product: dict, index: int, show_actions: bool = True, ke
         with col3:
             if st.button("⭐ Review", key=f"review_{unique_key}", use_container_width=True):
                 st.session_state[f"show_review_modal_{product_id}"] = True
+                record_view(product_id)
                 st.rerun()
         
         # Review modal
         if st.session_state.get(f"show_review_modal_{product_id}", False):
             render_review_modal(product, product_id, unique_key)
 
-def render_product_grid(products: list, columns: int = 4, key_prefix: str = ""):
+@traced()
+def render_product_grid(products, columns: int = 4, key_prefix: str = "", page_size: Optional[int] = None,
+                        catalog: Optional[ProductCatalog] = None):
     """
     Render a grid of product cards. 
     
+    With a page size, only the first page is rendered and a "Load more"
+    button reveals the next one. Only the visible slice of products is
+    read, so products may be a lazy sequence such as a catalog ProductView.
+    
     Args:
-        products: List of product dictionaries
+        products: Sequence of product dictionaries
         columns: Number of columns in the grid
         key_prefix: Prefix for unique keys to avoid duplicates
+        page_size: Products per page; None renders every product
+        catalog: Catalog the products came from; the current one if omitted
     """
     if not products:
         st.markdown('<div class="empty-state"><div class="empty-state-icon">🔍</div><h3 class="empty-state-title">No Products Found</h3><p class="empty-state-message">Try adjusting your filters or search query.</p></div>', unsafe_allow_html=True)
         return
     
+    total = len(products)
+    visible = total
+    if page_size:
+        # Start over at one page whenever the result set changes size
+        state_key = f"grid_visible_{key_prefix}"
+        state = st.session_state.get(state_key)
+        if not state or state["total"] != total:
+            state = {"visible": page_size, "total": total}
+            st.session_state[state_key] = state
+        visible = min(state["visible"], total)
+    
+    page = products[:visible]
+    
+    # Fetch ratings for the whole page in one pass, and the catalog once for every card
+    ratings = get_ratings_for([product.get("id", idx) for idx, product in enumerate(page)])
+    if catalog is None:
+        catalog = get_catalog()
+    
     # Create grid
     cols = st.columns(columns)
     
-    for idx, product in enumerate(products):
+    for idx, product in enumerate(page):
         with cols[idx % columns]:
-            render_product_card(product, idx, key_prefix=key_prefix)
+            render_product_card(product, idx, key_prefix=key_prefix, rating_info=ratings[product.get("id", idx)],
+                                catalog=catalog)
             st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
+    
+    if visible < total:
+        st.markdown(f'<p style="text-align: center; color: #888;">Showing {visible} of {total} products</p>', unsafe_allow_html=True)
+        if st.button("Load more", key=f"load_more_{key_prefix}", use_container_width=True):
+            st.session_state[f"grid_visible_{key_prefix}"]["visible"] = visible + page_size
+            st.rerun()
 
 
+@traced()
 def render_review_modal(product, product_id, unique_key):
     """Render review modal for a product."""
     if not is_logged_in():
@@ -164,6 +282,7 @@ def render_review_modal(product, product_id, unique_key):
             st.markdown(f'<div style="background: rgba(255,255,255,0.05); padding: 1rem; border-radius: 12px; margin-bottom: 0.5rem;"><div style="display: flex; justify-content: space-between;"><strong style="color: #B76E79;">{review["user_name"]}</strong><span style="color: #888;">{review["date"][:10]}</span></div><div>{stars}</div><p>{review["comment"]}</p></div>', unsafe_allow_html=True)
 
 
+@traced()
 def render_review_modal(product, product_id, unique_key):
     """Render review modal for a product."""
     if not is_logged_in():
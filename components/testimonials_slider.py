@@ -5,8 +5,10 @@ Customer reviews with rating display.
 
 import streamlit as st
 from config.constants import TESTIMONIALS
+from utils.tracing import traced
 
 
+@traced()
 def render_testimonials_slider():
     """
     Render a slider/grid of customer testimonials.
@@ -0,0 +1,29 @@
+"""
+Render timing panel for WERBEAUTY.
+Shows the spans of the current rerun in the sidebar when tracing is on.
+"""
+
+import streamlit as st
+from utils.tracing import Trace
+
+
+# Span names listed in the panel
+TRACE_PANEL_ROWS = 25
+
+
+def render_trace_panel(trace: Trace):
+    """
+    Render the timing breakdown of a finished rerun in the sidebar.
+    
+    Args:
+        trace: Finished trace of the current script run
+    """
+    rows = trace.summary()[:TRACE_PANEL_ROWS]
+    table = ["| Span | Calls | Total ms | Max ms |", "|---|---:|---:|---:|"]
+    for entry in rows:
+        table.append(f"| `{entry['name']}` | {entry['calls']} | {entry['total_ms']:.1f} | {entry['max_ms']:.1f} |")
+    
+    with st.sidebar:
+        with st.expander(f"⏱️ Rerun timing: {trace.duration_ns / 1e6:.0f} ms", expanded=True):
+            st.caption(f"Page: {trace.page} · {len(trace.spans)} spans")
+            st.markdown("\n".join(table))
@@ -81,6 +81,9 @@ SORT_OPTIONS = {
     "newest": "Newest First"
 }
 
+# Products shown per "load more" step on collection pages
+PRODUCTS_PER_PAGE = 12
+
 # Promo Codes
 PROMO_CODES = {
     "WERBEAUTY10": {"discount": 0.10, "description": "10% off your order"},
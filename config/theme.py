@@ -3,7 +3,21 @@ Theme configuration and CSS injection for WERBEAUTY.
 Defines all styling, animations, and visual elements. 
 """
 
+import os
 import streamlit as st
+from config.theme_compiler import ThemeBundle, compile_bundle, extract_style_blocks, read_stylesheet
+from utils.animation import get_animation_css
+from utils.tracing import traced
+
+
+# Bundled stylesheets, found relative to this file so the app can start from any directory
+CSS_DIR = os.path.join(os.path.dirname(__file__), "..", "assets", "css")
+
+# Static stylesheets merged into every theme bundle, before the theme CSS
+STYLESHEETS = (os.path.join(CSS_DIR, "style.css"),)
+
+# Stylesheets merged after the theme CSS
+OVERLAY_STYLESHEETS = (os.path.join(CSS_DIR, "ai_assistant.css"),)
 
 
 def initialize_session_state():
@@ -34,15 +48,51 @@ def initialize_session_state():
             st.session_state[key] = value
 
 
+@traced()
 def apply_custom_theme():
     """
     Apply custom CSS theme to the application. 
     Includes all animations, glassmorphism effects, and responsive styles.
+    
+    The stylesheet is compiled once per gender and reused; each rerun
+    only emits the cached bundle.
     """
+    gender = "men" if st.session_state.get("gender") == "men" else "women"
+    st.markdown(get_theme_bundle(gender).html, unsafe_allow_html=True)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_theme_bundle(gender: str) -> ThemeBundle:
+    """
+    Compile the complete stylesheet for a gender theme.
     
-    # Determine color scheme based on gender preference
-    gender = st.session_state.get("gender", "women")
+    Merges assets/css/style.css, the theme CSS, the animation CSS and the
+    AI assistant styles into one minified bundle.
     
+    Args:
+        gender: 'women' or 'men'
+    
+    Returns:
+        ThemeBundle with the CSS and its content hash
+    """
+    sources = [read_stylesheet(path) for path in STYLESHEETS]
+    sources.append(extract_style_blocks(build_theme_css(gender)))
+    sources.append(extract_style_blocks(get_animation_css()))
+    sources.extend(read_stylesheet(path) for path in OVERLAY_STYLESHEETS)
+    return compile_bundle(sources)
+
+
+def build_theme_css(gender: str) -> str:
+    """
+    Build the theme stylesheet for a gender.
+    
+    Args:
+        gender: 'women' or 'men'
+    
+    Returns:
+        CSS wrapped in a <style> element
+    """
+    # Determine color scheme based on gender preference
     if gender == "men":
         primary_color = "#0A1A3F"  # Midnight Navy
         secondary_color = "#2F3542"  # Graphite Gray
@@ -1441,4 +1491,4 @@ def apply_custom_theme():
     </style>
     """
     
-    st.markdown(css, unsafe_allow_html=True)
\ No newline at end of file
+    return css
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Theme stylesheet compiler for WERBEAUTY.
+Combines and minifies CSS sources into one hashed bundle.
+"""
+
+import hashlib
+import re
+from typing import Iterable, NamedTuple
+
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_STRING = re.compile(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')""")
+_STYLE_BLOCK = re.compile(r"<style[^>]*>(.*?)</style>", re.S | re.I)
+_IMPORT = re.compile(r"""@import\s*(?:url\([^)]*\)|"[^"]*"|'[^']*')[^;]*;""")
+
+
+class ThemeBundle(NamedTuple):
+    """Minified stylesheet and the content hash identifying it."""
+
+    css: str
+    digest: str
+
+    @property
+    def html(self) -> str:
+        """The bundle as a single style element."""
+        return f'<style id="werbeauty-theme-{self.digest}">{self.css}</style>'
+
+
+def minify_css(css: str) -> str:
+    """
+    Strip comments and redundant whitespace from CSS.
+
+    Quoted strings are left untouched.
+
+    Args:
+        css: CSS source
+
+    Returns:
+        Minified CSS
+    """
+    parts = _STRING.split(_COMMENT.sub("", css))
+    for i in range(0, len(parts), 2):
+        part = re.sub(r"\s+", " ", parts[i])
+        part = re.sub(r"\s*([{};,>])\s*", r"\1", part)
+        part = re.sub(r":\s+", ":", part)
+        parts[i] = part.replace(";}", "}")
+    return "".join(parts).strip()
+
+
+def extract_style_blocks(html: str) -> str:
+    """
+    Get the contents of every <style> element in an HTML snippet.
+
+    Args:
+        html: HTML containing style elements
+
+    Returns:
+        The style contents joined by newlines
+    """
+    return "\n".join(_STYLE_BLOCK.findall(html))
+
+
+def read_stylesheet(path: str) -> str:
+    """
+    Read a CSS file.
+
+    Args:
+        path: Stylesheet path
+
+    Returns:
+        File contents
+
+    Raises:
+        OSError: If the file is missing or unreadable; bundled stylesheets
+            are part of the app, so a silently unstyled page is not an option
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def compile_bundle(sources: Iterable[str]) -> ThemeBundle:
+    """
+    Concatenate and minify CSS sources in order.
+
+    Args:
+        sources: CSS strings; later sources override earlier ones
+
+    Returns:
+        ThemeBundle with the minified CSS and its short SHA-256 digest
+    """
+    css = minify_css("\n".join(sources))
+    # @import rules are only valid before all other rules
+    imports = list(dict.fromkeys(_IMPORT.findall(css)))
+    css = "".join(imports) + _IMPORT.sub("", css)
+    return ThemeBundle(css, hashlib.sha256(css.encode("utf-8")).hexdigest()[:12])
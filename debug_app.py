@@ -254,7 +254,50 @@ for file_path in files_to_check:
         print(f"✗ {file_path} - Error: {e}")
 print()
 
-# 11. SUMMARY
+# 11. TRACE SUMMARY
+print("11. TRACE SUMMARY")
+print("-" * 80)
+trace_log = os.environ.get("WERBEAUTY_TRACE_LOG", "")
+if not trace_log:
+    print("⚠ No trace log (run the app with WERBEAUTY_TRACE_LOG=traces.jsonl to record one)")
+elif not Path(trace_log).exists():
+    print(f"⚠ {trace_log} not found (no reruns traced yet)")
+else:
+    try:
+        from utils.tracing import summarize_trace_log
+        trace_summary = summarize_trace_log(trace_log)
+        print(f"✓ {trace_log}: {trace_summary['reruns']} reruns")
+        print(f"\n  {'Page':<20}{'Reruns':>8}{'p50 ms':>10}{'max ms':>10}")
+        for page, totals in sorted(trace_summary["pages"].items()):
+            totals = sorted(totals)
+            print(f"  {page:<20}{len(totals):>8}{totals[len(totals) // 2]:>10.1f}{totals[-1]:>10.1f}")
+        print(f"\n  {'Slowest spans (total)':<52}{'Calls':>8}{'Total ms':>10}{'Max ms':>10}")
+        slowest = sorted(trace_summary["spans"].items(), key=lambda item: -item[1]["total_ms"])[:15]
+        for name, stats in slowest:
+            print(f"  {name[:50]:<52}{stats['calls']:>8}{stats['total_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+    except Exception as e:
+        print(f"✗ Could not read {trace_log}: {e}")
+print()
+
+# 12. PROFILE CAPTURES
+print("12. PROFILE CAPTURES")
+print("-" * 80)
+try:
+    from utils.profiling import PROFILE_DIR, list_captures
+    captures = list_captures(PROFILE_DIR)
+    if not captures:
+        print(f"⚠ No captures in {PROFILE_DIR} (run the app with WERBEAUTY_PROFILE=1 or ?profile=1)")
+    else:
+        print(f"✓ {len(captures)} slow reruns captured in {PROFILE_DIR}")
+        print(f"\n  {'Capture':<44}{'Page':<18}{'ms':>10}")
+        for capture in captures[:15]:
+            print(f"  {os.path.basename(capture['base']):<44}{capture['page']:<18}{capture['duration_ms']:>10.1f}")
+        print("\n  Inspect with: python -m pstats <capture>.prof")
+except Exception as e:
+    print(f"✗ Could not list profile captures: {e}")
+print()
+
+# 13. SUMMARY
 print("=" * 80)
 print("SUMMARY")
 print("=" * 80)
@@ -0,0 +1,43 @@
+"""
+WERBEAUTY Sharded Storage Migration
+===================================
+Splits data/users.json, data/orders.json and data/reviews.json into one
+file per user (or product) under data/users/, data/orders/ and
+data/reviews/. Afterwards run the app with WERBEAUTY_STORAGE=sharded.
+
+Usage:
+    python migrate_to_sharded.py [--data-dir data] [--overwrite]
+"""
+
+import argparse
+import os
+import sys
+
+from utils.sharded_store import migrate_from_json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split WERBEAUTY JSON data into per-document files.")
+    parser.add_argument("--data-dir", default=os.environ.get("WERBEAUTY_DATA_DIR", "data"),
+                        help="Directory holding the JSON files (default: data)")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Replace documents already in the sharded directories")
+    args = parser.parse_args()
+
+    print(f"Migrating {args.data_dir}/*.json -> {args.data_dir}/<collection>/")
+
+    try:
+        counts = migrate_from_json(args.data_dir, overwrite=args.overwrite)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return 1
+
+    for collection, count in counts.items():
+        print(f"✓ {collection}: {count} documents")
+
+    print("\nDone. Start the app with: WERBEAUTY_STORAGE=sharded streamlit run app.py")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
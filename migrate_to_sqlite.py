@@ -0,0 +1,43 @@
+"""
+WERBEAUTY SQLite Migration
+==========================
+Imports data/users.json, data/orders.json and data/reviews.json into
+data/werbeauty.db. Afterwards run the app with WERBEAUTY_STORAGE=sqlite.
+
+Usage:
+    python migrate_to_sqlite.py [--data-dir data] [--overwrite]
+"""
+
+import argparse
+import os
+import sys
+
+from utils.sqlite_store import DB_FILENAME, migrate_from_json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import WERBEAUTY JSON data into SQLite.")
+    parser.add_argument("--data-dir", default=os.environ.get("WERBEAUTY_DATA_DIR", "data"),
+                        help="Directory holding the JSON files (default: data)")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Replace data already in the database")
+    args = parser.parse_args()
+
+    db_path = os.path.join(args.data_dir, DB_FILENAME)
+    print(f"Migrating {args.data_dir}/*.json -> {db_path}")
+
+    try:
+        counts = migrate_from_json(args.data_dir, overwrite=args.overwrite)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return 1
+
+    for collection, count in counts.items():
+        print(f"✓ {collection}: {count} records")
+
+    print("\nDone. Start the app with: WERBEAUTY_STORAGE=sqlite streamlit run app.py")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,19 @@
 """
 Pages package for WERBEAUTY application.
+
+Page modules are imported on first use by router.route_to_page.
 """
 
-from.  import home
-from. import women
-from. import men
-from . import cart
-from. import favorites
-from. import recommended
-from. import payment
\ No newline at end of file
+import importlib
+
+__all__ = ["home", "women", "men", "cart", "favorites", "recommended", "payment"]
+
+
+def __getattr__(name):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f".{name}", __name__)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -7,8 +7,10 @@ import streamlit as st
 from utils.cart_manager import get_cart, remove_from_cart, update_quantity, get_cart_total, clear_cart
 from utils.helpers import format_price
 from config.constants import PROMO_CODES, SHIPPING_OPTIONS
+from utils.tracing import traced
 
 
+@traced()
 def render():
     """
     Render the shopping cart page.
@@ -51,6 +53,7 @@ def render():
         render_order_summary()
 
 
+@traced()
 def render_empty_cart():
     """
     Render empty cart state.
@@ -74,6 +77,7 @@ def render_empty_cart():
             st.rerun()
 
 
+@traced()
 def render_cart_items(cart: list):
     """
     Render all cart items with quantity controls.
@@ -102,6 +106,7 @@ def render_cart_items(cart: list):
             st.rerun()
 
 
+@traced()
 def render_cart_item(item: dict, index: int):
     """
     Render a single cart item with controls.
@@ -163,6 +168,7 @@ def render_cart_item(item: dict, index: int):
     st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
 
 
+@traced()
 def render_order_summary():
     """
     Render the order summary sidebar.
@@ -264,6 +270,7 @@ def render_order_summary():
         st. rerun()
 
 
+@traced()
 def render_promo_section():
     """
     Render the promo code input section.
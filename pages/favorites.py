@@ -7,9 +7,11 @@ import streamlit as st
 from components.animated_header import render_animated_header
 from components.product_card import render_product_grid
 from utils.favorites_manager import get_favorites, clear_favorites
-from utils.product_loader import get_product_by_id
+from utils.product_loader import get_catalog
+from utils.tracing import traced
 
 
+@traced()
 def render():
     """
     Render the favorites page.
@@ -45,11 +47,7 @@ def render():
         return
     
     # Load full product details for favorites
-    products = []
-    for product_id in favorites:
-        product = get_product_by_id(product_id)
-        if product:
-            products.append(product)
+    products = get_catalog().get_many(favorites)
     
     # Favorites header with clear button
     col1, col2 = st.columns([3, 1])
@@ -69,6 +67,7 @@ def render():
         render_product_grid(products, columns=3, key_prefix="favorites")
 
 
+@traced()
 def render_empty_favorites():
     """
     Render empty favorites state.
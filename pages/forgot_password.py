@@ -5,8 +5,10 @@ Password reset request form.
 
 import streamlit as st
 from utils.auth_manager import initiate_password_reset, is_logged_in
+from utils.tracing import traced
 
 
+@traced()
 def render():
     """
     Render the forgot password page.
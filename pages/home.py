@@ -12,8 +12,10 @@ from components.product_card import render_product_grid
 from utils.product_loader import load_women_products, load_men_products
 from utils.recommendation_engine import get_trending, get_recommendations
 from config.constants import BRAND_NAME, BRAND_TAGLINE
+from utils.tracing import traced
 
 
+@traced()
 def render():
     """
     Render the home page with all sections.
@@ -59,6 +61,7 @@ def render():
     render_newsletter_section()
 
 
+@traced()
 def render_hero_section(gender: str):
     """
     Render the hero banner section with parallax effect.
@@ -128,6 +131,7 @@ def render_hero_section(gender: str):
             st.rerun()
 
 
+@traced()
 def render_gender_quick_access():
     """
     Render quick access buttons for gender sections.
@@ -195,6 +199,7 @@ def render_gender_quick_access():
             st.rerun()
 
 
+@traced()
 def render_bestsellers_section(gender: str):
     """
     Render the bestsellers product section.
@@ -220,6 +225,7 @@ def render_bestsellers_section(gender: str):
     render_product_grid(bestsellers[:8], columns=4, key_prefix="bestsellers")
 
 
+@traced()
 def render_new_arrivals_section(gender: str):
     """
     Render the new arrivals product section.
@@ -245,6 +251,7 @@ def render_new_arrivals_section(gender: str):
     render_product_grid(new_arrivals[:4], columns=4, key_prefix="new_arrivals")
 
 
+@traced()
 def render_recommendations_preview():
     """
     Render a preview of AI-powered recommendations.
@@ -271,6 +278,7 @@ def render_recommendations_preview():
             st.rerun()
 
 
+@traced()
 def render_newsletter_section():
     """
     Render the newsletter subscription section. 
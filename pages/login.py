@@ -5,8 +5,10 @@ User authentication and login form.
 
 import streamlit as st
 from utils.auth_manager import verify_temp_password_and_login, is_logged_in
+from utils.tracing import traced
 
 
+@traced()
 def render():
     """
     Render the login page.
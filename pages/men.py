@@ -7,10 +7,13 @@ import streamlit as st
 from components.animated_header import render_animated_header, render_section_header
 from components.filters_panel import render_filters_panel
 from components.product_card import render_product_grid
-from utils.product_loader import load_men_products, filter_products, search_products
+from utils.product_loader import get_catalog, filter_product_indices, search_product_indices
 from utils.helpers import highlight_text
+from config.constants import PRODUCTS_PER_PAGE
+from utils.tracing import traced
 
 
+@traced()
 def render():
     """
     Render the men's collection page. 
@@ -35,13 +38,15 @@ def render():
         # Search bar
         render_search_section()
         
-        # Load and filter products
-        products = load_men_products()
+        # Search and filter catalog positions; products are looked up only for display.
+        # One catalog is used throughout, so a hot reload mid-render cannot mix positions.
+        catalog = get_catalog()
+        candidates = None
         
         # Apply search
         search_query = st.session_state.get("search_query", "")
         if search_query:
-            products = search_products(products, search_query)
+            candidates, _ = search_product_indices(search_query, gender="men", catalog=catalog)
             st.markdown(f"""
             <div style="
                 background: linear-gradient(135deg, rgba(10, 26, 63, 0.1), rgba(192, 195, 200, 0.1));
@@ -51,13 +56,14 @@ def render():
                 border-left: 4px solid #0A1A3F;
             ">
                 <p style="margin: 0; color: #666;">
-                    Showing results for "<strong>{search_query}</strong>" ({len(products)} products found)
+                    Showing results for "<strong>{search_query}</strong>" ({len(candidates)} products found)
                 </p>
             </div>
             """, unsafe_allow_html=True)
         
         # Apply filters
-        products = filter_products(products, filters)
+        indices = filter_product_indices(filters, gender="men", candidates=candidates, catalog=catalog)
+        products = catalog.view(indices)
         
         # Results header
         st.markdown(f"""
@@ -68,11 +74,13 @@ def render():
         
         # Product grid
         if products:
-            render_product_grid(products, columns=3, key_prefix="men")
+            render_product_grid(products, columns=3, key_prefix="men", page_size=PRODUCTS_PER_PAGE,
+                                catalog=catalog)
         else:
             render_empty_results()
 
 
+@traced()
 def render_search_section():
     """
     Render the search bar with highlighting support. 
@@ -98,6 +106,7 @@ def render_search_section():
         st.rerun()
 
 
+@traced()
 def render_empty_results():
     """
     Render empty results state.
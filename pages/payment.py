@@ -12,8 +12,10 @@ from utils.helpers import (
 from utils.animation import render_success_animation
 from utils.order_manager import create_order
 from config.constants import SHIPPING_OPTIONS
+from utils.tracing import traced
 
 
+@traced()
 def render():
     """
     Render the payment/checkout page.
@@ -64,6 +66,7 @@ def render():
         render_checkout_summary()
 
 
+@traced()
 def render_empty_checkout():
     """
     Render empty checkout state.
@@ -86,6 +89,7 @@ def render_empty_checkout():
             st.rerun()
 
 
+@traced()
 def render_checkout_steps():
     """
     Render the checkout progress steps.
@@ -149,6 +153,7 @@ def render_checkout_steps():
     """, unsafe_allow_html=True)
 
 
+@traced()
 def render_checkout_form():
     """
     Render the checkout form with billing, shipping, and payment. 
@@ -360,6 +365,7 @@ def render_checkout_form():
             st.rerun()
 
 
+@traced()
 def render_credit_card_preview():
     """
     Render an animated credit card preview. 
@@ -395,6 +401,7 @@ def render_credit_card_preview():
     """, unsafe_allow_html=True)
 
 
+@traced()
 def render_checkout_summary():
     """
     Render the order summary sidebar. 
@@ -493,6 +500,7 @@ def render_checkout_summary():
     """, unsafe_allow_html=True)
 
 
+@traced()
 def render_order_confirmation():
     """
     Render the order confirmation page after successful checkout.
@@ -12,8 +12,10 @@ from utils.order_manager import get_user_orders, cancel_order
 from utils.review_manager import get_user_reviews, delete_review
 from utils.helpers import format_price
 from datetime import date
+from utils.tracing import traced
 
 
+@traced()
 def render():
     """
     Render the profile page.
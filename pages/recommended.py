@@ -8,8 +8,11 @@ from components.animated_header import render_section_header
 from components.product_card import render_product_grid
 from utils.recommendation_engine import get_recommendations, get_trending, get_similar_products, get_also_bought
 from utils.product_loader import load_women_products, load_men_products
+from utils.cart_manager import get_cart_ids
+from utils.tracing import traced
 
 
+@traced()
 def render():
     """
     Render the recommendations page.
@@ -69,6 +72,7 @@ def render():
     render_routine_section()
 
 
+@traced()
 def render_personalized_section():
     """
     Render personalized recommendations section. 
@@ -102,6 +106,7 @@ def render_personalized_section():
             st.rerun()
 
 
+@traced()
 def render_trending_section():
     """
     Render trending products section.
@@ -117,6 +122,7 @@ def render_trending_section():
         render_product_grid(trending, columns=4, key_prefix="trending")
 
 
+@traced()
 def render_favorites_based_section():
     """
     Render recommendations based on favorites. 
@@ -139,13 +145,14 @@ def render_favorites_based_section():
         render_product_grid(similar, columns=4, key_prefix="similar")
 
 
+@traced()
 def render_routine_section():
     """
     Render complete your routine section.
     """
-    cart = st.session_state.get("cart", [])
+    cart_ids = get_cart_ids()
     
-    if not cart:
+    if not cart_ids:
         return
     
     render_section_header(
@@ -154,8 +161,7 @@ def render_routine_section():
     )
     
     # Get complementary products based on first cart item
-    first_cart = cart[0]
-    complementary = get_also_bought(first_cart.get("id", ""), limit=4)
+    complementary = get_also_bought(cart_ids[0], limit=4)
     
     if complementary:
         render_product_grid(complementary, columns=4, key_prefix="complementary")
\ No newline at end of file
@@ -5,8 +5,10 @@ User registration form.
 
 import streamlit as st
 from utils.auth_manager import signup_user, is_logged_in
+from utils.tracing import traced
 
 
+@traced()
 def render():
     """
     Render the signup page.
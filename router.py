@@ -3,14 +3,22 @@ Router module for handling page navigation.
 """
 
 import streamlit as st
+from utils.tracing import traced
 
 
+@traced()
 def route_to_page():
     """
     Routes to the appropriate page based on session state.
     """
     current_page = st.session_state.get("current_page", "home")
     
+    # Write queued cart/favorites changes when the user navigates
+    if st.session_state.get("last_routed_page") != current_page:
+        st.session_state["last_routed_page"] = current_page
+        from utils.auth_manager import flush_user_data
+        flush_user_data()
+    
     if current_page == "home":
         from pages import home
         home.render()
@@ -144,6 +144,1081 @@ def test_product_loading():
         return False
 
 
+def test_product_catalog():
+    """Test indexed product catalog lookups"""
+    print("\n=== Testing Product Catalog ===")
+    try:
+        from utils.product_loader import get_catalog, get_product_by_id, load_women_products, load_men_products
+        
+        catalog = get_catalog()
+        all_products = load_women_products() + load_men_products()
+        assert len(catalog) == len({p["id"] for p in all_products})
+        print(f"✓ Catalog indexed {len(catalog)} products")
+        
+        for product in all_products:
+            assert get_product_by_id(product["id"])["name"] == product["name"]
+        assert get_product_by_id("does-not-exist") is None
+        print("✓ get_product_by_id() resolves every product")
+        
+        for gender, products in (("women", load_women_products()), ("men", load_men_products())):
+            assert [p["id"] for p in catalog.gender_products(gender)] == [p["id"] for p in products]
+        print("✓ Gender indexes match product files")
+        
+        for category, ids in catalog.category_ids.items():
+            assert all(catalog.get(pid)["category"] == category for pid in ids)
+        assert catalog.matching_categories("care")
+        print("✓ Category index is consistent")
+        
+        import numpy as np
+        view = catalog.view(np.array([2, 0, 1]))
+        assert len(view) == 3 and view[0] is catalog.products[2]
+        assert view[1:] == [catalog.products[0], catalog.products[1]]
+        print("✓ Lazy product view resolves items and slices")
+        
+        try:
+            catalog.products[0]["price"] = 0
+            raise AssertionError("product records must be read-only")
+        except TypeError:
+            pass
+        import os
+        from utils.product_loader import _product_path
+        path = _product_path("women_products.json")
+        stat = os.stat(path)
+        try:
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            assert get_catalog() is catalog
+        finally:
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        print("✓ Snapshot is read-only and survives unchanged file touches")
+        
+        from utils.product_record import Product
+        product = Product({"id": "x1", "name": "Test", "price": 10.0, "ingredients": ["A"], "extra": 1})
+        assert product["price"] == 10.0 and product.get("badge", "") == "" and "badge" not in product
+        assert dict(product) == {"id": "x1", "name": "Test", "price": 10.0, "ingredients": ("A",), "extra": 1}
+        assert not hasattr(product, "__dict__")
+        columns = catalog.columns()
+        assert columns.price.tolist() == [p["price"] for p in catalog.products]
+        assert catalog.filter_engine().price is columns.price
+        print("✓ Slotted product records and shared numeric columns")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Product catalog error: {e}")
+        return False
+
+
+def test_filter_engine():
+    """Test vectorized filtering and sorting"""
+    print("\n=== Testing Filter Engine ===")
+    try:
+        from utils.product_loader import load_women_products, load_men_products, filter_products, filter_product_indices, get_catalog, search_product_indices
+        
+        products = load_women_products() + load_men_products()
+        cases = [
+            {"category": "All", "price_range": (0, 500), "sort_by": "popularity"},
+            {"category": "care", "price_range": (20, 60), "sort_by": "price_low"},
+            {"category": "Skincare", "skin_type": "Dry", "sort_by": "rating"},
+            {"hair_type": "Fine", "sort_by": "newest"},
+            {"price_range": (30, 100), "sort_by": "price_high"},
+        ]
+        
+        for filters in cases:
+            expected = [p for p in products if filters.get("category", "All") == "All"
+                        or filters["category"].lower() in p.get("category", "").lower()]
+            low, high = filters.get("price_range", (0, 500))
+            expected = [p for p in expected if low <= p.get("price", 0) <= high]
+            for field, default in (("skin_type", "All Skin Types"), ("hair_type", "All Hair Types")):
+                wanted = filters.get(field, default)
+                if wanted != default:
+                    expected = [p for p in expected if p.get(field, default) in (wanted, default)]
+            key, reverse = {"popularity": ("popularity", True), "price_low": ("price", False),
+                            "price_high": ("price", True), "rating": ("rating", True),
+                            "newest": ("id", True)}[filters["sort_by"]]
+            expected.sort(key=lambda p: p.get(key, 0), reverse=reverse)
+            
+            result = filter_products(products, filters)
+            assert [p["id"] for p in result] == [p["id"] for p in expected], filters
+        print(f"✓ filter_products() matches reference for {len(cases)} filter sets")
+        
+        catalog = get_catalog()
+        top = filter_product_indices({"sort_by": "rating"}, gender="women", limit=3)
+        full = filter_product_indices({"sort_by": "rating"}, gender="women")
+        assert top.tolist() == full[:3].tolist()
+        assert all(catalog.products[i]["id"] in catalog.gender_ids["women"] for i in full)
+        print("✓ filter_product_indices() returns stable top-k positions")
+        
+        from utils.product_catalog import ProductCatalog
+        pinned = ProductCatalog([{"id": "p1", "name": "Oil Serum", "price": 5, "rating": 4},
+                                 {"id": "p2", "name": "Cream", "price": 9, "rating": 5}], [])
+        indices = filter_product_indices({"sort_by": "rating"}, gender="women", catalog=pinned)
+        assert [p["id"] for p in pinned.view(indices)] == ["p2", "p1"]
+        positions, _ = search_product_indices("oil", gender="women", catalog=pinned)
+        assert positions.tolist() == [0]
+        print("✓ Indices computed against a pinned catalog")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Filter engine error: {e}")
+        return False
+
+
+def test_search_index():
+    """Test inverted-index product search"""
+    print("\n=== Testing Search Index ===")
+    try:
+        from utils.product_loader import search_products, search_product_indices, get_catalog
+        from utils.search_index import SearchIndex, MATCH_NAME, MATCH_INGREDIENTS
+        
+        products = [
+            {"id": "t1", "name": "Rose Lipstick", "description": "Velvet finish", "category": "Lips", "ingredients": ["Shea Butter"]},
+            {"id": "t2", "name": "Rose Rose Mist", "description": "Rose water spray", "category": "Skincare", "ingredients": ["Rose Water"]},
+            {"id": "t3", "name": "Beard Oil", "description": "Soft beard", "category": "Beard-Care", "ingredients": ["Argan Oil"]},
+        ]
+        index = SearchIndex(products)
+        
+        docs, masks = index.search("ros")
+        assert docs.tolist() == [1, 0], docs
+        assert masks[0] & MATCH_NAME and masks[0] & MATCH_INGREDIENTS
+        print("✓ Prefix search ranks by BM25 score")
+        
+        docs, _ = index.search("argan beard")
+        assert docs.tolist() == [2]
+        assert index.search("rose beard")[0].size == 0
+        print("✓ Multi-word queries require every term")
+        
+        crowded = [{"id": f"c{i}", "name": f"Shade s{i:04d}", "category": "Lips"} for i in range(500)]
+        crowded.append({"id": "last", "name": "Sz Gloss", "category": "Lips"})
+        crowded_index = SearchIndex(crowded)
+        assert len(crowded_index.expand("s")) > 500
+        docs, _ = crowded_index.search("s gloss")
+        assert docs.tolist() == [500], docs
+        assert crowded_index.search("s")[0].size == 501
+        print("✓ Short prefixes expand to every matching term")
+        
+        assert [p["id"] for p in search_products(products, "butter")] == ["t1"]
+        assert search_products(products, "  ") is products and search_products(products, "!!") is products
+        assert index.search("-")[0].tolist() == [0, 1, 2]
+        assert index.search("- !!", candidates=[2, 0])[0].tolist() == [2, 0]
+        print("✓ search_products() returns original products without copies")
+        
+        catalog = get_catalog()
+        positions, _ = search_product_indices("oil", gender="men")
+        assert all(catalog.products[i]["id"] in catalog.gender_ids["men"] for i in positions)
+        print(f"✓ search_product_indices() found {len(positions)} men's products for 'oil'")
+        positions, _ = search_product_indices("!!", gender="men")
+        assert positions.tolist() == list(catalog.gender_positions("men"))
+        print("✓ Queries without words leave the collection unfiltered")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Search index error: {e}")
+        return False
+
+
+def test_storage_engine():
+    """Test journaled JSON document storage"""
+    print("\n=== Testing Storage Engine ===")
+    try:
+        import json
+        import os
+        import tempfile
+        from utils.storage import JournaledJSONStore
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "users.json")
+            with open(path, "w") as f:
+                json.dump({"a@x.com": {"name": "A"}}, f)
+            store = JournaledJSONStore(path, compact_bytes=512)
+            
+            store.put("b@x.com", {"name": "B"})
+            store.delete("a@x.com")
+            assert store.load_all() == {"b@x.com": {"name": "B"}}
+            assert json.load(open(path)) == {"a@x.com": {"name": "A"}}
+            print("✓ Writes append to the journal without rewriting the snapshot")
+            
+            with open(store.journal_path, "a") as f:
+                f.write('{"op": "put", "key": "c@x')
+            assert store.get("c@x.com") is None and store.get("b@x.com") == {"name": "B"}
+            store.put("e@x.com", {"name": "E"})
+            assert store.get("e@x.com") == {"name": "E"}
+            print("✓ Torn journal writes are ignored and repaired")
+            
+            store.compact()
+            store.save_all({"b@x.com": {"name": "B"}, "d@x.com": {"name": "D"}, "e@x.com": {"name": "E"}})
+            with open(store.journal_path) as f:
+                assert len(f.readlines()) == 1
+            print("✓ save_all() journals only changed records")
+            
+            for i in range(50):
+                store.put("b@x.com", {"name": "B", "visits": i})
+            assert os.path.getsize(store.journal_path) < 512
+            assert json.load(open(path))["b@x.com"]["visits"] >= 0
+            assert store.get("b@x.com")["visits"] == 49
+            print("✓ Journal compacts into the snapshot")
+        
+        from utils.storage import DocumentStore
+        
+        class IncompleteStore(DocumentStore):
+            def load_all(self):
+                return {}
+        
+        try:
+            IncompleteStore()
+            raise AssertionError("a store without put and delete should not instantiate")
+        except TypeError:
+            pass
+        print("✓ Stores must implement load_all, put and delete")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Storage engine error: {e}")
+        return False
+
+
+def test_sqlite_storage():
+    """Test SQLite storage backend and JSON migration"""
+    print("\n=== Testing SQLite Storage ===")
+    try:
+        import json
+        import os
+        import tempfile
+        from utils.sqlite_store import create_store, migrate_from_json
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            for collection in ("users", "orders", "reviews"):
+                with open(os.path.join("data", f"{collection}.json")) as src, open(os.path.join(tmp, f"{collection}.json"), "w") as dst:
+                    dst.write(src.read())
+            
+            counts = migrate_from_json(tmp)
+            print(f"✓ Migrated {counts}")
+            
+            for collection in ("users", "orders", "reviews"):
+                with open(os.path.join(tmp, f"{collection}.json")) as f:
+                    assert create_store(collection, tmp).load_all() == json.load(f), collection
+            print("✓ Migrated data matches JSON files")
+            
+            users = create_store("users", tmp)
+            users.put("new@x.com", {"name": "New", "cart": [{"id": "w001", "quantity": 1}]})
+            assert users.get("new@x.com")["cart"] == [{"id": "w001", "quantity": 1}]
+            assert users.get("missing@x.com") is None
+            
+            reviews = create_store("reviews", tmp)
+            reviews.put("w999", [{"user_email": "new@x.com", "rating": 5, "comment": "Great"}])
+            assert reviews.find_items("user_email", "new@x.com") == [("w999", {"user_email": "new@x.com", "rating": 5, "comment": "Great"})]
+            print("✓ Point lookups and indexed queries work")
+        
+        return True
+    except Exception as e:
+        print(f"✗ SQLite storage error: {e}")
+        return False
+
+
+def test_sharded_storage():
+    """Test sharded per-document storage and JSON migration"""
+    print("\n=== Testing Sharded Storage ===")
+    try:
+        import json
+        import os
+        import tempfile
+        from utils.sharded_store import create_store, migrate_from_json
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            for collection in ("users", "orders", "reviews"):
+                with open(os.path.join("data", f"{collection}.json")) as src, open(os.path.join(tmp, f"{collection}.json"), "w") as dst:
+                    dst.write(src.read())
+            
+            counts = migrate_from_json(tmp)
+            print(f"✓ Migrated {counts}")
+            for collection in ("users", "orders", "reviews"):
+                with open(os.path.join(tmp, f"{collection}.json")) as f:
+                    assert create_store(collection, tmp).load_all() == json.load(f), collection
+            try:
+                migrate_from_json(tmp)
+                raise AssertionError("second migration should refuse to overwrite")
+            except RuntimeError:
+                pass
+            print("✓ Migrated data matches JSON files")
+            
+            users = create_store("users", tmp)
+            version = users.version()
+            users.put("new@x.com", {"name": "New", "cart": [["w001", 1]]})
+            path = users._path("new@x.com")
+            assert users.get("new@x.com")["cart"] == [["w001", 1]] and users.get("missing@x.com") is None
+            assert json.load(open(path)) == {"key": "new@x.com", "value": {"name": "New", "cart": [["w001", 1]]}}
+            after_put = users.version()
+            users.delete("new@x.com")
+            assert not os.path.exists(path) and len({version, after_put, users.version()}) == 3
+            assert os.path.getsize(users.version_path) < 64
+            print("✓ Each write replaces one document file and the version token")
+
+            version = users.version()
+            before, after = users.put_versioned("new@x.com", {"name": "New", "cart": []})
+            assert before == version and after == users.version() != version
+            assert users.put_versioned("b@x.com", {"name": "B", "cart": []})[0] == after
+            assert users.get("new@x.com") == {"name": "New", "cart": []}
+            print("✓ Versioned writes report the tokens around the write")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Sharded storage error: {e}")
+        return False
+
+
+def test_review_aggregates():
+    """Test precomputed review aggregates"""
+    print("\n=== Testing Review Aggregates ===")
+    try:
+        from utils.review_manager import ReviewAggregates
+        
+        reviews = {
+            "w001": [{"user_email": "a@x.com", "rating": 5}, {"user_email": "b@x.com", "rating": 4}],
+            "m001": [{"user_email": "a@x.com", "rating": 2}],
+        }
+        aggregates = ReviewAggregates()
+        aggregates.rebuild(reviews, version=1)
+        assert aggregates.table["w001"] == {"count": 2, "sum": 9, "histogram": [0, 0, 0, 1, 1]}
+        print("✓ Aggregates rebuilt from reviews")
+        
+        aggregates.apply("w001", [4], [1], version_before=1, version_after=2)
+        aggregates.apply("m002", [], [3], version_before=2, version_after=3)
+        assert aggregates.table["w001"] == {"count": 2, "sum": 6, "histogram": [1, 0, 0, 0, 1]}
+        assert aggregates.table["m002"]["count"] == 1
+        print("✓ Incremental updates applied")
+        
+        aggregates.apply("w001", [5], [], version_before=99, version_after=100)
+        assert aggregates.version == 3 and aggregates.table["w001"]["count"] == 2 and not aggregates.built
+        print("✓ Stale updates skipped and aggregates marked for rebuild")
+        
+        import os
+        import tempfile
+        from utils.sqlite_store import create_store
+        from utils.storage import JournaledJSONStore
+        with tempfile.TemporaryDirectory() as tmp:
+            for store in (JournaledJSONStore(os.path.join(tmp, "reviews.json")), create_store("reviews", tmp)):
+                store.put("w001", reviews["w001"])
+                aggregates.rebuild(store.load_all(), store.version())
+                store.put("m001", reviews["m001"])  # Another process writes in between
+                versions = store.put_versioned("w001", reviews["w001"][:1])
+                assert versions[0] != aggregates.version
+                aggregates.apply("w001", [4], [], *versions)
+                assert not aggregates.built
+                aggregates.rebuild(store.load_all(), store.version())
+                versions = store.put_versioned("w001", reviews["w001"])
+                aggregates.apply("w001", [], [4], *versions)
+                assert aggregates.built and aggregates.version == store.version()
+                assert aggregates.table["w001"]["count"] == 2
+        print("✓ Concurrent writes detected under the store's write lock")
+        
+        from utils.review_manager import load_reviews, get_ratings_for, get_average_rating, get_review_count
+        product_ids = list(load_reviews()) + ["no-such-product"]
+        ratings = get_ratings_for(product_ids)
+        assert all(ratings[pid] == (get_average_rating(pid), get_review_count(pid)) for pid in product_ids)
+        assert ratings["no-such-product"] == (0.0, 0)
+        print(f"✓ Batch ratings for {len(product_ids)} products")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Review aggregates error: {e}")
+        return False
+
+
+def test_card_fragment_cache():
+    """Test product card HTML fragment cache"""
+    print("\n=== Testing Card Fragment Cache ===")
+    try:
+        from components import product_card
+        from utils.product_loader import get_catalog
+        
+        product = get_catalog().products[0]
+        first = product_card.get_card_html(product, 0, 4.5, 2, False)
+        assert product_card.get_card_html(product, 0, 4.5, 2, False) is first
+        assert first == product_card.build_card_html(product, 0, 4.5, 2, False)
+        print("✓ Repeated cards reuse cached HTML")
+        
+        assert "❤️" in product_card.get_card_html(product, 0, 4.5, 2, True)
+        assert product_card.get_card_html(dict(product), 0, 4.5, 2, False) is not first
+        print("✓ Changed state and foreign products are rebuilt")
+        
+        import logging
+        import os
+        from streamlit.testing.v1 import AppTest
+        
+        catalog_calls = []
+        current_catalog = product_card.get_catalog
+        product_card.get_catalog = lambda: catalog_calls.append(1) or current_catalog()
+        try:
+            assert product_card.get_card_html(product, 0, 4.5, 2, False, catalog=get_catalog()) is first
+            logging.getLogger("streamlit").setLevel(logging.ERROR)
+            at = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), default_timeout=60)
+            at.session_state["onboarding_complete"] = True
+            at.session_state["gender"] = "women"
+            at.session_state["current_page"] = "women"
+            at.run()
+            assert not at.exception, at.exception[0].message
+        finally:
+            product_card.get_catalog = current_catalog
+        assert not catalog_calls, f"{len(catalog_calls)} catalog lookups"
+        print("✓ Grid cards share the page's catalog")
+        
+        for index in range(product_card.CARD_HTML_CACHE_SIZE + 10):
+            product_card.get_card_html(product, index, 4.5, 2, False)
+        assert len(product_card._card_html_cache) == product_card.CARD_HTML_CACHE_SIZE
+        print("✓ Cache size is bounded")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Card fragment cache error: {e}")
+        return False
+
+
+def test_theme_bundle():
+    """Test compiled theme stylesheet bundles"""
+    print("\n=== Testing Theme Bundle ===")
+    try:
+        from config.theme_compiler import minify_css, compile_bundle
+        from config.theme import get_theme_bundle
+        
+        assert minify_css("/* c */ a > b ,  c { color: red ; content: ' a  b ' ; }") == "a>b,c{color:red;content:' a  b '}"
+        bundle = compile_bundle(["a { x: 1; }", "@import url('f.css?a=1;b=2');"])
+        assert bundle.css == "@import url('f.css?a=1;b=2');a{x:1}"
+        print("✓ CSS minified with imports hoisted")
+        
+        women, men = get_theme_bundle("women"), get_theme_bundle("men")
+        assert women.digest != men.digest and get_theme_bundle("women") is women
+        assert ".ai-float-btn" in women.css and "::selection" in women.css and "@keyframes shimmer" in women.css
+        assert women.html.startswith(f'<style id="werbeauty-theme-{women.digest}">')
+        print(f"✓ Theme bundles compiled ({len(women.css)} bytes)")
+        
+        import os
+        import tempfile
+        from config.theme import OVERLAY_STYLESHEETS, STYLESHEETS
+        from config.theme_compiler import read_stylesheet
+        
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                assert all(read_stylesheet(path) for path in STYLESHEETS + OVERLAY_STYLESHEETS)
+                try:
+                    read_stylesheet(os.path.join("assets", "css", "missing.css"))
+                    raise AssertionError("a missing stylesheet should raise")
+                except FileNotFoundError:
+                    pass
+            finally:
+                os.chdir(cwd)
+        print("✓ Stylesheets found from any working directory; missing ones raise")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Theme bundle error: {e}")
+        return False
+
+
+def test_recommendation_scoring():
+    """Test vectorized recommendation scoring"""
+    print("\n=== Testing Recommendation Scoring ===")
+    try:
+        from utils.product_features import ProductFeatures
+        
+        products = [
+            {"id": "a", "category": "Lips", "rating": 4.0, "popularity": 10},
+            {"id": "b", "category": "Eyes", "rating": 5.0, "popularity": 0, "badge": "New"},
+        ]
+        features = ProductFeatures(products)
+        assert features.matrix.shape == (2, 5)
+        weights = features.weights({"Lips": 30, "Unknown": 99}, rating=5, popularity=0.5, badge=8)
+        assert features.score(weights).tolist() == [30 + 20 + 5, 25 + 8]
+        print("✓ Feature matrix scores match the weighted sum")
+        
+        from utils.product_loader import get_catalog
+        catalog = get_catalog()
+        assert catalog.product_features() is catalog.product_features()
+        assert len(catalog.product_features()) == len(catalog)
+        print("✓ Catalog feature matrix built once")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Recommendation scoring error: {e}")
+        return False
+
+
+def test_similarity_index():
+    """Test precomputed item-item similarity index"""
+    print("\n=== Testing Similarity Index ===")
+    try:
+        from utils.similarity_index import SimilarityIndex
+        from utils.recommendation_engine import get_similar_products
+        from utils.product_loader import get_catalog
+        
+        products = [
+            {"id": "a", "category": "Lips", "price": 20, "rating": 4.5, "ingredients": ["Shea Butter", "Rose"]},
+            {"id": "b", "category": "Lips", "price": 25, "rating": 4.6, "ingredients": ["Shea Butter", "Rose"]},
+            {"id": "c", "category": "Lips", "price": 25, "rating": 4.6, "ingredients": ["Mica"]},
+            {"id": "d", "category": "Eyes", "price": 300, "rating": 1.0, "ingredients": ["Mica"]},
+        ]
+        index = SimilarityIndex(products, neighbors=3)
+        assert index.similar(0).tolist() == [1, 2]
+        assert index.scores[0, 0] > index.scores[0, 1] and index.neighbors[0, 2] == -1
+        print("✓ Neighbors ranked by shared features")
+        
+        import numpy as np
+        from utils import similarity_index as similarity_module
+        
+        mixed = [{"ingredients": names} for names in (["A", "B"], ["A", "C"], ["B", "C", "D"], ["D", "A"], [], ["Z"])]
+        postings = similarity_module._IngredientPostings(mixed)
+        dense = np.zeros((len(mixed), 4))
+        for row, product in enumerate(mixed):
+            for name in product["ingredients"]:
+                if name != "Z":
+                    dense[row, "ABCD".index(name)] = np.log(6 / sum(name in p["ingredients"] for p in mixed)) + 1
+        norms = np.linalg.norm(dense, axis=1, keepdims=True)
+        dense = np.divide(dense, norms, out=np.zeros_like(dense), where=norms > 0)
+        block_elements = similarity_module.SIMILARITY_BLOCK_ELEMENTS
+        try:
+            for elements in (block_elements, 2):
+                similarity_module.SIMILARITY_BLOCK_ELEMENTS = elements
+                assert np.allclose(postings.overlap(1, 5), (dense @ dense.T)[1:5], atol=1e-6)
+        finally:
+            similarity_module.SIMILARITY_BLOCK_ELEMENTS = block_elements
+        print("✓ Sparse ingredient overlap matches dense cosine similarity")
+        
+        catalog = get_catalog()
+        for product in catalog.products:
+            similar = get_similar_products(product["id"], limit=4)
+            assert len(similar) <= 4 and product not in similar
+        assert get_similar_products("does-not-exist") == []
+        print(f"✓ Similar products resolved for {len(catalog)} products")
+        
+        import threading
+        import time
+        from utils.product_catalog import ProductCatalog
+        from utils.similarity_index import rank_similar
+        
+        codes = np.array([0, 0, 0, 1])
+        price = np.array([p["price"] for p in products], dtype=float)
+        rating = np.array([p["rating"] for p in products])
+        assert rank_similar(codes, price, rating, 0, limit=3).tolist() == [1, 2]
+        
+        builds = []
+        original = similarity_module.SimilarityIndex
+        class CountingIndex(original):
+            def __init__(self, *args, **kwargs):
+                builds.append(1)
+                time.sleep(0.05)
+                super().__init__(*args, **kwargs)
+        similarity_module.SimilarityIndex = CountingIndex
+        try:
+            shared = ProductCatalog(products, [])
+            assert shared.similarity_index(wait=False) is None
+            threads = [threading.Thread(target=shared.similarity_index) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(builds) == 1 and shared.similarity_index(wait=False) is not None
+        finally:
+            similarity_module.SimilarityIndex = original
+        print("✓ Index built once in the background, scored directly until ready")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Similarity index error: {e}")
+        return False
+
+
+def test_co_purchase():
+    """Test co-purchase counting from orders"""
+    print("\n=== Testing Co-Purchase Index ===")
+    try:
+        from utils.co_purchase import CoPurchaseIndex
+        from utils.recommendation_engine import get_also_bought
+        
+        orders = {
+            "a@x.com": [
+                {"items": [{"id": "w001"}, {"id": "w002"}, {"id": "w003"}]},
+                {"items": [{"id": "w001"}, {"id": "w003"}]},
+                {"items": [{"id": "w001"}, {"id": "w009"}], "status": "Cancelled"},
+            ],
+        }
+        index = CoPurchaseIndex()
+        index.rebuild(orders, version=1)
+        assert index.top("w001", 5) == ["w003", "w002"]
+        print("✓ Co-occurrences counted, cancelled orders skipped")
+        
+        index.record([{"id": "w001"}, {"id": "w002"}], version_before=1, version_after=2)
+        index.record([{"id": "w001"}, {"id": "w002"}], version_before=2, version_after=3)
+        assert index.top("w001", 1) == ["w002"]
+        index.record([{"id": "w001"}, {"id": "w009"}], version_before=99, version_after=100)
+        assert "w009" not in index.top("w001", 5)
+        print("✓ New orders update counts incrementally")
+
+        import threading
+        index.rebuild(orders, version=0)
+        errors = []
+
+        def write_orders():
+            for n in range(2000):
+                index.record([{"id": "w001"}, {"id": f"x{n}"}], version_before=n, version_after=n + 1)
+
+        def read_rankings():
+            try:
+                for _ in range(2000):
+                    index.top("w001", 3)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write_orders)] + [threading.Thread(target=read_rankings) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors and index.top("w001", 1) == ["w003"] and len(index.top("w001", 5000)) == 2002
+        print("✓ Rankings read safely while orders are recorded")
+        
+        also_bought = get_also_bought("w002", limit=4)
+        assert len(also_bought) == 4 and all(p["id"] != "w002" for p in also_bought)
+        
+        from utils.co_purchase import get_co_purchase_index
+        from utils.product_loader import get_catalog
+        from utils.recommendation_engine import COMPLEMENT_CATEGORIES
+        catalog = get_catalog()
+        for product in catalog.products:
+            results = catalog.get_many(get_co_purchase_index().top(product["id"], 4))
+            seen = {product["id"]} | {p["id"] for p in results}
+            fallback = sorted((p for p in catalog.products
+                               if p.get("category") in COMPLEMENT_CATEGORIES.get(product.get("category", ""), [])
+                               and p["id"] not in seen), key=lambda p: p.get("rating", 0), reverse=True)
+            assert get_also_bought(product["id"], limit=4) == (results + fallback)[:4], product["id"]
+        assert catalog.top_rated_positions(["Makeup", "Skincare"]) is catalog.top_rated_positions(["Skincare", "Makeup"])
+        print("✓ Also-bought filled from purchases and complements")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Co-purchase error: {e}")
+        return False
+
+
+def test_catalog_snapshot():
+    """Test JSONL streaming and binary catalog snapshots"""
+    print("\n=== Testing Catalog Snapshot ===")
+    try:
+        import hashlib
+        import json
+        import os
+        import tempfile
+        from utils.catalog_snapshot import iter_jsonl, load_snapshot, write_snapshot
+        from utils.product_loader import get_catalog
+        
+        catalog = get_catalog()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "products.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                for product in catalog.products[:5]:
+                    f.write(json.dumps(dict(product)) + "\n\n")
+            calls = []
+            digest = hashlib.sha256()
+            streamed = list(iter_jsonl(path, progress=lambda done, total: calls.append((done, total)), digest=digest))
+            assert [p["id"] for p in streamed] == [p["id"] for p in catalog.products[:5]]
+            assert calls and calls[-1][0] == calls[-1][1] == os.path.getsize(path)
+            assert digest.hexdigest() == hashlib.sha256(open(path, "rb").read()).hexdigest()
+            print("✓ JSON Lines streamed with progress")
+            
+            snapshot_path = os.path.join(tmp, "catalog.snapshot")
+            write_snapshot(snapshot_path, catalog, ((1, 2), (3, 4)))
+            loaded = load_snapshot(snapshot_path, ((1, 2), (3, 4)))
+            assert loaded is not None and loaded.version == catalog.version
+            assert len(loaded) == len(catalog)
+            assert [dict(p) for p in loaded.products] == [dict(p) for p in catalog.products]
+            assert loaded.gender_ids == catalog.gender_ids
+            assert (loaded.columns().price == catalog.columns().price).all()
+            sample_id = catalog.products[-1]["id"]
+            assert loaded.get(sample_id)["name"] == catalog.get(sample_id)["name"]
+            stored = loaded.similarity_index(wait=False)
+            assert stored is not None and (stored.neighbors == catalog.similarity_index().neighbors).all()
+            print("✓ Snapshot round trip matches the catalog")
+            
+            from utils.product_loader import filter_product_indices
+            fresh = load_snapshot(snapshot_path, ((1, 2), (3, 4)))
+            for filters in ({"category": "Skincare", "skin_type": "Dry", "sort_by": "newest"},
+                            {"hair_type": "Curly", "price_range": (0, 100), "sort_by": "rating"}):
+                for gender in ("women", "men"):
+                    assert (filter_product_indices(filters, gender=gender, catalog=fresh).tolist()
+                            == filter_product_indices(filters, gender=gender, catalog=catalog).tolist())
+            assert fresh.product_features().categories == catalog.product_features().categories
+            assert not any(fresh.products._decoded), "filtering decoded product records"
+            print("✓ Snapshot filters from stored code columns without decoding records")
+            
+            assert load_snapshot(snapshot_path, ((1, 2), (3, 5))) is None
+            assert load_snapshot(os.path.join(tmp, "missing"), ((1, 2), (3, 4))) is None
+            with open(os.path.join(snapshot_path, "neighbors.npy"), "wb") as f:
+                f.write(b"not an array")
+            assert load_snapshot(snapshot_path, ((1, 2), (3, 4))) is None
+            os.remove(os.path.join(snapshot_path, "records.bin"))
+            assert load_snapshot(snapshot_path, ((1, 2), (3, 4))) is None
+            print("✓ Stale, missing or damaged snapshots are ignored")
+        
+        from utils import product_loader
+        saved = product_loader.PRODUCT_DATA_DIR, product_loader._snapshot
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                product_loader.PRODUCT_DATA_DIR = tmp
+                product_loader._snapshot = None
+                path = os.path.join(tmp, "women_products.jsonl")
+                good = "".join(json.dumps({"id": f"x00{i}", "name": f"X {i}", "price": 10}) + "\n" for i in range(3))
+                default_ids = [p["id"] for p in product_loader.DEFAULT_WOMEN_PRODUCTS]
+                
+                with open(path, "w") as f:
+                    f.write(good + "{bad json\n")
+                women = [p["id"] for p in get_catalog().gender_products("women")]
+                assert women == default_ids, women
+                
+                with open(path, "w") as f:
+                    f.write(good)
+                previous = get_catalog()
+                assert [p["id"] for p in previous.gender_products("women")] == ["x000", "x001", "x002"]
+                
+                for bad_line in ("{bad json", "[1, 2]"):
+                    with open(path, "w") as f:
+                        f.write(good + bad_line + "\n")
+                    try:
+                        product_loader.build_catalog()
+                        assert False, "invalid line accepted"
+                    except ValueError:
+                        pass
+                    assert get_catalog() is previous
+            print("✓ Malformed JSON Lines keep the previous catalog, never a partial one")
+        finally:
+            product_loader.PRODUCT_DATA_DIR, product_loader._snapshot = saved
+        
+        return True
+    except Exception as e:
+        print(f"✗ Catalog snapshot error: {e}")
+        return False
+
+
+def test_cart_entries():
+    """Test compact cart entries hydrated from the catalog"""
+    print("\n=== Testing Cart Entries ===")
+    try:
+        import streamlit as st
+        from utils.cart_manager import add_to_cart, get_cart, get_cart_total, merge_carts, to_cart_entries
+        from utils.recommendation_engine import VIEW_HISTORY_LIMIT, record_view
+        
+        legacy = [{"id": "w001", "name": "Old", "price": 1, "quantity": 2}, ["w002", 1], {"id": "w001", "quantity": 1}]
+        assert to_cart_entries(legacy) == [("w001", 3), ("w002", 1)]
+        assert merge_carts([["w001", 1]], [("w001", 2), ("m001", 1)]) == [("w001", 3), ("m001", 1)]
+        print("✓ Stored carts converted and merged")
+        
+        st.session_state.cart = []
+        add_to_cart({"id": "w001"}, 2)
+        add_to_cart({"id": "w001"})
+        add_to_cart({"id": "missing"})
+        assert st.session_state.cart == [("w001", 3), ("missing", 1)]
+        items = get_cart()
+        assert len(items) == 1 and items[0]["name"] and items[0]["quantity"] == 3
+        assert get_cart_total()["subtotal"] == items[0]["price"] * 3
+        st.session_state.cart = []
+        print("✓ Session keeps IDs, details come from the catalog")
+        
+        st.session_state.view_history = []
+        for i in range(VIEW_HISTORY_LIMIT + 5):
+            record_view(f"p{i}")
+        record_view("p10")
+        history = st.session_state.view_history
+        assert len(history) == VIEW_HISTORY_LIMIT and history[-1] == "p10" and history.count("p10") == 1
+        print("✓ View history keeps recent product IDs")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Cart entries error: {e}")
+        return False
+
+
+def test_write_behind():
+    """Test coalesced write-behind of user data"""
+    print("\n=== Testing Write-Behind Queue ===")
+    try:
+        import json
+        import os
+        import tempfile
+        import time
+        from utils.storage import JournaledJSONStore
+        from utils.write_behind import WriteBehindQueue
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "users.json")
+            with open(path, "w") as f:
+                json.dump({"a@x.com": {"name": "A", "cart": [], "favorites": []}}, f)
+            store = JournaledJSONStore(path)
+            queue = WriteBehindQueue(store=store, interval=60)
+            
+            for i in range(1, 21):
+                queue.enqueue("a@x.com", "cart", [["w001", i]])
+            queue.enqueue("a@x.com", "favorites", ["w002"])
+            queue.enqueue("gone@x.com", "cart", [])
+            assert store.get("a@x.com")["cart"] == []
+            assert queue.flush("a@x.com") == 1 and queue.has_pending()
+            user = store.get("a@x.com")
+            assert user["cart"] == [["w001", 20]] and user["favorites"] == ["w002"] and user["name"] == "A"
+            assert queue.flush() == 0 and not queue.has_pending()
+            print("✓ Changes coalesced into one write per user")
+            
+            queue = WriteBehindQueue(store=store, interval=0.05)
+            queue.enqueue("a@x.com", "favorites", [])
+            deadline = time.time() + 5
+            while queue.writes == 0 and time.time() < deadline:
+                time.sleep(0.02)
+            assert store.get("a@x.com")["favorites"] == [] and queue.writes == 1
+            print("✓ Background thread flushes after the interval")
+            
+            from utils.sqlite_store import create_store
+            users = create_store("users", tmp)
+            users.put("a@x.com", {"name": "A", "cart": [], "favorites": []})
+            version = users.version()
+            queue = WriteBehindQueue(store=users, interval=60)
+            queue.enqueue("a@x.com", "cart", [["w001", 2]])
+            queue.enqueue("gone@x.com", "cart", [["w001", 1]])
+            assert queue.flush() == 1 and users.version() == version + 1
+            assert users.get("a@x.com") == {"name": "A", "cart": [["w001", 2]], "favorites": []}
+            assert users.get("gone@x.com") is None and "gone@x.com" not in users.load_all()
+            print("✓ Cart-only changes use the SQLite cart table directly")
+            
+            import threading
+            from utils import storage
+            from utils.auth_manager import save_user
+            
+            class SlowStore(JournaledJSONStore):
+                def get(self, key, default=None):
+                    user = super().get(key, default)
+                    reading.set()
+                    time.sleep(0.2)
+                    return user
+            
+            reading = threading.Event()
+            slow = SlowStore(path)
+            queue = WriteBehindQueue(store=slow, interval=60)
+            queue.enqueue("a@x.com", "favorites", ["w003"])
+            flusher = threading.Thread(target=queue.flush)
+            saved_store = storage._stores.get("users")
+            storage._stores["users"] = slow
+            try:
+                flusher.start()
+                assert reading.wait(5)
+                save_user("a@x.com", {"name": "Renamed", "cart": [], "favorites": ["w003"]})
+                flusher.join()
+            finally:
+                storage._stores["users"] = saved_store
+            assert JournaledJSONStore(path).get("a@x.com")["name"] == "Renamed"
+            print("✓ Flushes do not overwrite a user saved mid-flush")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Write-behind error: {e}")
+        return False
+
+
+def test_user_memo():
+    """Test per-run memoization of the users store"""
+    print("\n=== Testing User Memo ===")
+    from utils import storage
+    saved_store = storage._stores.get("users")
+    try:
+        import json
+        import os
+        import tempfile
+        from utils import auth_manager
+        from utils.storage import JournaledJSONStore
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "users.json")
+            with open(path, "w") as f:
+                json.dump({"a@x.com": {"name": "A", "cart": []}}, f)
+            store = JournaledJSONStore(path)
+            parses = []
+            load_all = store.load_all
+            store.load_all = lambda: parses.append(1) or load_all()
+            storage._stores["users"] = store
+            
+            auth_manager.reset_user_memo()
+            for _ in range(5):
+                user = auth_manager.load_user_entry("a@x.com")["a@x.com"]
+                user["name"] = "changed"
+            assert auth_manager.load_user_entry("a@x.com")["a@x.com"]["name"] == "A"
+            auth_manager.reset_user_memo()
+            auth_manager.load_user_entry("a@x.com")
+            assert len(parses) == 1
+            print("✓ Store parsed once while unchanged")
+            
+            auth_manager.save_user("a@x.com", {"name": "B", "cart": []})
+            assert auth_manager.load_user_entry("a@x.com")["a@x.com"]["name"] == "B"
+            auth_manager.get_write_behind().store = store
+            auth_manager.get_write_behind().enqueue("a@x.com", "cart", [["w001", 1]])
+            assert auth_manager.load_user_entry("a@x.com")["a@x.com"]["cart"] == [["w001", 1]]
+            assert len(parses) == 4  # Includes the flush reading the record
+            print("✓ Writes invalidate the memo")
+            
+            from utils.sharded_store import ShardedJSONStore
+            from utils.sqlite_store import SQLiteUserStore
+            assert not store.has_point_lookup
+            assert SQLiteUserStore.has_point_lookup and ShardedJSONStore.has_point_lookup
+            sharded = ShardedJSONStore(os.path.join(tmp, "users"))
+            sharded.put("c@x.com", {"name": "C", "cart": []})
+            sharded.load_all = lambda: parses.append(1) or {}
+            storage._stores["users"] = sharded
+            assert auth_manager.load_user_entry("c@x.com")["c@x.com"]["name"] == "C"
+            assert len(parses) == 4
+            print("✓ Point-lookup stores read one user without parsing the store")
+        
+        return True
+    except Exception as e:
+        print(f"✗ User memo error: {e}")
+        return False
+    finally:
+        from utils import auth_manager
+        auth_manager.get_write_behind().store = None
+        auth_manager.reset_user_memo()
+        if saved_store is None:
+            storage._stores.pop("users", None)
+        else:
+            storage._stores["users"] = saved_store
+
+
+def test_tracing():
+    """Test rerun tracing spans and the trace log"""
+    print("\n=== Testing Tracing ===")
+    try:
+        import os
+        import tempfile
+        from utils.tracing import finish_trace, span, start_trace, summarize_trace_log, traced, write_trace_log
+        
+        @traced("outer")
+        def outer():
+            with span("inner"):
+                pass
+            with span("inner"):
+                pass
+            return 42
+        
+        assert outer() == 42 and finish_trace() is None
+        print("✓ Spans are free when no trace is active")
+        
+        start_trace("women", "session-1")
+        outer()
+        trace = finish_trace()
+        assert [(name, depth) for name, _, _, depth in trace.spans] == [("inner", 1), ("inner", 1), ("outer", 0)]
+        summary = {entry["name"]: entry for entry in trace.summary()}
+        assert summary["inner"]["calls"] == 2 and summary["outer"]["total_ms"] >= summary["inner"]["total_ms"]
+        assert trace.duration_ns > 0
+        print("✓ Nested spans recorded per rerun")
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces.jsonl")
+            write_trace_log(trace, path)
+            write_trace_log(trace, path)
+            logged = summarize_trace_log(path)
+            assert logged["reruns"] == 2 and len(logged["pages"]["women"]) == 2
+            assert logged["spans"]["inner"]["calls"] == 4
+        print("✓ Trace log written and summarized")
+        
+        import logging
+        from streamlit.testing.v1 import AppTest
+        import utils.profiling as profiling
+        
+        logging.getLogger("streamlit").setLevel(logging.ERROR)
+        allow_query = profiling.PROFILE_ALLOW_QUERY
+        panels = []
+        try:
+            for allowed in (False, True):
+                profiling.PROFILE_ALLOW_QUERY = allowed
+                at = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), default_timeout=60)
+                at.query_params["trace"] = "1"
+                at.run()
+                assert not at.exception, at.exception[0].message
+                panels.append(any("Rerun timing" in expander.label for expander in at.sidebar.expander))
+        finally:
+            profiling.PROFILE_ALLOW_QUERY = allow_query
+        assert panels == [False, True], panels
+        print("✓ ?trace=1 honoured only when WERBEAUTY_PROFILE_ALLOW_QUERY is set")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Tracing error: {e}")
+        return False
+
+
+def test_profile_capture():
+    """Test slow rerun profile captures and their rotation"""
+    print("\n=== Testing Profile Capture ===")
+    try:
+        import os
+        import pstats
+        import tempfile
+        import time
+        import tracemalloc
+        from utils.profiling import ProfileCapture, list_captures
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            with ProfileCapture("home", "fast-session", threshold_ms=10_000, directory=tmp) as capture:
+                sum(range(1000))
+            assert capture.path is None and not os.listdir(tmp)
+            print("✓ Fast reruns are not saved")
+            
+            for i in range(4):
+                with ProfileCapture("forgot_password", f"session-{i}", threshold_ms=0, directory=tmp, keep=3) as capture:
+                    data = [str(n) for n in range(20000)]
+                    time.sleep(0.002)
+                assert capture.path is not None and capture.duration_ms > 0
+            assert not tracemalloc.is_tracing()
+            stats = pstats.Stats(capture.path + ".prof")
+            assert stats.total_calls > 0
+            with open(capture.path + ".alloc.txt") as f:
+                report = f.read()
+            assert "page: forgot_password" in report and "test_app.py" in report
+            print("✓ Slow reruns saved as .prof and allocation snapshot")
+            
+            captures = list_captures(tmp)
+            assert len(captures) == 3 and len(os.listdir(tmp)) == 6
+            assert captures[0]["page"] == "forgot_password" and captures[0]["session"] == "session3"
+            print("✓ Captures tagged with page and session and rotated")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Profile capture error: {e}")
+        return False
+
+
+def test_lazy_imports():
+    """Test that startup imports only what the first page needs"""
+    print("\n=== Testing Lazy Imports ===")
+    try:
+        import subprocess
+        import sys
+        from benchmarks.import_audit import HOT_PATH_FORBIDDEN
+        
+        script = (
+            "import sys, app\n"
+            "loaded = set(sys.modules)\n"
+            "import components, utils, pages\n"
+            "assert components.render_navbar and utils.format_price and pages.home\n"
+            "print(' '.join(sorted(loaded)))\n"
+        )
+        completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=120)
+        assert completed.returncode == 0, completed.stderr.strip().splitlines()[-1]
+        loaded = set(completed.stdout.split())
+        for module in ("numpy", "utils.product_loader", "components.product_card", "components.navbar",
+                       "pages.home", "utils.email_manager"):
+            assert module not in loaded, f"{module} imported at startup"
+        print("✓ Catalog, components and pages load on first use")
+        
+        assert not any(module.split(".")[0] in HOT_PATH_FORBIDDEN for module in loaded)
+        print("✓ No forbidden heavy dependencies at startup")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Lazy imports error: {e}")
+        return False
+
+
 def main():
     """Run all tests"""
     print("=" * 60)
@@ -157,6 +1232,25 @@ def main():
     results.append(("Components", test_components()))
     results.append(("Utility Functions", test_utility_functions()))
     results.append(("Product Loading", test_product_loading()))
+    results.append(("Product Catalog", test_product_catalog()))
+    results.append(("Filter Engine", test_filter_engine()))
+    results.append(("Search Index", test_search_index()))
+    results.append(("Storage Engine", test_storage_engine()))
+    results.append(("SQLite Storage", test_sqlite_storage()))
+    results.append(("Sharded Storage", test_sharded_storage()))
+    results.append(("Review Aggregates", test_review_aggregates()))
+    results.append(("Card Fragment Cache", test_card_fragment_cache()))
+    results.append(("Theme Bundle", test_theme_bundle()))
+    results.append(("Recommendation Scoring", test_recommendation_scoring()))
+    results.append(("Similarity Index", test_similarity_index()))
+    results.append(("Co-Purchase Index", test_co_purchase()))
+    results.append(("Catalog Snapshot", test_catalog_snapshot()))
+    results.append(("Cart Entries", test_cart_entries()))
+    results.append(("Write-Behind Queue", test_write_behind()))
+    results.append(("User Memo", test_user_memo()))
+    results.append(("Tracing", test_tracing()))
+    results.append(("Profile Capture", test_profile_capture()))
+    results.append(("Lazy Imports", test_lazy_imports()))
     
     print("\n" + "=" * 60)
     print("Test Results Summary")
@@ -1,10 +1,34 @@
 """
 Utilities package for WERBEAUTY application. 
+
+Helpers are imported on first use (PEP 562), so importing one utility
+module does not load the product catalog, NumPy and every manager.
 """
 
-from .cart_manager import add_to_cart, remove_from_cart, update_quantity, get_cart, clear_cart, is_in_cart, get_cart_total
-from .favorites_manager import add_to_favorites, remove_from_favorites, get_favorites, is_favorite, clear_favorites
-from .product_loader import load_women_products, load_men_products, get_product_by_id, filter_products, search_products
-from .recommendation_engine import get_recommendations, get_trending, get_similar_products
-from .helpers import format_price, generate_order_id, validate_email, validate_card_number
-from .animation import get_animation_css, get_loading_skeleton
\ No newline at end of file
+import importlib
+
+_EXPORTS = {
+    **dict.fromkeys(["add_to_cart", "remove_from_cart", "update_quantity", "get_cart", "clear_cart",
+                     "is_in_cart", "get_cart_total"], ".cart_manager"),
+    **dict.fromkeys(["add_to_favorites", "remove_from_favorites", "get_favorites", "is_favorite",
+                     "clear_favorites"], ".favorites_manager"),
+    **dict.fromkeys(["load_women_products", "load_men_products", "get_catalog", "get_product_by_id",
+                     "filter_products", "search_products"], ".product_loader"),
+    **dict.fromkeys(["get_recommendations", "get_trending", "get_similar_products"], ".recommendation_engine"),
+    **dict.fromkeys(["format_price", "generate_order_id", "validate_email", "validate_card_number"], ".helpers"),
+    **dict.fromkeys(["get_animation_css", "get_loading_skeleton"], ".animation"),
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -4,14 +4,17 @@ Handles user login, signup, and session management.
 """
 
 import streamlit as st
-import json
+import copy
 import hashlib
-import os
 import secrets
 import string
+import threading
 from datetime import datetime, timedelta
 from typing import Optional, Dict
-from utils.email_manager import send_password_reset_email
+from utils.storage import get_store
+from utils.write_behind import get_write_behind, user_lock
+from utils.cart_manager import merge_carts, to_cart_entries
+from utils.tracing import traced
 
 
 def hash_password(password: str) -> str:
@@ -27,38 +30,111 @@ def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
 
 
-def load_users() -> Dict:
+# Last parse of the users store, shared by all runs: (store version, users)
+_users_cache: Optional[tuple] = None
+
+# Users memoized for the current script run: (write count, users)
+_run_memo = threading.local()
+
+# User records written by this process
+_user_writes = 0
+_user_writes_lock = threading.Lock()
+
+
+def reset_user_memo() -> None:
+    """
+    Start a new per-run memo of the users store.
+    Call this at the start of every script run.
+    """
+    _run_memo.users = None
+
+
+def _count_user_write() -> None:
+    """Invalidate memoized users after a write."""
+    global _user_writes
+    with _user_writes_lock:
+        _user_writes += 1
+
+
+def _memoized_users() -> Dict:
     """
-    Load users from JSON file.
+    Get the parsed users store, shared and read-only.
+    
+    The store is parsed at most once per script run, and only when its
+    version changed since the last parse by any run. Writes made by this
+    process, including background cart/favorites flushes, invalidate the
+    run's memo.
     
     Returns:
-        Dictionary of users
+        Dictionary of users; callers must copy before changing it
+    """
+    global _users_cache
+    
+    write_count = (_user_writes, get_write_behind().writes)
+    memo = getattr(_run_memo, "users", None)
+    if memo is not None and memo[0] == write_count:
+        return memo[1]
+    
+    store = get_store("users")
+    version = store.version()
+    cache = _users_cache
+    if version is None or cache is None or cache[0] != version:
+        cache = (version, store.load_all())
+        if version is not None:
+            _users_cache = cache
+    _run_memo.users = (write_count, cache[1])
+    return cache[1]
+
+
+@traced()
+def load_user_entry(email: str) -> Dict:
     """
-    users_file = "data/users.json"
+    Load a single user with a point lookup.
+    
+    Backends without a point lookup (the JSON store) read the user from
+    the memoized parse of the store and copy only that user.
+    
+    Args:
+        email: User email
     
-    if os.path.exists(users_file):
-        with open(users_file, 'r') as f:
-            return json.load(f)
+    Returns:
+        Dictionary {email: user}, or an empty dictionary if the user does not exist
+    """
+    get_write_behind().flush(email)
+    store = get_store("users")
+    if store.has_point_lookup:
+        user = store.get(email)
     else:
-        # Create empty users file
-        os.makedirs("data", exist_ok=True)
-        with open(users_file, 'w') as f:
-            json.dump({}, f)
-        return {}
+        user = copy.deepcopy(_memoized_users().get(email))
+    return {email: user} if user is not None else {}
 
 
+@traced()
 def save_users(users: Dict) -> None:
     """
-    Save users to JSON file.
+    Save users to the user store.
+    
+    Only users whose data changed are written.
     
     Args:
         users: Dictionary of users
     """
-    users_file = "data/users.json"
-    os.makedirs("data", exist_ok=True)
+    get_store("users").save_all(users)
+    _count_user_write()
+
+
+@traced()
+def save_user(email: str, user: Dict) -> None:
+    """
+    Save a single user's record.
     
-    with open(users_file, 'w') as f:
-        json.dump(users, f, indent=2)
+    Args:
+        email: User email
+        user: User data dictionary
+    """
+    with user_lock(email):
+        get_store("users").put(email, user)
+    _count_user_write()
 
 
 def signup_user(email: str, password: str, name: str, gender: str = "Female") -> tuple[bool, str]:
@@ -74,7 +150,7 @@ def signup_user(email: str, password: str, name: str, gender: str = "Female") ->
     Returns:
         Tuple of (success, message)
     """
-    users = load_users()
+    users = load_user_entry(email)
     
     # Check if email already exists
     if email in users:
@@ -110,7 +186,7 @@ def signup_user(email: str, password: str, name: str, gender: str = "Female") ->
         "favorites": []
     }
     
-    save_users(users)
+    save_user(email, users[email])
     return True, "Account created successfully! Please login."
 
 
@@ -125,7 +201,7 @@ def login_user(email: str, password: str) -> tuple[bool, str, Optional[Dict]]:
     Returns:
         Tuple of (success, message, user_data)
     """
-    users = load_users()
+    users = load_user_entry(email)
     
     # Check if email exists
     if email not in users:
@@ -146,16 +222,8 @@ def login_user(email: str, password: str) -> tuple[bool, str, Optional[Dict]]:
         users[email]["favorites"] = []
     
     # Merge session items with user's stored items
-    # For cart: merge items, avoiding duplicates
-    for session_item in session_cart:
-        found = False
-        for user_item in users[email]["cart"]:
-            if user_item["id"] == session_item["id"]:
-                user_item["quantity"] += session_item["quantity"]
-                found = True
-                break
-        if not found:
-            users[email]["cart"].append(session_item)
+    # For cart: add up quantities of the same product
+    users[email]["cart"] = merge_carts(users[email]["cart"], session_cart)
     
     # For favorites: merge IDs, avoiding duplicates
     for fav_id in session_favorites:
@@ -163,10 +231,10 @@ def login_user(email: str, password: str) -> tuple[bool, str, Optional[Dict]]:
             users[email]["favorites"].append(fav_id)
     
     # Save merged data
-    save_users(users)
+    save_user(email, users[email])
     
     # Load user's cart and favorites into session
-    st.session_state["cart"] = users[email]["cart"]
+    st.session_state["cart"] = to_cart_entries(users[email]["cart"])
     st.session_state["favorites"] = users[email]["favorites"]
     
     return True, "Login successful!", users[email]
@@ -179,11 +247,10 @@ def logout_user() -> None:
     # Save cart and favorites to user account before logout
     email = get_current_user_email()
     if email:
-        users = load_users()
-        if email in users:
-            users[email]["cart"] = st.session_state.get("cart", [])
-            users[email]["favorites"] = st.session_state.get("favorites", [])
-            save_users(users)
+        queue = get_write_behind()
+        queue.enqueue(email, "cart", list(st.session_state.get("cart", [])))
+        queue.enqueue(email, "favorites", list(st.session_state.get("favorites", [])))
+        queue.flush(email)
     
     if "user" in st.session_state:
         del st.session_state["user"]
@@ -232,7 +299,7 @@ def update_user_profile(email: str, profile_data: Dict) -> tuple[bool, str]:
     Returns:
         Tuple of (success, message)
     """
-    users = load_users()
+    users = load_user_entry(email)
     
     if email not in users:
         return False, "User not found."
@@ -245,7 +312,7 @@ def update_user_profile(email: str, profile_data: Dict) -> tuple[bool, str]:
             else:
                 users[email]["profile"][key] = value
     
-    save_users(users)
+    save_user(email, users[email])
     
     # Update session state
     if "user" in st.session_state:
@@ -265,7 +332,7 @@ def update_user_preferences(email: str, preferences: Dict) -> tuple[bool, str]:
     Returns:
         Tuple of (success, message)
     """
-    users = load_users()
+    users = load_user_entry(email)
     
     if email not in users:
         return False, "User not found."
@@ -274,7 +341,7 @@ def update_user_preferences(email: str, preferences: Dict) -> tuple[bool, str]:
     for key, value in preferences.items():
         users[email]["preferences"][key] = value
     
-    save_users(users)
+    save_user(email, users[email])
     
     # Update session state
     if "user" in st.session_state:
@@ -295,7 +362,7 @@ def change_password(email: str, old_password: str, new_password: str) -> tuple[b
     Returns:
         Tuple of (success, message)
     """
-    users = load_users()
+    users = load_user_entry(email)
     
     if email not in users:
         return False, "User not found."
@@ -310,7 +377,7 @@ def change_password(email: str, old_password: str, new_password: str) -> tuple[b
     
     # Update password
     users[email]["password"] = hash_password(new_password)
-    save_users(users)
+    save_user(email, users[email])
     
     return True, "Password changed successfully!"
 
@@ -319,28 +386,37 @@ def sync_cart_to_user() -> None:
     """
     Sync current session cart to user account.
     Call this after cart operations when user is logged in.
+    
+    The cart is queued and written in the background together with any
+    other changes made within the write-behind interval.
     """
     email = get_current_user_email()
     if email:
-        users = load_users()
-        if email in users:
-            users[email]["cart"] = st.session_state.get("cart", [])
-            save_users(users)
+        get_write_behind().enqueue(email, "cart", list(st.session_state.get("cart", [])))
 
 
 def sync_favorites_to_user() -> None:
     """
     Sync current session favorites to user account.
     Call this after favorites operations when user is logged in.
+    
+    Favorites are queued like the cart in sync_cart_to_user().
     """
     email = get_current_user_email()
     if email:
-        users = load_users()
-        if email in users:
-            users[email]["favorites"] = st.session_state.get("favorites", [])
-            save_users(users)
+        get_write_behind().enqueue(email, "favorites", list(st.session_state.get("favorites", [])))
+
+
+def flush_user_data() -> None:
+    """
+    Write the current user's queued cart and favorites changes now.
+    """
+    email = get_current_user_email()
+    if email:
+        get_write_behind().flush(email)
 
 
+@traced()
 def load_user_data_to_session() -> None:
     """
     Load user's cart and favorites from account into session.
@@ -348,7 +424,7 @@ def load_user_data_to_session() -> None:
     """
     email = get_current_user_email()
     if email:
-        users = load_users()
+        users = load_user_entry(email)
         if email in users:
             # Initialize if missing
             if "cart" not in users[email]:
@@ -356,7 +432,7 @@ def load_user_data_to_session() -> None:
             if "favorites" not in users[email]:
                 users[email]["favorites"] = []
             
-            st.session_state["cart"] = users[email]["cart"]
+            st.session_state["cart"] = to_cart_entries(users[email]["cart"])
             st.session_state["favorites"] = users[email]["favorites"]
 
 
@@ -386,7 +462,7 @@ def initiate_password_reset(email: str) -> tuple[bool, str]:
     Returns:
         Tuple of (success, message)
     """
-    users = load_users()
+    users = load_user_entry(email)
     
     # Check if email exists
     if email not in users:
@@ -400,9 +476,10 @@ def initiate_password_reset(email: str) -> tuple[bool, str]:
     users[email]["temp_password"] = hash_password(temp_password)
     users[email]["temp_password_expires"] = (datetime.now() + timedelta(hours=1)).isoformat()
     
-    save_users(users)
+    save_user(email, users[email])
     
-    # Send email with temporary password
+    # Send email with temporary password (smtplib and email.mime load only here)
+    from utils.email_manager import send_password_reset_email
     user_name = users[email].get("name", "User")
     success, message = send_password_reset_email(email, temp_password, user_name)
     
@@ -423,7 +500,7 @@ def login_with_temp_password(email: str, temp_password: str) -> tuple[bool, str,
     Returns:
         Tuple of (success, message, user_data)
     """
-    users = load_users()
+    users = load_user_entry(email)
     
     # Check if email exists
     if email not in users:
@@ -440,7 +517,7 @@ def login_with_temp_password(email: str, temp_password: str) -> tuple[bool, str,
             # Clean up expired temp password
             del users[email]["temp_password"]
             del users[email]["temp_password_expires"]
-            save_users(users)
+            save_user(email, users[email])
             return False, "Temporary password has expired. Please request a new password reset.", None
     
     # Verify temporary password
@@ -451,7 +528,7 @@ def login_with_temp_password(email: str, temp_password: str) -> tuple[bool, str,
     del users[email]["temp_password"]
     if "temp_password_expires" in users[email]:
         del users[email]["temp_password_expires"]
-    save_users(users)
+    save_user(email, users[email])
     
     # Merge session cart and favorites (same as regular login)
     session_cart = st.session_state.get("cart", [])
@@ -462,23 +539,15 @@ def login_with_temp_password(email: str, temp_password: str) -> tuple[bool, str,
     if "favorites" not in users[email]:
         users[email]["favorites"] = []
     
-    for session_item in session_cart:
-        found = False
-        for user_item in users[email]["cart"]:
-            if user_item["id"] == session_item["id"]:
-                user_item["quantity"] += session_item["quantity"]
-                found = True
-                break
-        if not found:
-            users[email]["cart"].append(session_item)
+    users[email]["cart"] = merge_carts(users[email]["cart"], session_cart)
     
     for fav_id in session_favorites:
         if fav_id not in users[email]["favorites"]:
             users[email]["favorites"].append(fav_id)
     
-    save_users(users)
+    save_user(email, users[email])
     
-    st.session_state["cart"] = users[email]["cart"]
+    st.session_state["cart"] = to_cart_entries(users[email]["cart"])
     st.session_state["favorites"] = users[email]["favorites"]
     
     return True, "Login successful! Please change your password immediately in your profile settings.", users[email]
@@ -496,7 +565,7 @@ def verify_temp_password_and_login(email: str, password: str) -> tuple[bool, str
     Returns:
         Tuple of (success, message, user_data)
     """
-    users = load_users()
+    users = load_user_entry(email)
     
     if email not in users:
         return False, "Email not found. Please sign up first.", None
@@ -4,6 +4,7 @@ Handles cart operations using session state.
 """
 
 import streamlit as st
+from typing import List, Tuple
 
 
 def sync_cart():
@@ -15,11 +16,84 @@ def sync_cart():
         pass  # User not logged in or sync failed
 
 
+# Product fields copied into hydrated cart items
+CART_ITEM_FIELDS = ("id", "name", "price", "image", "brand", "category")
+
+
+def to_cart_entries(items) -> List[Tuple[str, int]]:
+    """
+    Convert stored cart items to compact (product ID, quantity) entries.
+    
+    Accepts entries, [id, quantity] lists read back from JSON and the
+    older item dictionaries; repeated products are merged.
+    
+    Args:
+        items: Cart items in any stored format
+    
+    Returns:
+        List of (product ID, quantity) tuples in first-seen order
+    """
+    quantities = {}
+    for item in items or []:
+        if isinstance(item, dict):
+            product_id, quantity = item.get("id"), item.get("quantity", 1)
+        else:
+            product_id, quantity = item
+        if product_id:
+            quantities[product_id] = quantities.get(product_id, 0) + int(quantity)
+    return list(quantities.items())
+
+
+def merge_carts(stored, session) -> List[Tuple[str, int]]:
+    """
+    Merge a session cart into a stored cart, adding up quantities.
+    
+    Args:
+        stored: Cart items saved on the user account
+        session: Cart items from the current session
+    
+    Returns:
+        Merged list of (product ID, quantity) entries
+    """
+    return to_cart_entries(to_cart_entries(stored) + to_cart_entries(session))
+
+
+def get_cart_entries() -> List[Tuple[str, int]]:
+    """Get the session cart as (product ID, quantity) entries."""
+    cart = st.session_state.get("cart")
+    if cart is None or any(not isinstance(item, tuple) for item in cart):
+        cart = to_cart_entries(cart)
+        st.session_state.cart = cart
+    return cart
+
+
+def get_cart_ids() -> List[str]:
+    """Get the IDs of the products in the cart."""
+    return [product_id for product_id, _ in get_cart_entries()]
+
+
 def get_cart():
-    """Get the current cart from session state."""
-    if "cart" not in st.session_state:
-        st.session_state.cart = []
-    return st.session_state.cart
+    """
+    Get the cart items with their product details.
+    
+    Session state holds only product IDs and quantities; names, prices
+    and images are read from the shared catalog. Products no longer in
+    the catalog are left out.
+    
+    Returns:
+        List of item dictionaries with product fields and quantity
+    """
+    # Imported here so login and account pages don't load the catalog
+    from utils.product_loader import get_catalog
+    catalog = get_catalog()
+    items = []
+    for product_id, quantity in get_cart_entries():
+        product = catalog.get(product_id)
+        if product is not None:
+            item = {field: product.get(field, "") for field in CART_ITEM_FIELDS}
+            item["quantity"] = quantity
+            items.append(item)
+    return items
 
 
 def add_to_cart(product, quantity=1):
@@ -30,26 +104,7 @@ def add_to_cart(product, quantity=1):
         product: Product dictionary containing product details
         quantity: Quantity to add (default: 1)
     """
-    cart = get_cart()
-    
-    # Check if product already exists in cart
-    for item in cart:
-        if item["id"] == product["id"]:
-            item["quantity"] += quantity
-            st.session_state.cart = cart
-            return
-    
-    # Add new product to cart
-    cart_item = {
-        "id": product["id"],
-        "name": product["name"],
-        "price": product["price"],
-        "image": product.get("image", ""),
-        "brand": product.get("brand", ""),
-        "quantity": quantity
-    }
-    cart.append(cart_item)
-    st.session_state.cart = cart
+    st.session_state.cart = merge_carts(get_cart_entries(), [(product["id"], quantity)])
     sync_cart()
 
 
@@ -60,8 +115,7 @@ def remove_from_cart(product_id):
     Args:
         product_id: ID of the product to remove
     """
-    cart = get_cart()
-    st.session_state.cart = [item for item in cart if item["id"] != product_id]
+    st.session_state.cart = [entry for entry in get_cart_entries() if entry[0] != product_id]
     sync_cart()
 
 
@@ -73,15 +127,13 @@ def update_quantity(product_id, quantity):
         product_id: ID of the product
         quantity: New quantity
     """
-    cart = get_cart()
-    for item in cart:
-        if item["id"] == product_id:
-            if quantity <= 0:
-                remove_from_cart(product_id)
-            else:
-                item["quantity"] = quantity
-            break
-    st.session_state.cart = cart
+    if quantity <= 0:
+        remove_from_cart(product_id)
+        return
+    st.session_state.cart = [
+        (item_id, quantity if item_id == product_id else item_quantity)
+        for item_id, item_quantity in get_cart_entries()
+    ]
     sync_cart()
 
 
@@ -101,8 +153,7 @@ def is_in_cart(product_id):
     Returns:
         bool: True if product is in cart, False otherwise
     """
-    cart = get_cart()
-    return any(item["id"] == product_id for item in cart)
+    return any(item_id == product_id for item_id, _ in get_cart_entries())
 
 
 def get_cart_total():
@@ -147,5 +198,4 @@ def get_cart_count():
     Returns:
         int: Total item count
     """
-    cart = get_cart()
-    return sum(item["quantity"] for item in cart)
+    return sum(quantity for _, quantity in get_cart_entries())
@@ -0,0 +1,241 @@
+"""
+Streaming catalog loading and binary snapshots for WERBEAUTY.
+Reads JSON Lines product files incrementally and stores a memory-mapped
+snapshot of the catalog for fast cold starts.
+"""
+
+import json
+import os
+import shutil
+from collections.abc import Sequence
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from utils.filter_engine import FilterEngine
+from utils.product_catalog import ProductCatalog
+from utils.product_record import Product, ProductColumns
+from utils.similarity_index import SimilarityIndex
+
+
+SNAPSHOT_FORMAT = 3
+SNAPSHOT_DIRNAME = "catalog.snapshot"
+
+# Report streaming progress every this many bytes
+PROGRESS_INTERVAL_BYTES = 1 << 20
+
+# Called with (bytes read, total bytes)
+ProgressCallback = Callable[[int, int], None]
+
+
+def iter_jsonl(path: str, progress: Optional[ProgressCallback] = None, digest=None) -> Iterator[Dict]:
+    """
+    Stream product dictionaries from a JSON Lines file.
+
+    Only one line is held in memory at a time. Blank lines are skipped.
+    A line that is not a JSON object raises ValueError, after every
+    earlier product has been yielded.
+
+    Args:
+        path: File with one JSON object per line
+        progress: Optional callback receiving (bytes read, total bytes)
+        digest: Optional hashlib object updated with every raw line
+
+    Yields:
+        Product dictionaries in file order
+    """
+    total = os.path.getsize(path)
+    done = 0
+    reported = 0
+    with open(path, "rb") as f:
+        for line_number, line in enumerate(f, 1):
+            done += len(line)
+            if digest is not None:
+                digest.update(line)
+            if line.strip():
+                try:
+                    product = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from e
+                if not isinstance(product, dict):
+                    raise ValueError(f"{path}:{line_number}: expected a JSON object")
+                yield product
+            if progress is not None and done - reported >= PROGRESS_INTERVAL_BYTES:
+                progress(done, total)
+                reported = done
+    if progress is not None:
+        progress(done, total)
+
+
+class SnapshotProducts(Sequence):
+    """
+    Product records decoded on demand from a snapshot's record blob.
+
+    Each record is parsed the first time it is accessed and then kept.
+    """
+
+    def __init__(self, records: np.ndarray, offsets: np.ndarray):
+        """
+        Args:
+            records: uint8 array holding every product's JSON back to back
+            offsets: int64 array of n + 1 record boundaries
+        """
+        self._records = records
+        self._offsets = offsets
+        self._decoded: List[Optional[Product]] = [None] * (len(offsets) - 1)
+
+    def __len__(self) -> int:
+        return len(self._decoded)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        product = self._decoded[index]
+        if product is None:
+            if index < 0:
+                index += len(self)
+            start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+            product = Product(json.loads(self._records[start:end].tobytes()))
+            self._decoded[index] = product
+        return product
+
+
+def write_snapshot(directory: str, catalog: ProductCatalog, source_version) -> None:
+    """
+    Write a binary snapshot of a catalog.
+
+    The snapshot directory holds the numeric and filter code columns and
+    the similarity neighbors as .npy arrays, all product records as one
+    JSON blob with an offsets table, and the index columns, filter
+    vocabularies and source version in index.json. The similarity index is built here if needed, so the app
+    never runs the O(n²) build for a catalog opened from a snapshot. It is
+    written to a temporary directory and renamed into place.
+
+    Args:
+        directory: Snapshot directory, e.g. data/catalog.snapshot
+        catalog: Catalog to store
+        source_version: Version of the source files the catalog was read from
+    """
+    tmp_dir = directory + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    genders = {}
+    for gender, ids in catalog.gender_ids.items():
+        for product_id in ids:
+            genders[product_id] = gender
+
+    offsets = np.zeros(len(catalog) + 1, dtype=np.int64)
+    ids, categories, badges = [], [], []
+    with open(os.path.join(tmp_dir, "records.bin"), "wb") as f:
+        for position, product in enumerate(catalog.products):
+            record = json.dumps(dict(product), separators=(",", ":")).encode("utf-8")
+            f.write(record)
+            offsets[position + 1] = offsets[position] + len(record)
+            ids.append(product.get("id"))
+            categories.append(product.get("category", ""))
+            badges.append(product.get("badge", ""))
+    np.save(os.path.join(tmp_dir, "offsets.npy"), offsets)
+
+    columns = catalog.columns()
+    for name in ("price", "rating", "popularity", "has_badge"):
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(columns, name))
+
+    engine = catalog.filter_engine()
+    for name in ("category_codes", "skin_type_codes", "hair_type_codes", "id_rank"):
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(engine, name))
+
+    similarity = catalog.similarity_index()
+    np.save(os.path.join(tmp_dir, "neighbors.npy"), similarity.neighbors)
+    np.save(os.path.join(tmp_dir, "scores.npy"), similarity.scores)
+
+    index = {
+        "format": SNAPSHOT_FORMAT,
+        "version": catalog.version,
+        "source_version": source_version,
+        "ids": ids,
+        "genders": [genders[product_id] for product_id in ids],
+        "categories": categories,
+        "badges": badges,
+        "filter_vocabularies": {
+            "categories": engine.categories,
+            "skin_types": engine.skin_types,
+            "hair_types": engine.hair_types,
+        },
+    }
+    with open(os.path.join(tmp_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    old_dir = directory + ".old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(directory):
+        os.replace(directory, old_dir)
+    os.replace(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def load_snapshot(directory: str, source_version) -> Optional[ProductCatalog]:
+    """
+    Open a binary snapshot if it matches the current source files.
+
+    Numeric and filter columns, similarity neighbors and the record blob
+    are memory-mapped; products are decoded only when accessed, so
+    filtering and recommendations need no record decoding at all. A
+    missing or damaged file makes the snapshot unusable rather than
+    raising, so the catalog is read from the product files instead.
+
+    Args:
+        directory: Snapshot directory
+        source_version: Version of the current source files
+
+    Returns:
+        ProductCatalog, or None if there is no usable snapshot
+    """
+    index_path = os.path.join(directory, "index.json")
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("format") != SNAPSHOT_FORMAT or index.get("source_version") != _jsonable(source_version):
+        return None
+
+    def mapped(name: str) -> np.ndarray:
+        return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+    try:
+        record_path = os.path.join(directory, "records.bin")
+        if os.path.getsize(record_path):
+            records = np.memmap(record_path, dtype=np.uint8, mode="r")
+        else:
+            records = np.empty(0, dtype=np.uint8)
+        offsets = mapped("offsets")
+        if len(offsets) != len(index["ids"]) + 1 or (len(offsets) and offsets[-1] != len(records)):
+            raise ValueError("record offsets do not match records.bin")
+        arrays = {name: mapped(name) for name in ("price", "rating", "popularity", "has_badge", "category_codes",
+                                                  "skin_type_codes", "hair_type_codes", "id_rank",
+                                                  "neighbors", "scores")}
+        if any(len(array) != len(index["ids"]) for array in arrays.values()):
+            raise ValueError("column lengths do not match the product count")
+        columns = ProductColumns.from_arrays(arrays["price"], arrays["rating"], arrays["popularity"],
+                                             arrays["has_badge"])
+        vocabularies = index["filter_vocabularies"]
+        engine = FilterEngine.from_arrays(
+            columns, vocabularies["categories"], arrays["category_codes"],
+            vocabularies["skin_types"], arrays["skin_type_codes"],
+            vocabularies["hair_types"], arrays["hair_type_codes"], arrays["id_rank"],
+        )
+        return ProductCatalog.from_columns(
+            SnapshotProducts(records, offsets),
+            index["ids"], index["genders"], index["categories"], index["badges"],
+            version=index["version"], columns=columns, filter_engine=engine,
+            similarity_index=SimilarityIndex.from_arrays(arrays["neighbors"], arrays["scores"]),
+        )
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unusable catalog snapshot {directory}: {e}")
+        return None
+
+
+def _jsonable(value):
+    """Normalize tuples to lists so versions compare equal after a JSON round trip."""
+    return json.loads(json.dumps(value))
@@ -0,0 +1,110 @@
+"""
+Co-purchase index for WERBEAUTY.
+Counts how often products are bought in the same order.
+"""
+
+import threading
+from typing import Dict, Iterable, List
+
+from utils.storage import get_store
+
+
+class CoPurchaseIndex:
+    """
+    Sparse product-product co-occurrence counts over order line items.
+
+    One instance is shared by the whole process. It is rebuilt from the
+    order store when the store's version changes, and updated in place
+    when create_order writes an order. Cancelled orders are not counted.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.version = None
+        self.built = False
+        self.lock = threading.Lock()
+        self._ranked: Dict[str, List[str]] = {}
+
+    def rebuild(self, orders: Dict, version) -> None:
+        """
+        Recount every order.
+
+        Args:
+            orders: Dictionary of user email to order list
+            version: Store version the orders were read at
+        """
+        self.counts = {}
+        self._ranked = {}
+        for user_orders in orders.values():
+            for order in user_orders:
+                if order.get("status") != "Cancelled":
+                    self._add(order.get("items", []))
+        self.version = version
+        self.built = True
+
+    def _add(self, items: Iterable[Dict]) -> None:
+        product_ids = list(dict.fromkeys(item.get("id") for item in items if item.get("id")))
+        for product_id in product_ids:
+            related = self.counts.setdefault(product_id, {})
+            for other_id in product_ids:
+                if other_id != product_id:
+                    related[other_id] = related.get(other_id, 0) + 1
+            self._ranked.pop(product_id, None)
+
+    def record(self, items: List[Dict], version_before, version_after) -> None:
+        """
+        Count one newly written order.
+
+        The order is only applied if the index matches the store version
+        read right before the write (under the store's write lock);
+        otherwise another writer's order is missing, so the index is marked
+        stale and rebuilt on next read.
+
+        Args:
+            items: Order line items
+            version_before: Store version right before the write, or None if unknown
+            version_after: Store version after the write
+        """
+        with self.lock:
+            if not self.built or version_before is None or self.version != version_before:
+                self.built = False
+                return
+            self._add(items)
+            self.version = version_after
+
+    def top(self, product_id: str, limit: int) -> List[str]:
+        """
+        Get the products most often bought with a product.
+
+        Args:
+            product_id: ID of the reference product
+            limit: Maximum number of product IDs to return
+
+        Returns:
+            Product IDs, most frequent first (ties by ID)
+        """
+        with self.lock:
+            ranked = self._ranked.get(product_id)
+            if ranked is None:
+                related = self.counts.get(product_id, {})
+                ranked = sorted(related, key=lambda other_id: (-related[other_id], other_id))
+                self._ranked[product_id] = ranked
+            return ranked[:limit]
+
+
+_index = CoPurchaseIndex()
+
+
+def get_co_purchase_index() -> CoPurchaseIndex:
+    """
+    Get the co-purchase index, rebuilding it if the order store changed.
+
+    Returns:
+        Shared CoPurchaseIndex instance
+    """
+    store = get_store("orders")
+    version = store.version()
+    with _index.lock:
+        if not _index.built or version is None or _index.version != version:
+            _index.rebuild(store.load_all(), version)
+    return _index
@@ -0,0 +1,227 @@
+"""
+Columnar filter and sort engine for WERBEAUTY.
+Evaluates product filters as NumPy masks and returns index arrays.
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+
+ALL_SKIN_TYPES = "All Skin Types"
+ALL_HAIR_TYPES = "All Hair Types"
+
+# Sort key column and direction for each SORT_OPTIONS key
+SORT_COLUMNS = {
+    "price_low": ("price", False),
+    "price_high": ("price", True),
+    "rating": ("rating", True),
+    "popularity": ("popularity", True),
+    "newest": ("id_rank", True),
+}
+
+
+def _encode(values: Sequence[str]) -> tuple:
+    """
+    Dictionary-encode a column of strings.
+
+    Args:
+        values: String values, one per product
+
+    Returns:
+        Tuple of (vocabulary list, int32 code array)
+    """
+    vocabulary: Dict[str, int] = {}
+    codes = np.fromiter(
+        (vocabulary.setdefault(value, len(vocabulary)) for value in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return list(vocabulary), codes
+
+
+def top_k(keys: np.ndarray, k: int) -> np.ndarray:
+    """
+    Get the positions of the k smallest keys in stable sorted order.
+
+    Uses argpartition so only the selected keys are fully sorted; ties are
+    broken by position, matching a stable sort of the whole array.
+
+    Args:
+        keys: Sort keys (ascending)
+        k: Number of positions to return
+
+    Returns:
+        Array of positions into keys
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= len(keys):
+        return np.argsort(keys, kind="stable")
+
+    threshold = keys[np.argpartition(keys, k - 1)[k - 1]]
+    better = np.flatnonzero(keys < threshold)
+    ties = np.flatnonzero(keys == threshold)[: k - len(better)]
+    chosen = np.sort(np.concatenate([better, ties]))
+    return chosen[np.argsort(keys[chosen], kind="stable")]
+
+
+class FilterEngine:
+    """
+    Struct-of-arrays view of a product list for vectorized filtering.
+
+    Numeric fields are stored as NumPy arrays and string fields as
+    dictionary-encoded integer codes, so a whole filters dict evaluates
+    to a single boolean mask without touching product dictionaries.
+    """
+
+    def __init__(self, products: List[Dict], columns=None):
+        """
+        Build the column arrays.
+
+        Args:
+            products: List of product dictionaries
+            columns: Optional ProductColumns of the same products to share numeric arrays with
+        """
+        count = len(products)
+        self.size = count
+        if columns is not None:
+            self.price, self.rating, self.popularity = columns.price, columns.rating, columns.popularity
+        else:
+            self.price = np.fromiter((p.get("price", 0) for p in products), dtype=np.float64, count=count)
+            self.rating = np.fromiter((p.get("rating", 0) for p in products), dtype=np.float64, count=count)
+            self.popularity = np.fromiter((p.get("popularity", 0) for p in products), dtype=np.float64, count=count)
+
+        self.categories, self.category_codes = _encode([p.get("category", "") for p in products])
+        self.skin_types, self.skin_type_codes = _encode([p.get("skin_type", ALL_SKIN_TYPES) for p in products])
+        self.hair_types, self.hair_type_codes = _encode([p.get("hair_type", ALL_HAIR_TYPES) for p in products])
+
+        # Dense rank of product IDs so "newest" sorts numerically
+        ids = np.array([str(p.get("id", "")) for p in products], dtype=object)
+        if count:
+            self.id_rank = np.unique(ids, return_inverse=True)[1].astype(np.int64).reshape(-1)
+        else:
+            self.id_rank = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, columns, categories: List[str], category_codes: np.ndarray,
+                    skin_types: List[str], skin_type_codes: np.ndarray,
+                    hair_types: List[str], hair_type_codes: np.ndarray,
+                    id_rank: np.ndarray) -> "FilterEngine":
+        """
+        Wrap stored columns, e.g. memory-mapped ones from a catalog snapshot.
+
+        No product is read, so a lazily decoded product sequence stays undecoded.
+
+        Args:
+            columns: ProductColumns with the price, rating and popularity arrays
+            categories: Category vocabulary
+            category_codes: Category code per product
+            skin_types: Skin type vocabulary
+            skin_type_codes: Skin type code per product
+            hair_types: Hair type vocabulary
+            hair_type_codes: Hair type code per product
+            id_rank: Dense rank of each product ID
+
+        Returns:
+            FilterEngine using the arrays as-is
+        """
+        engine = cls.__new__(cls)
+        engine.size = len(category_codes)
+        engine.price, engine.rating, engine.popularity = columns.price, columns.rating, columns.popularity
+        engine.categories, engine.category_codes = list(categories), category_codes
+        engine.skin_types, engine.skin_type_codes = list(skin_types), skin_type_codes
+        engine.hair_types, engine.hair_type_codes = list(hair_types), hair_type_codes
+        engine.id_rank = id_rank
+        return engine
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _codes_where(self, vocabulary: List[str], predicate) -> np.ndarray:
+        """Get the codes of all vocabulary entries matching a predicate."""
+        return np.array([code for code, value in enumerate(vocabulary) if predicate(value)], dtype=np.int32)
+
+    def mask(self, filters: Dict) -> np.ndarray:
+        """
+        Evaluate a filters dict as one boolean mask.
+
+        Args:
+            filters: Filter values from render_filters_panel
+
+        Returns:
+            Boolean array, True for products passing every filter
+        """
+        mask = np.ones(self.size, dtype=bool)
+
+        category = filters.get("category", "All")
+        if category and category != "All":
+            wanted = category.lower()
+            codes = self._codes_where(
+                self.categories,
+                lambda name: name.lower() == wanted or wanted in name.lower(),
+            )
+            mask &= np.isin(self.category_codes, codes)
+
+        price_range = filters.get("price_range", (0, 500))
+        if price_range:
+            min_price, max_price = price_range
+            mask &= (self.price >= min_price) & (self.price <= max_price)
+
+        skin_type = filters.get("skin_type", ALL_SKIN_TYPES)
+        if skin_type and skin_type != ALL_SKIN_TYPES:
+            codes = self._codes_where(self.skin_types, lambda value: value in (skin_type, ALL_SKIN_TYPES))
+            mask &= np.isin(self.skin_type_codes, codes)
+
+        hair_type = filters.get("hair_type", ALL_HAIR_TYPES)
+        if hair_type and hair_type != ALL_HAIR_TYPES:
+            codes = self._codes_where(self.hair_types, lambda value: value in (hair_type, ALL_HAIR_TYPES))
+            mask &= np.isin(self.hair_type_codes, codes)
+
+        return mask
+
+    def sort_keys(self, sort_by: str) -> Optional[np.ndarray]:
+        """
+        Get ascending sort keys for a sort option.
+
+        Args:
+            sort_by: Key from SORT_OPTIONS
+
+        Returns:
+            Key array, or None if the option does not reorder products
+        """
+        if sort_by not in SORT_COLUMNS:
+            return None
+        column, descending = SORT_COLUMNS[sort_by]
+        values = getattr(self, column)
+        return -values if descending else values
+
+    def filter_indices(self, filters: Dict, candidates: Optional[np.ndarray] = None,
+                       limit: Optional[int] = None) -> np.ndarray:
+        """
+        Filter and sort products, returning positions instead of products.
+
+        Args:
+            filters: Filter values from render_filters_panel
+            candidates: Optional positions to restrict to, in their current order
+            limit: Optional maximum number of positions to return
+
+        Returns:
+            Array of positions into the engine's product list
+        """
+        mask = self.mask(filters)
+        if candidates is None:
+            indices = np.flatnonzero(mask)
+        else:
+            candidates = np.asarray(candidates, dtype=np.intp)
+            indices = candidates[mask[candidates]]
+
+        keys = self.sort_keys(filters.get("sort_by", "popularity"))
+        if keys is not None:
+            if limit is not None:
+                indices = indices[top_k(keys[indices], limit)]
+            else:
+                indices = indices[np.argsort(keys[indices], kind="stable")]
+        elif limit is not None:
+            indices = indices[:limit]
+
+        return indices
@@ -4,44 +4,51 @@ Handles order creation, storage, and retrieval.
 """
 
 import streamlit as st
-import json
-import os
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from utils.auth_manager import get_current_user_email
+from utils.co_purchase import get_co_purchase_index
+from utils.storage import get_store
+from utils.tracing import traced
 
 
+@traced()
 def load_orders() -> Dict:
     """
-    Load all orders from JSON file.
+    Load all orders from the order store.
     
     Returns:
         Dictionary with user emails as keys and their orders as values
     """
-    orders_file = "data/orders.json"
-    
-    if os.path.exists(orders_file):
-        with open(orders_file, 'r') as f:
-            return json.load(f)
-    else:
-        os.makedirs("data", exist_ok=True)
-        with open(orders_file, 'w') as f:
-            json.dump({}, f)
-        return {}
+    return get_store("orders").load_all()
 
 
+@traced()
 def save_orders(orders: Dict) -> None:
     """
-    Save orders to JSON file.
+    Save orders to the order store.
+    
+    Only users whose orders changed are written.
     
     Args:
         orders: Dictionary of all orders
     """
-    orders_file = "data/orders.json"
-    os.makedirs("data", exist_ok=True)
+    get_store("orders").save_all(orders)
+
+
+@traced()
+def save_user_orders(email: str, user_orders: List[Dict]) -> Tuple:
+    """
+    Save one user's order list.
     
-    with open(orders_file, 'w') as f:
-        json.dump(orders, f, indent=2)
+    Args:
+        email: User email
+        user_orders: List of the user's orders
+    
+    Returns:
+        Tuple of (store version right before the write, version after it)
+    """
+    return get_store("orders").put_versioned(email, user_orders)
 
 
 def create_order(order_id: str, cart_items: List[Dict], checkout_data: Dict, total: float) -> bool:
@@ -75,12 +82,9 @@ def create_order(order_id: str, cart_items: List[Dict], checkout_data: Dict, tot
         st.session_state["guest_orders"].append(order)
         return True
     
-    # Load existing orders
-    orders = load_orders()
-    
-    # Initialize user's order list if needed
-    if email not in orders:
-        orders[email] = []
+    # Load the user's existing orders
+    co_purchases = get_co_purchase_index()
+    user_orders = get_store("orders").get(email, [])
     
     # Create order object
     order = {
@@ -93,10 +97,11 @@ def create_order(order_id: str, cart_items: List[Dict], checkout_data: Dict, tot
     }
     
     # Add order to user's order list
-    orders[email].append(order)
+    user_orders.append(order)
     
     # Save to file
-    save_orders(orders)
+    versions = save_user_orders(email, user_orders)
+    co_purchases.record(cart_items, *versions)
     
     return True
 
@@ -114,8 +119,7 @@ def get_user_orders() -> List[Dict]:
         # Return guest orders from session
         return st.session_state.get("guest_orders", [])
     
-    orders = load_orders()
-    return orders.get(email, [])
+    return get_store("orders").get(email, [])
 
 
 def get_order_by_id(order_id: str) -> Optional[Dict]:
@@ -128,10 +132,16 @@ def get_order_by_id(order_id: str) -> Optional[Dict]:
     Returns:
         Order dictionary or None if not found
     """
-    user_orders = get_user_orders()
+    email = get_current_user_email()
     
-    for order in user_orders:
-        if order["order_id"] == order_id:
+    if not email:
+        for order in st.session_state.get("guest_orders", []):
+            if order["order_id"] == order_id:
+                return order
+        return None
+    
+    for owner, order in get_store("orders").find_items("order_id", order_id):
+        if owner == email:
             return order
     
     return None
@@ -159,14 +169,13 @@ def cancel_order(order_id: str) -> bool:
         return False
     
     # Logged in user - update file
-    orders = load_orders()
+    user_orders = get_store("orders").get(email, [])
     
-    if email in orders:
-        for order in orders[email]:
-            if order["order_id"] == order_id:
-                order["status"] = "Cancelled"
-                save_orders(orders)
-                return True
+    for order in user_orders:
+        if order["order_id"] == order_id:
+            order["status"] = "Cancelled"
+            save_user_orders(email, user_orders)
+            return True
     
     return False
 
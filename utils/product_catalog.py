@@ -0,0 +1,353 @@
+"""
+Indexed product catalog for WERBEAUTY.
+Holds every product once with id, category, gender and badge indexes.
+"""
+
+import threading
+from collections.abc import Sequence
+from typing import Dict, Hashable, Iterable, List, Optional
+
+
+GENDERS = ("women", "men")
+
+
+class ProductView(Sequence):
+    """
+    Read-only sequence of catalog products selected by position.
+
+    Holds only the position array; product dictionaries are looked up
+    when an item or slice is accessed, so callers that render one page
+    never touch the rest of the result.
+    """
+
+    def __init__(self, products: List[Dict], positions):
+        """
+        Args:
+            products: Full catalog product list
+            positions: Positions into products, in display order
+        """
+        self._products = products
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._products[pos] for pos in self._positions[index].tolist()]
+        return self._products[int(self._positions[index])]
+
+
+class ProductCatalog:
+    """
+    In-memory product catalog built once per data version.
+
+    Products are stored once and referenced by position; the indexes map
+    ids, categories, genders and badges to product ids so lookups never
+    have to scan the full product list.
+    """
+
+    def __init__(self, women_products: Iterable[Dict], men_products: Iterable[Dict], version: Hashable = ()):
+        """
+        Build the catalog and its indexes.
+
+        Products may come from generators; indexes are built while they
+        are read.
+
+        Args:
+            women_products: Women's product records
+            men_products: Men's product records
+            version: Data version the catalog was built from, e.g. a content hash
+        """
+        self._init_indexes(version)
+        self.products: Sequence = []
+
+        for gender, products in (("women", women_products), ("men", men_products)):
+            for product in products:
+                product_id = product.get("id")
+                if product_id in self.positions:
+                    continue
+                self.products.append(product)
+                self._register(len(self.products) - 1, product_id, gender,
+                               product.get("category", ""), product.get("badge", ""))
+
+    @classmethod
+    def from_columns(cls, products: Sequence, ids: Sequence[str], genders: Sequence[str],
+                     categories: Sequence[str], badges: Sequence[str], version: Hashable = (),
+                     columns=None, filter_engine=None, similarity_index=None) -> "ProductCatalog":
+        """
+        Build the catalog from precomputed index columns.
+
+        The products are only accessed on lookup, so a lazily decoded
+        sequence (such as a binary snapshot) stays undecoded until used.
+
+        Args:
+            products: Product records by position, without duplicate ids
+            ids: Product ID per position
+            genders: 'women' or 'men' per position
+            categories: Category per position
+            badges: Badge per position ('' for none)
+            version: Data version the catalog was built from
+            columns: Optional prebuilt ProductColumns for the products
+            filter_engine: Optional prebuilt FilterEngine for the products
+            similarity_index: Optional prebuilt SimilarityIndex for the products
+
+        Returns:
+            ProductCatalog over the products
+        """
+        catalog = cls.__new__(cls)
+        catalog._init_indexes(version)
+        catalog.products = products
+        catalog._columns = columns
+        catalog._filter_engine = filter_engine
+        catalog._similarity_index = similarity_index
+        for position, fields in enumerate(zip(ids, genders, categories, badges)):
+            catalog._register(position, *fields)
+        return catalog
+
+    def _init_indexes(self, version: Hashable) -> None:
+        """Create empty indexes."""
+        self.version = version
+        self.positions: Dict[str, int] = {}
+        self.gender_ids: Dict[str, List[str]] = {gender: [] for gender in GENDERS}
+        self.category_ids: Dict[str, List[str]] = {}
+        self.badge_ids: Dict[str, List[str]] = {}
+        self._gender_products: Dict[str, List[Dict]] = {}
+        self._gender_positions: Dict[str, List[int]] = {gender: [] for gender in GENDERS}
+        self._columns = None
+        self._filter_engine = None
+        self._search_index = None
+        self._product_features = None
+        self._similarity_index = None
+        self._similarity_lock = threading.Lock()
+        self._similarity_started = False
+        self._rated_positions: Dict[tuple, "np.ndarray"] = {}
+
+    def _register(self, position: int, product_id: str, gender: str, category: str, badge: str) -> None:
+        """Register a product position in every index."""
+        self.positions[product_id] = position
+        self.gender_ids[gender].append(product_id)
+        self._gender_positions[gender].append(position)
+        self.category_ids.setdefault(category, []).append(product_id)
+        if badge:
+            self.badge_ids.setdefault(badge, []).append(product_id)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self.positions
+
+    def get(self, product_id: str) -> Optional[Dict]:
+        """
+        Get a product by its ID.
+
+        Args:
+            product_id: The product ID to find
+
+        Returns:
+            Product dictionary or None if not found
+        """
+        position = self.positions.get(product_id)
+        return None if position is None else self.products[position]
+
+    def get_many(self, product_ids: Iterable[str]) -> List[Dict]:
+        """
+        Get several products by ID, skipping unknown IDs.
+
+        Args:
+            product_ids: Product IDs in the desired order
+
+        Returns:
+            List of product dictionaries
+        """
+        positions, products = self.positions, self.products
+        return [products[positions[pid]] for pid in product_ids if pid in positions]
+
+    def gender_products(self, gender: str) -> List[Dict]:
+        """
+        Get all products for a gender in catalog order.
+
+        Args:
+            gender: 'women' or 'men'
+
+        Returns:
+            List of product dictionaries
+        """
+        products = self._gender_products.get(gender)
+        if products is None:
+            products = [self.products[pos] for pos in self._gender_positions.get(gender, [])]
+            self._gender_products[gender] = products
+        return products
+
+    def gender_positions(self, gender: Optional[str] = None) -> List[int]:
+        """
+        Get catalog positions of a gender's products.
+
+        Args:
+            gender: 'women', 'men', or None for all products
+
+        Returns:
+            List of positions into catalog.products
+        """
+        if gender is None:
+            return list(range(len(self.products)))
+        return self._gender_positions.get(gender, [])
+
+    def columns(self):
+        """
+        Get the struct-of-arrays view of the numeric product fields.
+
+        Returns:
+            ProductColumns whose arrays index catalog.products
+        """
+        if self._columns is None:
+            from utils.product_record import ProductColumns
+            self._columns = ProductColumns(self.products)
+        return self._columns
+
+    def filter_engine(self):
+        """
+        Get the columnar filter engine over all catalog products.
+
+        The engine is built on first use and shared for the lifetime of
+        this catalog version.
+
+        Returns:
+            FilterEngine whose positions index catalog.products
+        """
+        if self._filter_engine is None:
+            from utils.filter_engine import FilterEngine
+            self._filter_engine = FilterEngine(self.products, columns=self.columns())
+        return self._filter_engine
+
+    def search_index(self):
+        """
+        Get the full-text search index over all catalog products.
+
+        The index is built on first use and shared for the lifetime of
+        this catalog version.
+
+        Returns:
+            SearchIndex whose document IDs index catalog.products
+        """
+        if self._search_index is None:
+            from utils.search_index import SearchIndex
+            self._search_index = SearchIndex(self.products)
+        return self._search_index
+
+    def product_features(self):
+        """
+        Get the recommendation feature matrix over all catalog products.
+
+        The matrix is built on first use and shared for the lifetime of
+        this catalog version, from the filter engine's category codes so
+        no product record has to be read.
+
+        Returns:
+            ProductFeatures whose rows index catalog.products
+        """
+        if self._product_features is None:
+            from utils.product_features import ProductFeatures
+            engine = self.filter_engine()
+            self._product_features = ProductFeatures(self.products, columns=self.columns(),
+                                                     categories=(engine.categories, engine.category_codes))
+        return self._product_features
+
+    def similarity_index(self, wait: bool = True):
+        """
+        Get the item-item similarity index over all catalog products.
+
+        The index is built once per catalog version under a lock, so
+        concurrent callers share one O(n²) build instead of repeating it.
+
+        Args:
+            wait: Build the index (or wait for the running build) if it is
+                not ready; with False, start a background build and return None
+
+        Returns:
+            SimilarityIndex whose positions index catalog.products, or None
+        """
+        if self._similarity_index is None:
+            if not wait:
+                self.start_similarity_build()
+                return None
+            with self._similarity_lock:
+                if self._similarity_index is None:
+                    from utils.similarity_index import SimilarityIndex
+                    self._similarity_index = SimilarityIndex(self.products)
+        return self._similarity_index
+
+    def start_similarity_build(self) -> None:
+        """Build the similarity index in a background thread if it isn't built or building."""
+        if self._similarity_index is not None or self._similarity_started:
+            return
+        self._similarity_started = True
+        threading.Thread(target=self.similarity_index, name="werbeauty-similarity", daemon=True).start()
+
+    def view(self, positions) -> ProductView:
+        """
+        Get a lazy product sequence for an array of catalog positions.
+
+        Args:
+            positions: NumPy array of positions, e.g. from filter_product_indices
+
+        Returns:
+            ProductView over the positions
+        """
+        return ProductView(self.products, positions)
+
+    def ids_in_categories(self, categories: Iterable[str]) -> set:
+        """
+        Get the IDs of all products in any of the given categories.
+
+        Args:
+            categories: Category names
+
+        Returns:
+            Set of product IDs
+        """
+        ids = set()
+        for category in categories:
+            ids.update(self.category_ids.get(category, ()))
+        return ids
+
+    def top_rated_positions(self, categories: Iterable[str]) -> "np.ndarray":
+        """
+        Get the positions of all products in any of the given categories, best rated first.
+
+        Ranked once per set of categories and kept for the lifetime of this
+        catalog version, so callers only slice the result. Ties keep catalog
+        order.
+
+        Args:
+            categories: Category names
+
+        Returns:
+            Read-only array of positions into catalog.products
+        """
+        key = tuple(sorted(set(categories)))
+        ranked = self._rated_positions.get(key)
+        if ranked is None:
+            import numpy as np
+            positions = np.array(sorted(self.positions[pid] for pid in self.ids_in_categories(key)), dtype=np.intp)
+            ranked = positions[np.argsort(-self.columns().rating[positions], kind="stable")]
+            ranked.flags.writeable = False
+            self._rated_positions[key] = ranked
+        return ranked
+
+    def matching_categories(self, category: str) -> List[str]:
+        """
+        Get catalog categories matching a category filter.
+
+        A category matches when it equals the filter or contains it,
+        ignoring case (so "Care" matches "Hair-Care" and "Self-Care").
+
+        Args:
+            category: Category filter value
+
+        Returns:
+            List of matching category names
+        """
+        wanted = category.lower()
+        return [name for name in self.category_ids if name.lower() == wanted or wanted in name.lower()]
@@ -0,0 +1,92 @@
+"""
+Product feature matrix for WERBEAUTY recommendations.
+Encodes every catalog product as one numeric row for vectorized scoring.
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from utils.filter_engine import _encode
+
+
+class ProductFeatures:
+    """
+    Dense feature matrix with one row per product.
+
+    Columns are a one-hot encoding of the category followed by rating,
+    popularity and a badge flag, so a linear score over all products is
+    one matrix-vector product.
+    """
+
+    def __init__(self, products: List[Dict], columns=None, categories: Optional[Tuple[List[str], np.ndarray]] = None):
+        """
+        Build the matrix.
+
+        Args:
+            products: List of product dictionaries; row i describes products[i]
+            columns: Optional ProductColumns of the same products
+            categories: Optional (vocabulary, code per product) category encoding;
+                with columns too, no product is read
+        """
+        count = len(products)
+        self.size = count
+        if categories is not None:
+            self.categories, category_codes = list(categories[0]), categories[1]
+        else:
+            self.categories, category_codes = _encode([p.get("category", "") for p in products])
+        self.category_index: Dict[str, int] = {name: code for code, name in enumerate(self.categories)}
+
+        width = len(self.categories)
+        self.rating_column = width
+        self.popularity_column = width + 1
+        self.badge_column = width + 2
+
+        self.matrix = np.zeros((count, width + 3), dtype=np.float64)
+        self.matrix[np.arange(count), category_codes] = 1.0
+        if columns is not None:
+            self.matrix[:, self.rating_column] = columns.rating
+            self.matrix[:, self.popularity_column] = columns.popularity
+            self.matrix[:, self.badge_column] = columns.has_badge
+        else:
+            self.matrix[:, self.rating_column] = [p.get("rating", 0) for p in products]
+            self.matrix[:, self.popularity_column] = [p.get("popularity", 0) for p in products]
+            self.matrix[:, self.badge_column] = [1.0 if p.get("badge") else 0.0 for p in products]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def weights(self, category_weights: Dict[str, float], rating: float, popularity: float,
+                badge: float) -> np.ndarray:
+        """
+        Build a weight vector for score().
+
+        Args:
+            category_weights: Score added per category; unknown categories are ignored
+            rating: Weight of the product rating
+            popularity: Weight of the popularity score
+            badge: Bonus for products with a badge
+
+        Returns:
+            Weight vector with one entry per matrix column
+        """
+        vector = np.zeros(self.matrix.shape[1], dtype=np.float64)
+        for category, weight in category_weights.items():
+            code = self.category_index.get(category)
+            if code is not None:
+                vector[code] += weight
+        vector[self.rating_column] = rating
+        vector[self.popularity_column] = popularity
+        vector[self.badge_column] = badge
+        return vector
+
+    def score(self, weights: np.ndarray) -> np.ndarray:
+        """
+        Score every product.
+
+        Args:
+            weights: Vector from weights()
+
+        Returns:
+            Score per product
+        """
+        return self.matrix @ weights
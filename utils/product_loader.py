@@ -3,10 +3,18 @@ Product loading utilities for WERBEAUTY.
 Loads and filters product data.
 """
 
-import streamlit as st
+import hashlib
 import json
 import os
-from typing import Dict, List, Optional
+import threading
+import numpy as np
+from typing import Dict, Iterator, List, Optional
+from utils.catalog_snapshot import SNAPSHOT_DIRNAME, ProgressCallback, iter_jsonl, load_snapshot
+from utils.filter_engine import FilterEngine
+from utils.product_catalog import ProductCatalog
+from utils.product_record import Product
+from utils.search_index import SearchIndex, tokenize
+from utils.tracing import traced
 
 
 # Default product data (fallback if JSON files not found)
@@ -330,42 +338,211 @@ DEFAULT_MEN_PRODUCTS = [
 ]
 
 
-@st.cache_data(ttl=3600)
+# (gender, file name stem, fallback products); a .jsonl file takes precedence over .json
+PRODUCT_FILES = (
+    ("women", "women_products", DEFAULT_WOMEN_PRODUCTS),
+    ("men", "men_products", DEFAULT_MEN_PRODUCTS),
+)
+
+# Directory holding the product files; WERBEAUTY_PRODUCT_DIR points the app at another catalog
+PRODUCT_DATA_DIR = os.environ.get("WERBEAUTY_PRODUCT_DIR", os.path.join(os.path.dirname(__file__), "..", "data"))
+
+# Build each new catalog's similarity index in the background as soon as it is loaded;
+# off by default, so it is built on first use or read from the catalog snapshot
+SIMILARITY_PREBUILD = os.environ.get("WERBEAUTY_SIMILARITY_PREBUILD", "") not in ("", "0")
+
+# Current catalog snapshot as (file stat version, catalog); replaced atomically
+_snapshot: Optional[tuple] = None
+_snapshot_lock = threading.Lock()
+
+
+def _product_path(filename: str) -> str:
+    """Get the path of a product data file."""
+    return os.path.join(PRODUCT_DATA_DIR, filename)
+
+
+def _product_file(stem: str) -> str:
+    """Get the product file for a stem, preferring JSON Lines."""
+    jsonl_path = _product_path(stem + ".jsonl")
+    return jsonl_path if os.path.exists(jsonl_path) else _product_path(stem + ".json")
+
+
+def _read_product_file(stem: str, defaults: List[Dict], digest,
+                       progress: Optional[ProgressCallback] = None,
+                       validate: bool = False) -> Iterator[Product]:
+    """
+    Read one product file as a stream of product records.
+    
+    JSON Lines files are parsed one line at a time; JSON files are parsed
+    whole. The file's bytes are fed to digest as they are read. A missing
+    or invalid JSON file yields the defaults instead. A JSON Lines file is
+    streamed, so an invalid line raises ValueError after earlier products
+    were yielded; with validate, the file is checked first and the
+    defaults are used instead.
+    
+    Args:
+        stem: File name inside data/ without extension
+        defaults: Products used when the file is missing or invalid
+        digest: hashlib object updated with the file content
+        progress: Optional callback receiving (bytes read, total bytes)
+        validate: Check a JSON Lines file completely before yielding from it
+    
+    Yields:
+        Product records in file order
+    
+    Raises:
+        ValueError: If a JSON Lines file has an invalid line and validate is off
+    """
+    path = _product_file(stem)
+    if path.endswith(".jsonl"):
+        try:
+            if validate:
+                for _ in iter_jsonl(path):
+                    pass
+        except ValueError as e:
+            print(f"Error loading {os.path.basename(path)}: {e}")
+        else:
+            file_digest = hashlib.sha256()
+            for product in iter_jsonl(path, progress=progress, digest=file_digest):
+                yield Product(product)
+            digest.update(file_digest.digest())
+            return
+        digest.update(hashlib.sha256(b"").digest())
+        products = defaults
+    else:
+        products = defaults
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            products = json.loads(raw)
+            digest.update(hashlib.sha256(raw).digest())
+        except FileNotFoundError:
+            digest.update(hashlib.sha256(b"").digest())
+        except Exception as e:
+            print(f"Error loading {os.path.basename(path)}: {e}")
+            digest.update(hashlib.sha256(b"").digest())
+    for product in products:
+        yield Product(product)
+
+
+def _catalog_version() -> tuple:
+    """
+    Get the data version of the product files.
+    
+    Returns:
+        Tuple of (mtime, size) pairs for the women's and men's product files
+    """
+    version = []
+    for _, stem, _ in PRODUCT_FILES:
+        try:
+            stat = os.stat(_product_file(stem))
+            version.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            version.append((0, 0))
+    return tuple(version)
+
+
+def snapshot_dir() -> str:
+    """Get the binary catalog snapshot directory."""
+    return _product_path(SNAPSHOT_DIRNAME)
+
+
+@traced()
+def build_catalog(progress: Optional[ProgressCallback] = None, validate: bool = False) -> ProductCatalog:
+    """
+    Read the product files into a new catalog.
+    
+    Indexes are built while the files are streamed.
+    
+    Args:
+        progress: Optional callback receiving (bytes read, total bytes) per file
+        validate: Check JSON Lines files before streaming them and use the
+            default products for an invalid one
+    
+    Returns:
+        ProductCatalog whose version is the content hash of the files
+    
+    Raises:
+        ValueError: If a JSON Lines file has an invalid line and validate is off
+    """
+    digest = hashlib.sha256()
+    readers = {
+        gender: _read_product_file(stem, defaults, digest, progress, validate)
+        for gender, stem, defaults in PRODUCT_FILES
+    }
+    catalog = ProductCatalog(readers["women"], readers["men"])
+    catalog.version = digest.hexdigest()
+    return catalog
+
+
+@traced()
+def get_catalog(progress: Optional[ProgressCallback] = None) -> ProductCatalog:
+    """
+    Get the shared, indexed product catalog.
+    
+    One read-only catalog snapshot is shared by every rerun and session.
+    Each call stats the product files; when they changed, the catalog is
+    opened from a matching binary snapshot in data/catalog.snapshot or
+    re-read from the files. A catalog with a new content hash is swapped
+    in atomically; callers holding the old one keep a consistent view.
+    If a JSON Lines file turns out to be invalid, the previous catalog
+    stays in use until the files change again. With
+    WERBEAUTY_SIMILARITY_PREBUILD=1, a new catalog starts building its
+    similarity index in the background right away.
+    
+    Args:
+        progress: Optional callback receiving (bytes read, total bytes) while files are read
+    
+    Returns:
+        ProductCatalog for the current product files
+    """
+    global _snapshot
+    
+    version = _catalog_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot[0] == version:
+        return snapshot[1]
+    
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is not None and snapshot[0] == version:
+            return snapshot[1]
+        
+        try:
+            catalog = load_snapshot(snapshot_dir(), version) or build_catalog(progress)
+        except ValueError as e:
+            print(f"Error loading product files: {e}")
+            # Keep serving the last good catalog; without one, fall back to defaults per file
+            catalog = snapshot[1] if snapshot is not None else build_catalog(progress, validate=True)
+        if snapshot is not None and snapshot[1].version == catalog.version:
+            # Files were touched but not changed
+            catalog = snapshot[1]
+        _snapshot = (version, catalog)
+        if SIMILARITY_PREBUILD:
+            catalog.start_similarity_build()
+        return catalog
+
+
+@traced()
 def load_women_products() -> List[Dict]:
     """
     Load women's products from JSON file or return defaults. 
     
     Returns:
-        List of women's product dictionaries
+        List of women's Product records from the shared catalog
     """
-    try:
-        json_path = os.path.join(os.path.dirname(__file__), "..", "data", "women_products.json")
-        if os.path.exists(json_path):
-            with open(json_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-    except Exception as e:
-        print(f"Error loading women's products: {e}")
-    
-    return DEFAULT_WOMEN_PRODUCTS
+    return list(get_catalog().gender_products("women"))
 
 
-@st.cache_data(ttl=3600)
+@traced()
 def load_men_products() -> List[Dict]:
     """
     Load men's products from JSON file or return defaults.
     
     Returns:
-        List of men's product dictionaries
+        List of men's Product records from the shared catalog
     """
-    try:
-        json_path = os.path.join(os.path.dirname(__file__), "..", "data", "men_products.json")
-        if os.path.exists(json_path):
-            with open(json_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-    except Exception as e:
-        print(f"Error loading men's products: {e}")
-    
-    return DEFAULT_MEN_PRODUCTS
+    return list(get_catalog().gender_products("men"))
 
 
 def get_product_by_id(product_id: str) -> Optional[Dict]:
@@ -378,15 +555,37 @@ def get_product_by_id(product_id: str) -> Optional[Dict]:
     Returns:
         Product dictionary or None if not found
     """
-    all_products = load_women_products() + load_men_products()
+    return get_catalog().get(product_id)
+
+
+@traced()
+def filter_product_indices(filters: Dict, gender: Optional[str] = None,
+                           candidates: Optional[np.ndarray] = None,
+                           limit: Optional[int] = None,
+                           catalog: Optional[ProductCatalog] = None) -> np.ndarray:
+    """
+    Filter and sort catalog products without materializing them.
     
-    for product in all_products:
-        if product.get("id") == product_id:
-            return product
+    Args:
+        filters: Filter criteria dictionary
+        gender: 'women' or 'men' to restrict to one collection, or None for all
+        candidates: Optional catalog positions to filter instead of the collection
+        limit: Optional maximum number of results
+        catalog: Catalog the positions refer to; pass the one used to display
+            the results so a hot reload in between cannot mix catalogs.
+            Defaults to get_catalog()
     
-    return None
+    Returns:
+        Array of positions into catalog.products
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    if candidates is None:
+        candidates = np.asarray(catalog.gender_positions(gender), dtype=np.intp)
+    return catalog.filter_engine().filter_indices(filters, candidates=candidates, limit=limit)
 
 
+@traced()
 def filter_products(products: List[Dict], filters: Dict) -> List[Dict]:
     """
     Filter products based on given criteria.
@@ -398,78 +597,72 @@ def filter_products(products: List[Dict], filters: Dict) -> List[Dict]:
     Returns:
         Filtered list of products
     """
-    filtered = products.copy()
-    
-    # Filter by category
-    category = filters.get("category", "All")
-    if category and category != "All":
-        filtered = [p for p in filtered if p.get("category", ""). lower() == category. lower() or 
-                   category. lower() in p.get("category", "").lower()]
-    
-    # Filter by price range
-    price_range = filters.get("price_range", (0, 500))
-    if price_range:
-        min_price, max_price = price_range
-        filtered = [p for p in filtered if min_price <= p.get("price", 0) <= max_price]
-    
-    # Filter by skin type
-    skin_type = filters.get("skin_type", "All Skin Types")
-    if skin_type and skin_type != "All Skin Types":
-        filtered = [p for p in filtered if 
-                   p.get("skin_type", "All Skin Types") == skin_type or 
-                   p.get("skin_type", "All Skin Types") == "All Skin Types"]
-    
-    # Filter by hair type
-    hair_type = filters.get("hair_type", "All Hair Types")
-    if hair_type and hair_type != "All Hair Types":
-        filtered = [p for p in filtered if 
-                   p.get("hair_type", "All Hair Types") == hair_type or 
-                   p.get("hair_type", "All Hair Types") == "All Hair Types"]
-    
-    # Sort products
-    sort_by = filters.get("sort_by", "popularity")
-    if sort_by == "price_low":
-        filtered.sort(key=lambda x: x.get("price", 0))
-    elif sort_by == "price_high":
-        filtered.sort(key=lambda x: x.get("price", 0), reverse=True)
-    elif sort_by == "rating":
-        filtered. sort(key=lambda x: x.get("rating", 0), reverse=True)
-    elif sort_by == "popularity":
-        filtered.sort(key=lambda x: x.get("popularity", 0), reverse=True)
-    elif sort_by == "newest":
-        filtered. sort(key=lambda x: x.get("id", ""), reverse=True)
-    
-    return filtered
+    catalog = get_catalog()
+    positions = catalog.positions
+    
+    if all(p.get("id") in positions for p in products):
+        # Catalog products: reuse the shared column arrays
+        candidates = np.fromiter((positions[p.get("id")] for p in products), dtype=np.intp, count=len(products))
+        local = {pos: product for pos, product in zip(candidates.tolist(), products)}
+        indices = catalog.filter_engine().filter_indices(filters, candidates=candidates)
+        return [local[pos] for pos in indices.tolist()]
+    
+    indices = FilterEngine(products).filter_indices(filters)
+    return [products[i] for i in indices.tolist()]
+
+
+@traced()
+def search_product_indices(query: str, gender: Optional[str] = None,
+                           candidates: Optional[np.ndarray] = None,
+                           catalog: Optional[ProductCatalog] = None) -> tuple:
+    """
+    Search catalog products without materializing them.
+    
+    Args:
+        query: Search query string
+        gender: 'women' or 'men' to restrict to one collection, or None for all
+        candidates: Optional catalog positions to search instead of the collection
+        catalog: Catalog the positions refer to; defaults to get_catalog()
+    
+    Returns:
+        Tuple of (ranked positions into catalog.products, match-field bitmasks)
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    if candidates is None:
+        candidates = np.asarray(catalog.gender_positions(gender), dtype=np.intp)
+    
+    if not tokenize(query or ""):
+        # Nothing searchable, e.g. "" or "!!": the collection is not narrowed
+        return candidates, np.zeros(len(candidates), dtype=np.uint8)
+    
+    return catalog.search_index().search(query, candidates=candidates)
 
 
+@traced()
 def search_products(products: List[Dict], query: str) -> List[Dict]:
     """
-    Search products by name, description, or category.
+    Search products by name, description, category, or ingredients.
     
     Args:
         products: List of products to search
         query: Search query string
     
     Returns:
-        List of matching products with highlighted matches
+        List of matching products, best matches first
     """
-    if not query or not query.strip():
+    if not tokenize(query or ""):
         return products
     
-    query = query.lower(). strip()
-    results = []
+    catalog = get_catalog()
+    positions = catalog.positions
     
-    for product in products:
-        name = product.get("name", ""). lower()
-        description = product.get("description", "").lower()
-        category = product.get("category", "").lower()
-        
-        if query in name or query in description or query in category:
-            # Create a copy with match info
-            result = product.copy()
-            result["_match_in_name"] = query in name
-            result["_match_in_description"] = query in description
-            result["_match_in_category"] = query in category
-            results.append(result)
-    
-    return results
\ No newline at end of file
+    if all(p.get("id") in positions for p in products):
+        # Catalog products: reuse the shared index
+        candidates = np.fromiter((positions[p.get("id")] for p in products), dtype=np.intp, count=len(products))
+        local = {pos: product for pos, product in zip(candidates.tolist(), products)}
+        ranked, _ = catalog.search_index().search(query, candidates=candidates)
+        return [local[pos] for pos in ranked.tolist()]
+    
+    ranked, _ = SearchIndex(products).search(query)
+    return [products[i] for i in ranked.tolist()]
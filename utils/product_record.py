@@ -0,0 +1,130 @@
+"""
+Compact product records for WERBEAUTY.
+Immutable slotted product objects with dict-style access, plus a
+struct-of-arrays view of their numeric fields.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+
+# Fields stored in slots, in JSON key order
+PRODUCT_FIELDS = (
+    "id", "name", "price", "category", "description", "image", "rating",
+    "badge", "skin_type", "hair_type", "ingredients", "popularity",
+)
+
+# String fields shared by many products; interned so each value is stored once
+INTERNED_FIELDS = frozenset(("category", "badge", "skin_type", "hair_type"))
+
+_MISSING = object()
+
+
+def _freeze(field: str, value: Any) -> Any:
+    """Convert a JSON value into its stored, immutable form."""
+    if isinstance(value, list):
+        return tuple(sys.intern(item) if isinstance(item, str) else item for item in value)
+    if field in INTERNED_FIELDS and isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+class Product(Mapping):
+    """
+    Read-only product record.
+
+    Known fields live in __slots__ instead of a per-product dict, shared
+    strings are interned and lists become tuples. The record behaves like
+    the product dictionaries it replaces: product["price"],
+    product.get("badge", ""), "hair_type" in product and dict(product)
+    all work, and fields absent from the source JSON stay absent.
+    """
+
+    __slots__ = PRODUCT_FIELDS + ("_extra",)
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Args:
+            data: Product dictionary as loaded from JSON
+        """
+        extra = {}
+        for field in PRODUCT_FIELDS:
+            object.__setattr__(self, field, _freeze(field, data.get(field, _MISSING)))
+        for key, value in data.items():
+            if key not in PRODUCT_FIELDS:
+                extra[key] = _freeze(key, value)
+        object.__setattr__(self, "_extra", extra or None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Product records are read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Product records are read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        if key in PRODUCT_FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for field in PRODUCT_FIELDS:
+            if getattr(self, field) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Product({dict(self)!r})"
+
+    def __reduce__(self):
+        return (Product, (dict(self),))
+
+
+class ProductColumns:
+    """
+    Struct-of-arrays view of the numeric product fields.
+
+    One contiguous array per field, aligned with the product list, for
+    code that works on whole columns instead of individual records.
+    """
+
+    def __init__(self, products: List[Mapping]):
+        """
+        Args:
+            products: Product records; position i of every array describes products[i]
+        """
+        count = len(products)
+        self.size = count
+        self.price = np.fromiter((p.get("price", 0) for p in products), dtype=np.float64, count=count)
+        self.rating = np.fromiter((p.get("rating", 0) for p in products), dtype=np.float64, count=count)
+        self.popularity = np.fromiter((p.get("popularity", 0) for p in products), dtype=np.float64, count=count)
+        self.has_badge = np.fromiter((bool(p.get("badge")) for p in products), dtype=bool, count=count)
+        for array in (self.price, self.rating, self.popularity, self.has_badge):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_arrays(cls, price: np.ndarray, rating: np.ndarray, popularity: np.ndarray,
+                    has_badge: np.ndarray) -> "ProductColumns":
+        """
+        Wrap existing column arrays, e.g. memory-mapped ones from a snapshot.
+
+        Returns:
+            ProductColumns using the arrays as-is
+        """
+        columns = cls.__new__(cls)
+        columns.size = len(price)
+        columns.price, columns.rating, columns.popularity, columns.has_badge = price, rating, popularity, has_badge
+        return columns
+
+    def __len__(self) -> int:
+        return self.size
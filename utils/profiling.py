@@ -0,0 +1,204 @@
+"""
+Slow rerun capture for WERBEAUTY.
+Profiles script runs with cProfile and tracemalloc and keeps the
+captures of runs slower than a threshold.
+"""
+
+import cProfile
+import os
+import re
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+
+# Profile every rerun (also enabled per session with ?profile=1 when allowed)
+PROFILE_ENABLED = os.environ.get("WERBEAUTY_PROFILE", "") not in ("", "0")
+
+# Let visitors turn on ?profile=1 and ?trace=1 from the URL; off by default
+# so anyone reaching a deployment cannot make it profile and write to disk
+PROFILE_ALLOW_QUERY = os.environ.get("WERBEAUTY_PROFILE_ALLOW_QUERY", "") not in ("", "0")
+
+# Only keep captures of reruns at least this slow
+PROFILE_THRESHOLD_MS = float(os.environ.get("WERBEAUTY_PROFILE_THRESHOLD_MS", "500"))
+
+# Directory captures are written to
+PROFILE_DIR = os.environ.get("WERBEAUTY_PROFILE_DIR", os.path.join("data", "profiles"))
+
+# Captures kept in PROFILE_DIR; older ones are deleted
+PROFILE_KEEP = int(os.environ.get("WERBEAUTY_PROFILE_KEEP", "20"))
+
+# Allocation sites listed in each snapshot
+TOP_ALLOCATIONS = 25
+
+# tracemalloc is process-wide, so it runs while any session is profiling
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def _start_tracemalloc() -> bool:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and tracemalloc.is_tracing():
+            return False  # Started by someone else; leave it alone
+        if _tracemalloc_users == 0:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        _tracemalloc_users += 1
+        return True
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+class ProfileCapture:
+    """
+    Profile one script run and save it if it was slow.
+
+    A capture is a ``.prof`` file (load it with pstats or snakeviz) and an
+    ``.alloc.txt`` file listing the top allocation sites, both named
+    ``<time>_<page>_<session>``. Only the newest PROFILE_KEEP captures are
+    kept.
+
+    Example:
+        with ProfileCapture("payment", session_id) as capture:
+            render_app()
+        print(capture.path)  # None if the run was fast
+    """
+
+    def __init__(self, page: str = "", session_id: str = "",
+                 threshold_ms: float = PROFILE_THRESHOLD_MS,
+                 directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP):
+        """
+        Args:
+            page: Page being rendered
+            session_id: Streamlit session ID
+            threshold_ms: Minimum run time to keep a capture
+            directory: Directory captures are written to
+            keep: Number of captures to keep
+        """
+        self.page = page
+        self.session_id = session_id
+        self.threshold_ms = threshold_ms
+        self.directory = directory
+        self.keep = keep
+        self.duration_ms = 0.0
+        self.path: Optional[str] = None
+        self._profiler: Optional[cProfile.Profile] = None
+        self._tracing = False
+
+    def __enter__(self):
+        self._tracing = _start_tracemalloc()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            self._profiler = profiler
+        except ValueError:
+            pass  # Another profiler is active (Python 3.12+ allows only one)
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ms = (time.perf_counter_ns() - self._start_ns) / 1e6
+        if self._profiler is not None:
+            self._profiler.disable()
+        try:
+            if self.duration_ms >= self.threshold_ms:
+                self.path = self._save()
+        except OSError as e:
+            print(f"Error saving profile capture: {e}")
+        finally:
+            if self._tracing:
+                _stop_tracemalloc()
+        return False
+
+    def _save(self) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now * 1000) % 1000:03d}"
+        page = re.sub(r"[^A-Za-z0-9_-]", "", self.page) or "unknown"
+        session = re.sub(r"[^A-Za-z0-9]", "", self.session_id)[:8] or "nosession"
+        base = os.path.join(self.directory, f"{stamp}_{page}_{session}")
+
+        lines = [
+            f"page: {self.page}",
+            f"session: {self.session_id}",
+            f"duration_ms: {self.duration_ms:.1f}",
+        ]
+        if self._tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"traced_kb: {current / 1024:.0f} (peak {peak / 1024:.0f})")
+            lines.append("")
+            lines.append(f"Top {TOP_ALLOCATIONS} allocation sites still held at the end of the run:")
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ])
+            stats = snapshot.statistics("lineno")
+            lines.extend(str(stat) for stat in stats[:TOP_ALLOCATIONS])
+
+        # Dumped after the snapshot so its own allocations are not listed
+        if self._profiler is not None:
+            self._profiler.dump_stats(base + ".prof")
+        with open(base + ".alloc.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+        rotate_captures(self.directory, self.keep)
+        return base
+
+
+def list_captures(directory: str = PROFILE_DIR) -> List[Dict]:
+    """
+    List saved captures, newest first.
+
+    Args:
+        directory: Capture directory
+
+    Returns:
+        One entry per capture with base path, page, session and duration_ms
+    """
+    if not os.path.isdir(directory):
+        return []
+    captures = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(".alloc.txt"):
+            continue
+        base = os.path.join(directory, name[:-len(".alloc.txt")])
+        try:
+            _, tag = os.path.basename(base).split("_", 1)
+            page, session = tag.rsplit("_", 1)
+        except ValueError:
+            continue  # Not a capture
+        entry = {"base": base, "page": page, "session": session, "duration_ms": 0.0}
+        try:
+            with open(base + ".alloc.txt", "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("duration_ms:"):
+                        entry["duration_ms"] = float(line.split(":", 1)[1])
+                        break
+        except (OSError, ValueError):
+            pass
+        captures.append(entry)
+    return captures
+
+
+def rotate_captures(directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP) -> None:
+    """
+    Delete all but the newest captures.
+
+    Args:
+        directory: Capture directory
+        keep: Number of captures to keep
+    """
+    for capture in list_captures(directory)[keep:]:
+        for suffix in (".prof", ".alloc.txt"):
+            try:
+                os.remove(capture["base"] + suffix)
+            except FileNotFoundError:
+                pass
@@ -3,11 +3,56 @@ Recommendation engine for WERBEAUTY.
 Session-based product recommendations using similarity scoring.
 """
 
+import numpy as np
 import streamlit as st
 from typing import Dict, List
-from utils.product_loader import load_women_products, load_men_products, get_product_by_id
+from utils.cart_manager import get_cart_ids
+from utils.co_purchase import get_co_purchase_index
+from utils.filter_engine import top_k
+from utils.product_loader import get_catalog
+from utils.similarity_index import rank_similar
+from utils.tracing import traced
 
 
+# Recommendation score weights
+CATEGORY_AFFINITY_WEIGHT = 10
+RATING_WEIGHT = 5
+POPULARITY_WEIGHT = 0.5
+BADGE_BONUS = 8
+
+# Most recent product views kept per session
+VIEW_HISTORY_LIMIT = 20
+
+# Complementary categories, used when there is too little purchase history
+COMPLEMENT_CATEGORIES = {
+    "Lips": ["Eyes", "Face"],
+    "Eyes": ["Lips", "Face"],
+    "Face": ["Lips", "Eyes", "Skincare"],
+    "Skincare": ["Face", "Self-Care"],
+    "Self-Care": ["Skincare", "Perfumes"],
+    "Perfumes": ["Self-Care"],
+    "Hair-Care": ["Self-Care"],
+    "Makeup": ["Skincare", "Perfumes"],
+    "Beard-Care": ["Grooming", "Perfumes"],
+    "Grooming": ["Beard-Care", "Self-Care"],
+}
+
+
+def record_view(product_id: str) -> None:
+    """
+    Add a product to the session's view history.
+    
+    Only product IDs are kept, most recent last, up to VIEW_HISTORY_LIMIT.
+    
+    Args:
+        product_id: ID of the viewed product
+    """
+    history = [pid for pid in st.session_state.get("view_history", []) if pid != product_id]
+    history.append(product_id)
+    st.session_state["view_history"] = history[-VIEW_HISTORY_LIMIT:]
+
+
+@traced()
 def get_recommendations(limit: int = 8) -> List[Dict]:
     """
     Get personalized product recommendations based on user behavior.
@@ -21,70 +66,59 @@ def get_recommendations(limit: int = 8) -> List[Dict]:
     gender = st.session_state.get("gender", "women")
     view_history = st.session_state.get("view_history", [])
     favorites = st.session_state.get("favorites", [])
-    cart = st.session_state.get("cart", [])
+    cart_ids = get_cart_ids()
     
     # Load products based on gender preference
-    if gender == "men":
-        products = load_men_products()
-    else:
-        products = load_women_products()
+    catalog = get_catalog()
+    gender_positions = catalog.gender_positions("men" if gender == "men" else "women")
     
     # Get IDs of items already in cart or favorites
-    exclude_ids = set()
-    for item in cart:
-        exclude_ids.add(item.get("id"))
+    exclude_ids = set(cart_ids)
     # Favorites are now stored as product IDs (strings)
     exclude_ids.update(favorites)
     
-    # Calculate scores for each product
-    scored_products = []
-    
     # Get categories from user history
     history_categories = {}
-    for item in view_history:
-        cat = item.get("category", "")
-        history_categories[cat] = history_categories.get(cat, 0) + 1
+    for viewed_id in view_history:
+        viewed_product = catalog.get(viewed_id)
+        if viewed_product:
+            cat = viewed_product.get("category", "")
+            history_categories[cat] = history_categories.get(cat, 0) + 1
     
     # Load favorite products to get their categories
     for fav_id in favorites:
-        fav_product = get_product_by_id(fav_id)
+        fav_product = catalog.get(fav_id)
         if fav_product:
             cat = fav_product.get("category", "")
             history_categories[cat] = history_categories.get(cat, 0) + 2  # Weight favorites higher
     
-    for item in cart:
-        cat = item.get("category", "")
-        history_categories[cat] = history_categories.get(cat, 0) + 3  # Weight cart items highest
-    
-    for product in products:
-        if product.get("id") in exclude_ids:
-            continue
-        
-        score = 0
-        
-        # Score based on category preference
-        product_category = product.get("category", "")
-        if product_category in history_categories:
-            score += history_categories[product_category] * 10
-        
-        # Score based on rating
-        score += product.get("rating", 0) * 5
-        
-        # Score based on popularity
-        score += product.get("popularity", 0) * 0.5
-        
-        # Bonus for badges
-        if product.get("badge"):
-            score += 8
-        
-        scored_products.append((score, product))
-    
-    # Sort by score and return top results
-    scored_products.sort(key=lambda x: x[0], reverse=True)
-    
-    return [product for score, product in scored_products[:limit]]
+    for cart_id in cart_ids:
+        cart_product = catalog.get(cart_id)
+        if cart_product:
+            cat = cart_product.get("category", "")
+            history_categories[cat] = history_categories.get(cat, 0) + 3  # Weight cart items highest
+    
+    # Score every product with one matrix-vector product
+    features = catalog.product_features()
+    weights = features.weights(
+        {cat: count * CATEGORY_AFFINITY_WEIGHT for cat, count in history_categories.items()},
+        rating=RATING_WEIGHT,
+        popularity=POPULARITY_WEIGHT,
+        badge=BADGE_BONUS,
+    )
+    scores = features.score(weights)
+    
+    # Drop excluded products, then take the top results (ties keep catalog order)
+    excluded = np.zeros(len(catalog), dtype=bool)
+    excluded[[catalog.positions[pid] for pid in exclude_ids if pid in catalog.positions]] = True
+    positions = np.asarray(gender_positions, dtype=np.intp)
+    positions = positions[~excluded[positions]]
+    top = positions[top_k(-scores[positions], limit)]
+    
+    return [catalog.products[pos] for pos in top.tolist()]
 
 
+@traced()
 def get_trending(limit: int = 8) -> List[Dict]:
     """
     Get trending products based on popularity scores.
@@ -96,11 +130,7 @@ def get_trending(limit: int = 8) -> List[Dict]:
         List of trending products
     """
     gender = st.session_state.get("gender", "women")
-    
-    if gender == "men":
-        products = load_men_products()
-    else:
-        products = load_women_products()
+    products = get_catalog().gender_products("men" if gender == "men" else "women")
     
     # Sort by popularity
     trending = sorted(products, key=lambda x: x.get("popularity", 0), reverse=True)
@@ -108,10 +138,16 @@ def get_trending(limit: int = 8) -> List[Dict]:
     return trending[:limit]
 
 
+@traced()
 def get_similar_products(product_id: str, limit: int = 4) -> List[Dict]:
     """
     Get products similar to a given product.
     
+    Neighbors come from the catalog's precomputed similarity index, which
+    compares category, price, rating, skin type and ingredients. While
+    the index is still being built in the background, the product is
+    scored directly against the catalog on category, price and rating.
+    
     Args:
         product_id: ID of the reference product
         limit: Maximum number of similar products to return
@@ -119,59 +155,33 @@ def get_similar_products(product_id: str, limit: int = 4) -> List[Dict]:
     Returns:
         List of similar products
     """
-    # Load all products
-    all_products = load_women_products() + load_men_products()
+    catalog = get_catalog()
     
     # Find the reference product
-    reference = None
-    for product in all_products:
-        if product. get("id") == product_id:
-            reference = product
-            break
+    position = catalog.positions.get(product_id)
     
-    if not reference:
+    if position is None:
         return []
     
-    ref_category = reference.get("category", "")
-    ref_price = reference.get("price", 0)
-    
-    # Score similar products
-    similar = []
-    
-    for product in all_products:
-        if product.get("id") == product_id:
-            continue
-        
-        score = 0
-        
-        # Same category = high similarity
-        if product.get("category", "") == ref_category:
-            score += 50
-        
-        # Similar price range
-        price_diff = abs(product.get("price", 0) - ref_price)
-        if price_diff < 20:
-            score += 30
-        elif price_diff < 50:
-            score += 15
-        
-        # Similar rating
-        rating_diff = abs(product.get("rating", 0) - reference.get("rating", 0))
-        if rating_diff < 0.5:
-            score += 10
-        
-        if score > 0:
-            similar.append((score, product))
-    
-    similar.sort(key=lambda x: x[0], reverse=True)
-    
-    return [product for score, product in similar[:limit]]
+    index = catalog.similarity_index(wait=False)
+    if index is not None:
+        neighbors = index.similar(position, limit)
+    else:
+        engine = catalog.filter_engine()
+        neighbors = rank_similar(engine.category_codes, engine.price, engine.rating, position, limit)
+    
+    return [catalog.products[pos] for pos in neighbors.tolist()]
 
 
+@traced()
 def get_also_bought(product_id: str, limit: int = 4) -> List[Dict]:
     """
     Get products frequently bought together.
     
+    Products from real orders containing the reference product come
+    first; remaining slots are filled with top-rated products from
+    complementary categories.
+    
     Args:
         product_id: ID of the reference product
         limit: Maximum number of products to return
@@ -179,46 +189,29 @@ def get_also_bought(product_id: str, limit: int = 4) -> List[Dict]:
     Returns:
         List of complementary products
     """
-    # Load all products
-    all_products = load_women_products() + load_men_products()
+    catalog = get_catalog()
     
     # Find the reference product
-    reference = None
-    for product in all_products:
-        if product.get("id") == product_id:
-            reference = product
-            break
+    reference = catalog.get(product_id)
     
     if not reference:
         return []
     
-    ref_category = reference.get("category", "")
-    
-    # Define complementary categories
-    complements = {
-        "Lips": ["Eyes", "Face"],
-        "Eyes": ["Lips", "Face"],
-        "Face": ["Lips", "Eyes", "Skincare"],
-        "Skincare": ["Face", "Self-Care"],
-        "Self-Care": ["Skincare", "Perfumes"],
-        "Perfumes": ["Self-Care"],
-        "Hair-Care": ["Self-Care"],
-        "Makeup": ["Skincare", "Perfumes"],
-        "Beard-Care": ["Grooming", "Perfumes"],
-        "Grooming": ["Beard-Care", "Self-Care"],
-    }
-    
-    complement_categories = complements.get(ref_category, [])
-    
-    # Filter products from complementary categories
-    results = []
-    for product in all_products:
-        if product. get("id") == product_id:
-            continue
-        if product.get("category", "") in complement_categories:
+    # Products bought in the same orders
+    results = catalog.get_many(get_co_purchase_index().top(product_id, limit))
+    if len(results) >= limit:
+        return results
+    
+    # Fill up from complementary categories, best rated first (ranked once per catalog)
+    seen = {product_id} | {product.get("id") for product in results}
+    complement_categories = COMPLEMENT_CATEGORIES.get(reference.get("category", ""), [])
+    ranked = catalog.top_rated_positions(complement_categories)
+    # Skipped products are among the seen ones, so this slice always holds enough
+    for position in ranked[:limit - len(results) + len(seen)].tolist():
+        if len(results) >= limit:
+            break
+        product = catalog.products[position]
+        if product.get("id") not in seen:
             results.append(product)
     
-    # Sort by rating and return
-    results.sort(key=lambda x: x.get("rating", 0), reverse=True)
-    
-    return results[:limit]
\ No newline at end of file
+    return results
@@ -4,44 +4,134 @@ Handles product reviews and ratings.
 """
 
 import streamlit as st
-import json
-import os
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Tuple
 from utils.auth_manager import get_current_user_email, get_current_user
+from utils.storage import get_store
+from utils.tracing import traced
 
 
+@traced()
 def load_reviews() -> Dict:
     """
-    Load all reviews from JSON file.
+    Load all reviews from the review store.
     
     Returns:
         Dictionary with product IDs as keys and their reviews as values
     """
-    reviews_file = "data/reviews.json"
-    
-    if os.path.exists(reviews_file):
-        with open(reviews_file, 'r') as f:
-            return json.load(f)
-    else:
-        os.makedirs("data", exist_ok=True)
-        with open(reviews_file, 'w') as f:
-            json.dump({}, f)
-        return {}
+    return get_store("reviews").load_all()
 
 
+@traced()
 def save_reviews(reviews: Dict) -> None:
     """
-    Save reviews to JSON file.
+    Save reviews to the review store.
+    
+    Only products whose reviews changed are written.
     
     Args:
         reviews: Dictionary of all reviews
     """
-    reviews_file = "data/reviews.json"
-    os.makedirs("data", exist_ok=True)
+    get_store("reviews").save_all(reviews)
+
+
+@traced()
+def save_product_reviews(product_id: str, product_reviews: List[Dict]) -> Tuple:
+    """
+    Save the review list of one product.
+    
+    Args:
+        product_id: ID of the product
+        product_reviews: List of reviews for the product
+    
+    Returns:
+        Tuple of (store version right before the write, version after it)
+    """
+    return get_store("reviews").put_versioned(product_id, product_reviews)
+
+
+class ReviewAggregates:
+    """
+    Per-product review count, rating sum and 1-5 star histogram.
+    
+    One instance is shared by the whole process. It is rebuilt from the
+    review store when the store's version changes, and updated in place
+    by add_review/delete_review.
+    """
+    
+    def __init__(self):
+        self.table: Dict[str, Dict] = {}
+        self.version = None
+        self.built = False
+        self.lock = threading.Lock()
+    
+    def rebuild(self, reviews: Dict, version) -> None:
+        """
+        Recompute every product's aggregate.
+        
+        Args:
+            reviews: Dictionary of all reviews
+            version: Store version the reviews were read at
+        """
+        table = {}
+        for product_id, product_reviews in reviews.items():
+            for review in product_reviews:
+                self._add(table, product_id, review["rating"])
+        self.table = table
+        self.version = version
+        self.built = True
+    
+    @staticmethod
+    def _add(table: Dict, product_id: str, rating: int, sign: int = 1) -> None:
+        entry = table.setdefault(product_id, {"count": 0, "sum": 0, "histogram": [0, 0, 0, 0, 0]})
+        entry["count"] += sign
+        entry["sum"] += sign * rating
+        entry["histogram"][min(max(int(rating), 1), 5) - 1] += sign
+    
+    def apply(self, product_id: str, removed: List[int], added: List[int], version_before, version_after) -> None:
+        """
+        Apply one write's rating changes.
+        
+        The change is only applied if the aggregates match the store
+        version read right before the write (under the store's write lock);
+        otherwise another writer's change is missing, so they are marked
+        stale and rebuilt on next read.
+        
+        Args:
+            product_id: ID of the product
+            removed: Ratings removed by the write
+            added: Ratings added by the write
+            version_before: Store version right before the write, or None if unknown
+            version_after: Store version after the write
+        """
+        with self.lock:
+            if not self.built or version_before is None or self.version != version_before:
+                self.built = False
+                return
+            for rating in removed:
+                self._add(self.table, product_id, rating, sign=-1)
+            for rating in added:
+                self._add(self.table, product_id, rating)
+            self.version = version_after
+
+
+_aggregates = ReviewAggregates()
+
+
+def get_review_aggregates() -> ReviewAggregates:
+    """
+    Get the review aggregates, rebuilding them if the store changed.
     
-    with open(reviews_file, 'w') as f:
-        json.dump(reviews, f, indent=2)
+    Returns:
+        Shared ReviewAggregates instance
+    """
+    store = get_store("reviews")
+    version = store.version()
+    with _aggregates.lock:
+        if not _aggregates.built or version is None or _aggregates.version != version:
+            _aggregates.rebuild(store.load_all(), version)
+    return _aggregates
 
 
 def add_review(product_id: str, rating: int, comment: str) -> bool:
@@ -62,20 +152,20 @@ def add_review(product_id: str, rating: int, comment: str) -> bool:
     if not email:
         return False
     
-    reviews = load_reviews()
-    
-    # Initialize product reviews if needed
-    if product_id not in reviews:
-        reviews[product_id] = []
+    # Bring the aggregates up to date so this write can be applied incrementally
+    get_review_aggregates()
+    product_reviews = get_store("reviews").get(product_id, [])
     
     # Check if user already reviewed this product
-    for review in reviews[product_id]:
+    for review in product_reviews:
         if review["user_email"] == email:
             # Update existing review
+            old_rating = review["rating"]
             review["rating"] = rating
             review["comment"] = comment
             review["date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            save_reviews(reviews)
+            versions = save_product_reviews(product_id, product_reviews)
+            _aggregates.apply(product_id, [old_rating], [rating], *versions)
             return True
     
     # Add new review
@@ -87,8 +177,9 @@ def add_review(product_id: str, rating: int, comment: str) -> bool:
         "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
     
-    reviews[product_id].append(review)
-    save_reviews(reviews)
+    product_reviews.append(review)
+    versions = save_product_reviews(product_id, product_reviews)
+    _aggregates.apply(product_id, [], [rating], *versions)
     
     return True
 
@@ -103,8 +194,7 @@ def get_product_reviews(product_id: str) -> List[Dict]:
     Returns:
         List of reviews for the product
     """
-    reviews = load_reviews()
-    return reviews.get(product_id, [])
+    return get_store("reviews").get(product_id, [])
 
 
 def get_user_reviews() -> List[Dict]:
@@ -119,14 +209,11 @@ def get_user_reviews() -> List[Dict]:
     if not email:
         return []
     
-    reviews = load_reviews()
     user_reviews = []
     
-    for product_id, product_reviews in reviews.items():
-        for review in product_reviews:
-            if review["user_email"] == email:
-                review["product_id"] = product_id
-                user_reviews.append(review)
+    for product_id, review in get_store("reviews").find_items("user_email", email):
+        review["product_id"] = product_id
+        user_reviews.append(review)
     
     return user_reviews
 
@@ -146,11 +233,12 @@ def delete_review(product_id: str) -> bool:
     if not email:
         return False
     
-    reviews = load_reviews()
+    product_reviews = get_store("reviews").get(product_id)
     
-    if product_id in reviews:
-        reviews[product_id] = [r for r in reviews[product_id] if r["user_email"] != email]
-        save_reviews(reviews)
+    if product_reviews is not None:
+        removed = [r["rating"] for r in product_reviews if r["user_email"] == email]
+        versions = save_product_reviews(product_id, [r for r in product_reviews if r["user_email"] != email])
+        _aggregates.apply(product_id, removed, [], *versions)
         return True
     
     return False
@@ -166,13 +254,12 @@ def get_average_rating(product_id: str) -> float:
     Returns:
         Average rating (0-5)
     """
-    reviews = get_product_reviews(product_id)
+    entry = get_review_aggregates().table.get(product_id)
     
-    if not reviews:
+    if not entry or not entry["count"]:
         return 0.0
     
-    total_rating = sum(r["rating"] for r in reviews)
-    return round(total_rating / len(reviews), 1)
+    return round(entry["sum"] / entry["count"], 1)
 
 
 def get_review_count(product_id: str) -> int:
@@ -185,5 +272,41 @@ def get_review_count(product_id: str) -> int:
     Returns:
         Number of reviews
     """
-    reviews = get_product_reviews(product_id)
-    return len(reviews)
+    entry = get_review_aggregates().table.get(product_id)
+    return entry["count"] if entry else 0
+
+
+@traced()
+def get_ratings_for(product_ids: Iterable[str]) -> Dict[str, Tuple[float, int]]:
+    """
+    Get the average rating and review count of many products at once.
+    
+    Args:
+        product_ids: IDs of the products
+    
+    Returns:
+        Dictionary of product ID to (average rating, review count)
+    """
+    table = get_review_aggregates().table
+    ratings = {}
+    for product_id in product_ids:
+        entry = table.get(product_id)
+        if entry and entry["count"]:
+            ratings[product_id] = (round(entry["sum"] / entry["count"], 1), entry["count"])
+        else:
+            ratings[product_id] = (0.0, 0)
+    return ratings
+
+
+def get_rating_histogram(product_id: str) -> List[int]:
+    """
+    Get the number of 1- to 5-star reviews for a product.
+    
+    Args:
+        product_id: ID of the product
+    
+    Returns:
+        List of five counts, from 1 star to 5 stars
+    """
+    entry = get_review_aggregates().table.get(product_id)
+    return list(entry["histogram"]) if entry else [0, 0, 0, 0, 0]
@@ -0,0 +1,183 @@
+"""
+Full-text product search index for WERBEAUTY.
+Tokenized inverted index with prefix matching and BM25 ranking.
+"""
+
+import math
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Match-field bits reported for every search hit
+MATCH_NAME = 1
+MATCH_DESCRIPTION = 2
+MATCH_CATEGORY = 4
+MATCH_INGREDIENTS = 8
+
+# (field bit, product key, weight) for each indexed field
+SEARCH_FIELDS = (
+    (MATCH_NAME, "name", 3.0),
+    (MATCH_DESCRIPTION, "description", 1.0),
+    (MATCH_CATEGORY, "category", 2.0),
+    (MATCH_INGREDIENTS, "ingredients", 1.5),
+)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase alphanumeric tokens.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _field_text(product: Dict, key: str) -> str:
+    """Get the searchable text of a product field."""
+    value = product.get(key, "")
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return str(value or "")
+
+
+class SearchIndex:
+    """
+    Inverted index over product name, description, category and ingredients.
+
+    Each term maps to the documents containing it, a precomputed BM25F
+    term weight per document and a bitmask of the fields it occurs in.
+    Prefix queries expand against the sorted vocabulary with bisect.
+    """
+
+    def __init__(self, products: List[Dict]):
+        """
+        Build the index.
+
+        Args:
+            products: List of product dictionaries; positions in this list are document IDs
+        """
+        self.size = len(products)
+        field_tokens = []
+        field_lengths = {bit: np.zeros(self.size, dtype=np.float64) for bit, _, _ in SEARCH_FIELDS}
+
+        for doc, product in enumerate(products):
+            tokens_by_field = {}
+            for bit, key, _ in SEARCH_FIELDS:
+                tokens = tokenize(_field_text(product, key))
+                tokens_by_field[bit] = tokens
+                field_lengths[bit][doc] = len(tokens)
+            field_tokens.append(tokens_by_field)
+
+        # Per-field length normalization (BM25F)
+        norms = {}
+        for bit, _, _ in SEARCH_FIELDS:
+            lengths = field_lengths[bit]
+            average = lengths.mean() if self.size and lengths.mean() > 0 else 1.0
+            norms[bit] = 1.0 - BM25_B + BM25_B * lengths / average
+
+        weights = {bit: weight for bit, _, weight in SEARCH_FIELDS}
+        postings: Dict[str, Dict[int, list]] = {}
+
+        for doc, tokens_by_field in enumerate(field_tokens):
+            for bit, tokens in tokens_by_field.items():
+                if not tokens:
+                    continue
+                scale = weights[bit] / norms[bit][doc]
+                for token in tokens:
+                    entry = postings.setdefault(token, {}).get(doc)
+                    if entry is None:
+                        postings[token][doc] = [scale, bit]
+                    else:
+                        entry[0] += scale
+                        entry[1] |= bit
+
+        self.vocabulary: List[str] = sorted(postings)
+        self.term_docs: Dict[str, np.ndarray] = {}
+        self.term_scores: Dict[str, np.ndarray] = {}
+        self.term_masks: Dict[str, np.ndarray] = {}
+
+        for term, docs in postings.items():
+            doc_ids = np.fromiter(docs.keys(), dtype=np.int32, count=len(docs))
+            weighted_tf = np.fromiter((entry[0] for entry in docs.values()), dtype=np.float64, count=len(docs))
+            idf = math.log(1.0 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            self.term_docs[term] = doc_ids
+            self.term_scores[term] = idf * weighted_tf * (BM25_K1 + 1.0) / (weighted_tf + BM25_K1)
+            self.term_masks[term] = np.fromiter((entry[1] for entry in docs.values()), dtype=np.uint8, count=len(docs))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def expand(self, prefix: str) -> List[str]:
+        """
+        Get the vocabulary terms starting with a prefix.
+
+        Args:
+            prefix: Token prefix
+
+        Returns:
+            Every matching term in sorted order, the exact term first when present
+        """
+        lo = bisect_left(self.vocabulary, prefix)
+        hi = bisect_left(self.vocabulary, prefix + "\uffff", lo)
+        return self.vocabulary[lo:hi]
+
+    def search(self, query: str, candidates: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the index.
+
+        Every query token must match a term by prefix; documents are ranked
+        by the summed BM25F score of their best-matching term per token.
+        A query without any tokens (e.g. "" or "!!") filters nothing.
+
+        Args:
+            query: Search query string
+            candidates: Optional document IDs to restrict results to
+
+        Returns:
+            Tuple of (ranked document IDs, match-field bitmask per result);
+            without tokens, the candidates (or every document) unchanged
+        """
+        tokens = tokenize(query or "")
+        if not tokens:
+            docs = np.arange(self.size, dtype=np.intp) if candidates is None else np.asarray(candidates, dtype=np.intp)
+            return docs, np.zeros(len(docs), dtype=np.uint8)
+        if not self.size:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.uint8)
+
+        total = np.zeros(self.size, dtype=np.float64)
+        masks = np.zeros(self.size, dtype=np.uint8)
+        matched = np.ones(self.size, dtype=bool)
+        if candidates is not None:
+            allowed = np.zeros(self.size, dtype=bool)
+            allowed[np.asarray(candidates, dtype=np.intp)] = True
+            matched &= allowed
+
+        for token in dict.fromkeys(tokens):
+            token_score = np.zeros(self.size, dtype=np.float64)
+            token_hit = np.zeros(self.size, dtype=bool)
+            terms = self.expand(token)
+            if terms:
+                # Union of the postings of every expansion, best term per document
+                docs = np.concatenate([self.term_docs[term] for term in terms])
+                np.maximum.at(token_score, docs, np.concatenate([self.term_scores[term] for term in terms]))
+                np.bitwise_or.at(masks, docs, np.concatenate([self.term_masks[term] for term in terms]))
+                token_hit[docs] = True
+            matched &= token_hit
+            total += token_score
+
+        docs = np.flatnonzero(matched)
+        order = np.argsort(-total[docs], kind="stable")
+        docs = docs[order]
+        return docs, masks[docs]
@@ -0,0 +1,157 @@
+"""
+Sharded JSON storage backend for WERBEAUTY.
+Stores every document in its own file so a write touches one user's data.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from typing import Any, Dict, Iterator, Tuple
+
+from utils.storage import DocumentStore, FileLock, JournaledJSONStore, atomic_write_json
+
+
+# Name of the write token file inside a collection directory
+VERSION_FILENAME = ".version"
+
+
+class ShardedJSONStore(DocumentStore):
+    """
+    One JSON file per document under a collection directory.
+
+    Documents live in ``<directory>/<hh>/<hash>.json``, where the hash is
+    the SHA-256 of the key and ``hh`` its first two hex digits, so no
+    directory grows past a few hundred entries per thousand keys. Each
+    file holds ``{"key": ..., "value": ...}`` and is replaced atomically,
+    so writers never rewrite or lock other users' documents. Every write
+    then atomically replaces ``<directory>/.version`` with a fresh random
+    token, the version caches compare. Only that replace runs under the
+    ``.version.lock`` file lock, so writers of different documents still
+    never wait on each other's document writes.
+    """
+
+    has_point_lookup = True
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Collection directory, e.g. data/users
+        """
+        self.directory = directory
+        self.version_path = os.path.join(directory, VERSION_FILENAME)
+        self.lock_path = self.version_path + ".lock"
+
+    def _path(self, key: str) -> str:
+        """Get the file holding a key's document."""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, digest[:2], digest + ".json")
+
+    def _bump_version_unlocked(self) -> None:
+        # Written after the document, so a cache that read the old token
+        # before loading always sees a new one once the write is visible
+        atomic_write_json(self.version_path, uuid.uuid4().hex, indent=None)
+
+    def _bump_version(self) -> None:
+        # Locked so no token lands between put_versioned's before and after reads
+        with FileLock(self.lock_path):
+            self._bump_version_unlocked()
+
+    def _read(self, path: str) -> Tuple[str, Any]:
+        with open(path, "r") as f:
+            entry = json.load(f)
+        return entry["key"], entry["value"]
+
+    def _files(self) -> Iterator[str]:
+        if not os.path.isdir(self.directory):
+            return
+        for shard in sorted(os.listdir(self.directory)):
+            shard_dir = os.path.join(self.directory, shard)
+            if shard.startswith(".") or not os.path.isdir(shard_dir):
+                continue
+            for name in sorted(os.listdir(shard_dir)):
+                if name.endswith(".json"):
+                    yield os.path.join(shard_dir, name)
+
+    def load_all(self) -> Dict[str, Any]:
+        documents = {}
+        for path in self._files():
+            try:
+                key, value = self._read(path)
+            except FileNotFoundError:
+                continue  # Deleted while listing
+            documents[key] = value
+        return documents
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            stored_key, value = self._read(self._path(key))
+        except FileNotFoundError:
+            return default
+        return value if stored_key == key else default
+
+    def put(self, key: str, value: Any) -> None:
+        atomic_write_json(self._path(key), {"key": key, "value": value}, indent=None)
+        self._bump_version()
+
+    def put_versioned(self, key: str, value: Any) -> Tuple[Any, Any]:
+        with FileLock(self.lock_path):
+            version_before = self.version()
+            atomic_write_json(self._path(key), {"key": key, "value": value}, indent=None)
+            self._bump_version_unlocked()
+            return version_before, self.version()
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            return
+        self._bump_version()
+
+    def version(self) -> Any:
+        try:
+            with open(self.version_path, "r") as f:
+                return f.read()
+        except OSError:
+            return ""
+
+
+def create_store(collection: str, data_dir: str) -> ShardedJSONStore:
+    """
+    Create the sharded store for a collection.
+
+    Args:
+        collection: Collection name: 'users', 'orders' or 'reviews'
+        data_dir: Data directory; documents go to <data_dir>/<collection>/
+
+    Returns:
+        ShardedJSONStore for the collection
+    """
+    return ShardedJSONStore(os.path.join(data_dir, collection))
+
+
+def migrate_from_json(data_dir: str, overwrite: bool = False) -> Dict[str, int]:
+    """
+    Split data/users.json, orders.json and reviews.json into sharded stores.
+
+    Pending journal entries are included.
+
+    Args:
+        data_dir: Data directory holding the JSON files
+        overwrite: Replace existing sharded documents instead of refusing to run
+
+    Returns:
+        Dictionary of collection name to number of documents written
+    """
+    if not overwrite:
+        for collection in ("users", "orders", "reviews"):
+            if create_store(collection, data_dir).load_all():
+                raise RuntimeError(f"{os.path.join(data_dir, collection)} already contains documents; "
+                                   "migrate with overwrite to replace them")
+
+    counts = {}
+    for collection in ("users", "orders", "reviews"):
+        documents = JournaledJSONStore(os.path.join(data_dir, f"{collection}.json")).load_all()
+        create_store(collection, data_dir).save_all(documents)
+        counts[collection] = len(documents)
+    return counts
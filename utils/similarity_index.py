@@ -0,0 +1,253 @@
+"""
+Item-item similarity index for WERBEAUTY.
+Precomputes each product's most similar products as compact arrays.
+"""
+
+import math
+import numpy as np
+from typing import Dict, List, Optional
+
+from utils.filter_engine import _encode
+
+
+# Neighbors stored per product
+SIMILAR_NEIGHBORS = 16
+
+# Rows of the pairwise score matrix computed at once (bounds peak memory)
+SIMILARITY_BLOCK_ELEMENTS = 1_000_000
+
+# Scores are compared at this resolution (1 / SCORE_QUANTUM points)
+SCORE_QUANTUM = 10_000
+
+# Similarity points per shared feature
+CATEGORY_POINTS = 50
+PRICE_CLOSE_POINTS = 30    # price within $20
+PRICE_NEAR_POINTS = 15     # price within $50
+RATING_POINTS = 10         # rating within 0.5
+INGREDIENT_POINTS = 20     # scaled by ingredient cosine similarity
+SKIN_TYPE_POINTS = 10      # same specific skin type
+
+ALL_SKIN_TYPES = "All Skin Types"
+
+
+class _IngredientPostings:
+    """
+    Sparse L2-normalized IDF-weighted ingredient vectors.
+
+    Stored both by product (CSR rows) and by ingredient (postings), so
+    the overlap of a block of products with the whole catalog only visits
+    the products that share an ingredient with them.
+    """
+
+    def __init__(self, products: List[Dict]):
+        """
+        Ingredients used by a single product cannot make two products
+        similar, so they are left out of the vocabulary.
+
+        Args:
+            products: List of product dictionaries
+        """
+        count = len(products)
+        ingredient_lists = [
+            sorted({str(name).strip().lower() for name in p.get("ingredients", []) or []})
+            for p in products
+        ]
+        document_counts: Dict[str, int] = {}
+        for names in ingredient_lists:
+            for name in names:
+                document_counts[name] = document_counts.get(name, 0) + 1
+
+        vocabulary = {name: i for i, name in enumerate(n for n, c in document_counts.items() if c > 1)}
+        idf = np.empty(len(vocabulary), dtype=np.float32)
+        for name, column in vocabulary.items():
+            idf[column] = math.log(count / document_counts[name]) + 1.0
+
+        row_columns = [[vocabulary[name] for name in names if name in vocabulary] for names in ingredient_lists]
+        lengths = np.fromiter((len(columns) for columns in row_columns), dtype=np.int64, count=count)
+        self.indptr = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.columns = np.fromiter((c for columns in row_columns for c in columns), dtype=np.int64,
+                                   count=int(self.indptr[-1]))
+        self.rows = np.repeat(np.arange(count, dtype=np.int64), lengths)
+        self.weights = idf[self.columns]
+        norms = np.sqrt(np.bincount(self.rows, weights=self.weights.astype(np.float64) ** 2, minlength=count))
+        self.weights = (self.weights / norms[self.rows]).astype(np.float32)
+
+        # Postings: products per ingredient, in column order
+        order = np.argsort(self.columns, kind="stable")
+        self.posting_rows = self.rows[order]
+        self.posting_weights = self.weights[order]
+        self.posting_ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.columns, minlength=len(vocabulary)), out=self.posting_ptr[1:])
+        self.count = count
+
+    def __bool__(self) -> bool:
+        return bool(len(self.columns))
+
+    def overlap(self, start: int, stop: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Cosine similarity of products [start, stop) with every product.
+
+        Pairs are expanded through the postings in chunks of at most
+        SIMILARITY_BLOCK_ELEMENTS, so memory stays bounded even for an
+        ingredient shared by every product.
+
+        Args:
+            start: First product position
+            stop: Position after the last product
+            out: Optional float64 array of shape (stop - start, count) to write to
+
+        Returns:
+            Float64 matrix of shape (stop - start, count)
+        """
+        rows = stop - start
+        if out is None:
+            out = np.empty((rows, self.count), dtype=np.float64)
+        result = out.reshape(-1)
+        result.fill(0.0)
+        first, last = int(self.indptr[start]), int(self.indptr[stop])
+        entry_rows = self.rows[first:last] - start
+        entry_columns = self.columns[first:last]
+        entry_weights = self.weights[first:last]
+        lengths = self.posting_ptr[entry_columns + 1] - self.posting_ptr[entry_columns]
+        ends = np.cumsum(lengths)
+
+        chunk_start = 0
+        while chunk_start < len(lengths):
+            limit = (ends[chunk_start - 1] if chunk_start else 0) + SIMILARITY_BLOCK_ELEMENTS
+            chunk_stop = max(chunk_start + 1, int(np.searchsorted(ends, limit, side="right")))
+            chunk = slice(chunk_start, chunk_stop)
+            chunk_lengths = lengths[chunk]
+            total = int(chunk_lengths.sum())
+            if total:
+                # Position of every pair inside its ingredient's postings
+                offsets = np.arange(total) - np.repeat(np.cumsum(chunk_lengths) - chunk_lengths, chunk_lengths)
+                postings = np.repeat(self.posting_ptr[entry_columns[chunk]], chunk_lengths) + offsets
+                cells = np.repeat(entry_rows[chunk], chunk_lengths) * self.count + self.posting_rows[postings]
+                values = np.repeat(entry_weights[chunk], chunk_lengths) * self.posting_weights[postings]
+                result += np.bincount(cells, weights=values, minlength=len(result))
+            chunk_start = chunk_stop
+        return out
+
+
+class SimilarityIndex:
+    """
+    Top-K most similar products for every product.
+
+    Similarity is a points score over category, price, rating, skin type
+    and shared ingredients. Neighbors are stored in an (n, K) position
+    array padded with -1, so a lookup is a single row slice.
+    """
+
+    def __init__(self, products: List[Dict], neighbors: int = SIMILAR_NEIGHBORS):
+        """
+        Build the index.
+
+        Args:
+            products: List of product dictionaries; positions in this list are used throughout
+            neighbors: Number of neighbors to keep per product
+        """
+        count = len(products)
+        self.size = count
+        self.neighbors = np.full((count, neighbors), -1, dtype=np.int32)
+        self.scores = np.zeros((count, neighbors), dtype=np.float32)
+        if not count:
+            return
+
+        category_codes = _encode([p.get("category", "") for p in products])[1]
+        skin_types, skin_codes = _encode([p.get("skin_type") or ALL_SKIN_TYPES for p in products])
+        if ALL_SKIN_TYPES in skin_types:
+            # Products for every skin type don't share a specific one
+            skin_codes = np.where(skin_codes == skin_types.index(ALL_SKIN_TYPES), -1, skin_codes)
+        price = np.fromiter((p.get("price", 0) for p in products), dtype=np.float64, count=count)
+        rating = np.fromiter((p.get("rating", 0) for p in products), dtype=np.float64, count=count)
+        ingredients = _IngredientPostings(products)
+
+        block = max(1, SIMILARITY_BLOCK_ELEMENTS // count)
+        for start in range(0, count, block):
+            rows = np.arange(start, min(start + block, count))
+
+            # Built in place in one float64 buffer to keep temporaries to a minimum
+            score = np.multiply(category_codes[rows, None] == category_codes[None, :], float(CATEGORY_POINTS))
+            difference = np.abs(price[rows, None] - price[None, :])
+            score += np.multiply(difference < 50, float(PRICE_NEAR_POINTS))
+            score += np.multiply(difference < 20, float(PRICE_CLOSE_POINTS - PRICE_NEAR_POINTS))
+            np.abs(np.subtract(rating[rows, None], rating[None, :], out=difference), out=difference)
+            score += np.multiply(difference < 0.5, float(RATING_POINTS))
+            score += np.multiply((skin_codes[rows, None] == skin_codes[None, :]) & (skin_codes[rows, None] >= 0),
+                                 float(SKIN_TYPE_POINTS))
+            if ingredients:
+                score += INGREDIENT_POINTS * ingredients.overlap(rows[0], rows[-1] + 1, out=difference)
+            score[np.arange(len(rows)), rows] = 0.0
+
+            # Unique keys: quantized score, ties broken by lower position. They are
+            # integers below 2**53, so float64 holds them exactly
+            keys = np.rint(np.multiply(score, SCORE_QUANTUM, out=difference), out=difference)
+            keys *= count
+            keys += count - 1 - np.arange(count)
+            take = min(neighbors, count)
+            chosen = np.argpartition(-keys, take - 1, axis=1)[:, :take]
+            order = np.argsort(-np.take_along_axis(keys, chosen, axis=1), axis=1)
+            chosen = np.take_along_axis(chosen, order, axis=1)
+            chosen_scores = np.take_along_axis(score, chosen, axis=1)
+            self.neighbors[rows, :take] = np.where(chosen_scores > 0, chosen, -1)
+            self.scores[rows, :take] = np.where(chosen_scores > 0, chosen_scores, 0.0)
+
+    @classmethod
+    def from_arrays(cls, neighbors: np.ndarray, scores: np.ndarray) -> "SimilarityIndex":
+        """
+        Wrap stored neighbor arrays, e.g. memory-mapped ones from a snapshot.
+
+        Returns:
+            SimilarityIndex using the arrays as-is
+        """
+        index = cls.__new__(cls)
+        index.size = len(neighbors)
+        index.neighbors = neighbors
+        index.scores = scores
+        return index
+
+    def __len__(self) -> int:
+        return self.size
+
+    def similar(self, position: int, limit: int = SIMILAR_NEIGHBORS) -> np.ndarray:
+        """
+        Get the most similar products to a product.
+
+        Args:
+            position: Position of the reference product
+            limit: Maximum number of neighbors (at most the stored K)
+
+        Returns:
+            Positions of similar products, most similar first
+        """
+        row = self.neighbors[position, :limit]
+        return row[row >= 0].astype(np.intp)
+
+
+def rank_similar(category_codes: np.ndarray, price: np.ndarray, rating: np.ndarray,
+                 position: int, limit: int = SIMILAR_NEIGHBORS) -> np.ndarray:
+    """
+    Score one product against the whole catalog on category, price and rating.
+
+    Used while the similarity index is still being built: a single O(n)
+    pass over existing columns, without the ingredient and skin type terms.
+
+    Args:
+        category_codes: Category code per product
+        price: Price per product
+        rating: Rating per product
+        position: Position of the reference product
+        limit: Maximum number of neighbors
+
+    Returns:
+        Positions of similar products, most similar first, ties by position
+    """
+    score = CATEGORY_POINTS * (category_codes == category_codes[position])
+    price_diff = np.abs(price - price[position])
+    score = score + np.where(price_diff < 20, PRICE_CLOSE_POINTS, np.where(price_diff < 50, PRICE_NEAR_POINTS, 0))
+    score = score + RATING_POINTS * (np.abs(rating - rating[position]) < 0.5)
+    score[position] = 0
+    candidates = np.flatnonzero(score > 0)
+    order = np.lexsort((candidates, -score[candidates]))[:limit]
+    return candidates[order].astype(np.intp)
@@ -0,0 +1,336 @@
+"""
+SQLite storage backend for WERBEAUTY.
+Stores users, carts, orders and reviews in indexed tables.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Tuple
+
+from utils.storage import DocumentStore, JournaledJSONStore
+
+
+DB_FILENAME = "werbeauty.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    email TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS carts (
+    email TEXT PRIMARY KEY,
+    items TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL,
+    order_id TEXT NOT NULL,
+    date TEXT,
+    status TEXT,
+    total REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_email ON orders (email, id);
+CREATE INDEX IF NOT EXISTS idx_orders_order_id ON orders (order_id);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id TEXT NOT NULL,
+    user_email TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    date TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_product_id ON reviews (product_id, id);
+CREATE INDEX IF NOT EXISTS idx_reviews_user_email ON reviews (user_email);
+
+CREATE TABLE IF NOT EXISTS meta (
+    collection TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteDatabase:
+    """
+    Per-thread SQLite connections to one database file.
+
+    Connections run in WAL mode so readers in other sessions and
+    processes are not blocked by a writer.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Database file path
+        """
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Get this thread's connection, opening it on first use.
+
+        Returns:
+            sqlite3.Connection
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+
+def _bump_version(conn: sqlite3.Connection, collection: str) -> None:
+    """Increment a collection's version inside the caller's transaction."""
+    conn.execute(
+        "INSERT INTO meta (collection, version) VALUES (?, 1) "
+        "ON CONFLICT(collection) DO UPDATE SET version = version + 1",
+        (collection,),
+    )
+
+
+def _read_version(conn: sqlite3.Connection, collection: str) -> int:
+    """Get a collection's version (0 before its first write)."""
+    row = conn.execute("SELECT version FROM meta WHERE collection = ?", (collection,)).fetchone()
+    return row[0] if row else 0
+
+
+_databases: Dict[str, SQLiteDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(data_dir: str) -> SQLiteDatabase:
+    """
+    Get the shared database for a data directory.
+
+    Args:
+        data_dir: Data directory containing werbeauty.db
+
+    Returns:
+        SQLiteDatabase instance
+    """
+    path = os.path.join(data_dir, DB_FILENAME)
+    with _databases_lock:
+        if path not in _databases:
+            _databases[path] = SQLiteDatabase(path)
+        return _databases[path]
+
+
+class SQLiteUserStore(DocumentStore):
+    """User documents keyed by email; each user's cart lives in the carts table."""
+
+    has_point_lookup = True
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def load_all(self) -> Dict[str, Any]:
+        conn = self.db.connection()
+        carts = dict(conn.execute("SELECT email, items FROM carts"))
+        users = {}
+        for email, data in conn.execute("SELECT email, data FROM users ORDER BY rowid"):
+            user = json.loads(data)
+            user["cart"] = json.loads(carts.get(email, "[]"))
+            users[email] = user
+        return users
+
+    def get(self, key: str, default: Any = None) -> Any:
+        conn = self.db.connection()
+        row = conn.execute("SELECT data FROM users WHERE email = ?", (key,)).fetchone()
+        if row is None:
+            return default
+        user = json.loads(row[0])
+        cart = conn.execute("SELECT items FROM carts WHERE email = ?", (key,)).fetchone()
+        user["cart"] = json.loads(cart[0]) if cart else []
+        return user
+
+    def put(self, key: str, value: Any) -> None:
+        user = dict(value)
+        cart = user.pop("cart", [])
+        with self.db.connection() as conn:
+            conn.execute(
+                "INSERT INTO users (email, data) VALUES (?, ?) "
+                "ON CONFLICT(email) DO UPDATE SET data = excluded.data",
+                (key, json.dumps(user)),
+            )
+            self._put_cart(conn, key, cart)
+            _bump_version(conn, "users")
+
+    def put_cart(self, key: str, cart: List) -> bool:
+        """
+        Store only a user's cart, without reading or rewriting the user row.
+
+        Args:
+            key: User email
+            cart: Cart items
+
+        Returns:
+            True if stored, False if the user does not exist
+        """
+        with self.db.connection() as conn:
+            written = conn.execute(
+                "INSERT INTO carts (email, items) SELECT ?, ? WHERE EXISTS (SELECT 1 FROM users WHERE email = ?) "
+                "ON CONFLICT(email) DO UPDATE SET items = excluded.items",
+                (key, json.dumps(cart), key),
+            ).rowcount
+            if written:
+                _bump_version(conn, "users")
+        return bool(written)
+
+    def _put_cart(self, conn: sqlite3.Connection, key: str, cart: List) -> None:
+        conn.execute(
+            "INSERT INTO carts (email, items) VALUES (?, ?) "
+            "ON CONFLICT(email) DO UPDATE SET items = excluded.items",
+            (key, json.dumps(cart)),
+        )
+
+    def delete(self, key: str) -> None:
+        with self.db.connection() as conn:
+            conn.execute("DELETE FROM users WHERE email = ?", (key,))
+            conn.execute("DELETE FROM carts WHERE email = ?", (key,))
+            _bump_version(conn, "users")
+
+    def version(self) -> Any:
+        return _read_version(self.db.connection(), "users")
+
+
+class SQLiteListStore(DocumentStore):
+    """
+    Lists of records keyed by one column, one table row per record.
+
+    Used for orders (keyed by email) and reviews (keyed by product_id).
+    Rows keep insertion order through the table's integer primary key.
+    """
+
+    has_point_lookup = True
+
+    def __init__(self, db: SQLiteDatabase, table: str, key_column: str, columns: Tuple[str, ...],
+                 indexed_fields: Tuple[str, ...]):
+        """
+        Args:
+            db: Database to use
+            table: Table name
+            key_column: Column holding the document key
+            columns: Record fields copied into their own columns
+            indexed_fields: Record fields that find_items can look up by index
+        """
+        self.db = db
+        self.table = table
+        self.key_column = key_column
+        self.columns = columns
+        self.indexed_fields = indexed_fields
+
+    def load_all(self) -> Dict[str, Any]:
+        documents: Dict[str, List] = {}
+        query = f"SELECT {self.key_column}, data FROM {self.table} ORDER BY id"
+        for key, data in self.db.connection().execute(query):
+            documents.setdefault(key, []).append(json.loads(data))
+        return documents
+
+    def get(self, key: str, default: Any = None) -> Any:
+        query = f"SELECT data FROM {self.table} WHERE {self.key_column} = ? ORDER BY id"
+        rows = self.db.connection().execute(query, (key,)).fetchall()
+        if not rows:
+            return default
+        return [json.loads(data) for (data,) in rows]
+
+    def put(self, key: str, value: Any) -> None:
+        with self.db.connection() as conn:
+            self._put(conn, key, value)
+
+    def put_versioned(self, key: str, value: Any) -> Tuple[Any, Any]:
+        conn = self.db.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")  # Take the write lock before reading the version
+            version_before = _read_version(conn, self.table)
+            self._put(conn, key, value)
+            return version_before, _read_version(conn, self.table)
+
+    def _put(self, conn: sqlite3.Connection, key: str, value: Any) -> None:
+        names = (self.key_column,) + self.columns + ("data",)
+        insert = f"INSERT INTO {self.table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+        conn.execute(f"DELETE FROM {self.table} WHERE {self.key_column} = ?", (key,))
+        conn.executemany(
+            insert,
+            [(key,) + tuple(record.get(column) for column in self.columns) + (json.dumps(record),)
+             for record in value],
+        )
+        _bump_version(conn, self.table)
+
+    def delete(self, key: str) -> None:
+        with self.db.connection() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE {self.key_column} = ?", (key,))
+            _bump_version(conn, self.table)
+
+    def version(self) -> Any:
+        return _read_version(self.db.connection(), self.table)
+
+    def find_items(self, field: str, value: Any) -> List[Tuple[str, Dict]]:
+        if field not in self.indexed_fields:
+            return super().find_items(field, value)
+        query = f"SELECT {self.key_column}, data FROM {self.table} WHERE {field} = ? ORDER BY id"
+        return [(key, json.loads(data)) for key, data in self.db.connection().execute(query, (value,))]
+
+
+def create_store(collection: str, data_dir: str) -> DocumentStore:
+    """
+    Create the SQLite store for a collection.
+
+    Args:
+        collection: 'users', 'orders' or 'reviews'
+        data_dir: Data directory containing werbeauty.db
+
+    Returns:
+        DocumentStore backed by SQLite
+    """
+    db = get_database(data_dir)
+    if collection == "users":
+        return SQLiteUserStore(db)
+    if collection == "orders":
+        return SQLiteListStore(db, "orders", "email", ("order_id", "date", "status", "total"), ("order_id",))
+    if collection == "reviews":
+        return SQLiteListStore(db, "reviews", "product_id", ("user_email", "rating", "date"), ("user_email",))
+    raise ValueError(f"Unknown collection: {collection}")
+
+
+def migrate_from_json(data_dir: str, overwrite: bool = False) -> Dict[str, int]:
+    """
+    Import data/users.json, orders.json and reviews.json into SQLite.
+
+    Pending journal entries are included.
+
+    Args:
+        data_dir: Data directory holding the JSON files and the database
+        overwrite: Replace existing rows instead of refusing to run
+
+    Returns:
+        Dictionary of collection name to number of documents imported
+    """
+    db = get_database(data_dir)
+    conn = db.connection()
+    if not overwrite:
+        for table in ("users", "orders", "reviews"):
+            if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                raise RuntimeError(f"{db.path} already contains {table}; migrate with overwrite to replace them")
+
+    counts = {}
+    for collection in ("users", "orders", "reviews"):
+        documents = JournaledJSONStore(os.path.join(data_dir, f"{collection}.json")).load_all()
+        store = create_store(collection, data_dir)
+        store.save_all(documents)
+        counts[collection] = len(documents)
+    return counts
@@ -0,0 +1,385 @@
+"""
+Document storage backends for WERBEAUTY.
+Persists users, orders and reviews as keyed JSON documents.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+DATA_DIR = os.environ.get("WERBEAUTY_DATA_DIR", "data")
+STORAGE_BACKEND = os.environ.get("WERBEAUTY_STORAGE", "json")
+
+# Compact the journal once it grows past this many bytes (or the snapshot size)
+JOURNAL_COMPACT_BYTES = 64 * 1024
+
+
+class FileLock:
+    """
+    Cross-process advisory lock on a sidecar lock file.
+
+    Uses flock on POSIX and msvcrt.locking on Windows. Shared locks fall
+    back to exclusive locks where the platform has no shared mode.
+    """
+
+    def __init__(self, path: str, shared: bool = False):
+        """
+        Args:
+            path: Lock file path
+            shared: Take a shared (reader) lock instead of an exclusive one
+        """
+        self.path = path
+        self.shared = shared
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 2) -> None:
+    """
+    Write JSON to a file atomically.
+
+    The data is written to a temporary file in the same directory, synced,
+    and renamed over the target so readers never see a partial file.
+
+    Args:
+        path: Target file path
+        data: JSON-serializable data
+        indent: JSON indentation
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _stat_version(path: str) -> Optional[tuple]:
+    """Get (mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class DocumentStore(ABC):
+    """
+    Base class for a collection of JSON documents keyed by string.
+
+    Subclasses must implement load_all, put and delete; save_all writes
+    only the documents that differ from what is stored.
+    """
+
+    # True when get() reads one document without loading the collection;
+    # callers without it should read from a shared parse of load_all()
+    has_point_lookup = False
+
+    @abstractmethod
+    def load_all(self) -> Dict[str, Any]:
+        """
+        Load every document.
+
+        Returns:
+            Dictionary of key to document
+        """
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Load one document.
+
+        Args:
+            key: Document key
+            default: Value returned when the key does not exist
+
+        Returns:
+            The document or default
+        """
+        return self.load_all().get(key, default)
+
+    @abstractmethod
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store one document, replacing any previous version.
+
+        Args:
+            key: Document key
+            value: JSON-serializable document
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Remove one document if it exists.
+
+        Args:
+            key: Document key
+        """
+
+    def put_versioned(self, key: str, value: Any) -> Tuple[Any, Any]:
+        """
+        Store one document and report the store versions around the write.
+
+        Caches that apply a write incrementally compare version_before with
+        the version they were built at: if another writer got in first, its
+        change is not in the cache and the cache must be rebuilt instead.
+        Backends that can read the version and write atomically override
+        this; the default cannot, so it reports version_before as None.
+
+        Args:
+            key: Document key
+            value: JSON-serializable document
+
+        Returns:
+            Tuple of (version right before the write, version right after it)
+        """
+        self.put(key, value)
+        return None, self.version()
+
+    def version(self) -> Any:
+        """
+        Get a cheap token that changes whenever the stored data changes.
+
+        Caches built from the store compare tokens instead of reloading.
+
+        Returns:
+            Hashable version token, or None if the backend cannot tell
+        """
+        return None
+
+    def find_items(self, field: str, value: Any) -> List[Tuple[str, Dict]]:
+        """
+        Find records inside list-valued documents by a field value.
+
+        Backends with an index on the field answer this without loading
+        every document; the default implementation scans.
+
+        Args:
+            field: Record field to match, e.g. 'user_email'
+            value: Value the field must equal
+
+        Returns:
+            List of (document key, record) pairs
+        """
+        matches = []
+        for key, records in self.load_all().items():
+            for record in records:
+                if record.get(field) == value:
+                    matches.append((key, record))
+        return matches
+
+    def save_all(self, documents: Dict[str, Any]) -> None:
+        """
+        Make the stored collection equal to documents.
+
+        Only changed and removed keys are written.
+
+        Args:
+            documents: Dictionary of key to document
+        """
+        current = self.load_all()
+        for key, value in documents.items():
+            if key not in current or current[key] != value:
+                self.put(key, value)
+        for key in current:
+            if key not in documents:
+                self.delete(key)
+
+
+class JournaledJSONStore(DocumentStore):
+    """
+    JSON snapshot file plus an append-only journal of changes.
+
+    The snapshot keeps the original ``{key: document}`` file format. Each
+    put or delete appends one JSON line to ``<file>.journal``, so a write
+    costs O(record) instead of rewriting the whole file. Once the journal
+    grows past the compaction threshold, the snapshot is rewritten
+    atomically and the journal is truncated. Journal entries are
+    idempotent, so replaying them after an interrupted compaction is safe.
+    All file access goes through a cross-process lock on ``<file>.lock``.
+    """
+
+    def __init__(self, path: str, compact_bytes: int = JOURNAL_COMPACT_BYTES):
+        """
+        Args:
+            path: Snapshot file path, e.g. data/users.json
+            compact_bytes: Journal size that triggers compaction
+        """
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.lock_path = path + ".lock"
+        self.compact_bytes = compact_bytes
+
+    def _read_unlocked(self) -> Dict[str, Any]:
+        """Read the snapshot and replay the journal (caller holds the lock)."""
+        documents = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                content = f.read()
+            if content.strip():
+                documents = json.loads(content)
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Torn final write
+                    if entry.get("op") == "put":
+                        documents[entry["key"]] = entry["value"]
+                    elif entry.get("op") == "delete":
+                        documents.pop(entry["key"], None)
+        return documents
+
+    def _append_unlocked(self, entry: Dict) -> None:
+        """Append one journal entry and compact if needed (caller holds the lock)."""
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        self._repair_unlocked()
+        with open(self.journal_path, "a") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            journal_size = f.tell()
+
+        snapshot_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if journal_size > max(self.compact_bytes, snapshot_size):
+            self._compact_unlocked()
+
+    def _repair_unlocked(self) -> None:
+        """Drop a torn final journal line left by a crashed writer (caller holds the lock)."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            content = f.read()
+            f.truncate(content.rfind(b"\n") + 1)
+
+    def _compact_unlocked(self) -> None:
+        """Fold the journal into the snapshot (caller holds the lock)."""
+        atomic_write_json(self.path, self._read_unlocked())
+        with open(self.journal_path, "w"):
+            pass
+
+    def load_all(self) -> Dict[str, Any]:
+        with FileLock(self.lock_path, shared=True):
+            return self._read_unlocked()
+
+    def version(self) -> Any:
+        return (_stat_version(self.path), _stat_version(self.journal_path))
+
+    def put(self, key: str, value: Any) -> None:
+        with FileLock(self.lock_path):
+            self._append_unlocked({"op": "put", "key": key, "value": value})
+
+    def put_versioned(self, key: str, value: Any) -> Tuple[Any, Any]:
+        with FileLock(self.lock_path):
+            version_before = self.version()
+            self._append_unlocked({"op": "put", "key": key, "value": value})
+            return version_before, self.version()
+
+    def delete(self, key: str) -> None:
+        with FileLock(self.lock_path):
+            self._append_unlocked({"op": "delete", "key": key})
+
+    def save_all(self, documents: Dict[str, Any]) -> None:
+        with FileLock(self.lock_path):
+            current = self._read_unlocked()
+            for key, value in documents.items():
+                if key not in current or current[key] != value:
+                    self._append_unlocked({"op": "put", "key": key, "value": value})
+            for key in current:
+                if key not in documents:
+                    self._append_unlocked({"op": "delete", "key": key})
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot now."""
+        with FileLock(self.lock_path):
+            self._compact_unlocked()
+
+
+# Backend name -> factory taking (collection name, data directory)
+def _create_sqlite_store(collection: str, data_dir: str) -> DocumentStore:
+    from utils.sqlite_store import create_store
+    return create_store(collection, data_dir)
+
+
+def _create_sharded_store(collection: str, data_dir: str) -> DocumentStore:
+    from utils.sharded_store import create_store
+    return create_store(collection, data_dir)
+
+
+STORAGE_BACKENDS = {
+    "json": lambda collection, data_dir: JournaledJSONStore(os.path.join(data_dir, f"{collection}.json")),
+    "sqlite": _create_sqlite_store,
+    "sharded": _create_sharded_store,
+}
+
+_stores: Dict[str, DocumentStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(collection: str) -> DocumentStore:
+    """
+    Get the document store for a collection.
+
+    The backend is chosen by the WERBEAUTY_STORAGE environment variable:
+    "json" (default), "sqlite" or "sharded".
+
+    Args:
+        collection: Collection name: 'users', 'orders' or 'reviews'
+
+    Returns:
+        Shared DocumentStore instance
+    """
+    with _stores_lock:
+        store = _stores.get(collection)
+        if store is None:
+            factory = STORAGE_BACKENDS.get(STORAGE_BACKEND, STORAGE_BACKENDS["json"])
+            store = factory(collection, DATA_DIR)
+            _stores[collection] = store
+        return store
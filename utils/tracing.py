@@ -0,0 +1,215 @@
+"""
+Lightweight tracing for WERBEAUTY.
+Times named spans of a script run with time.perf_counter_ns and
+collects them into a per-rerun trace.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+# Show the timing panel in the sidebar (also enabled per session with ?trace=1
+# when WERBEAUTY_PROFILE_ALLOW_QUERY is set)
+TRACE_PANEL = os.environ.get("WERBEAUTY_TRACE", "") not in ("", "0")
+
+# Append every rerun's trace to this JSON Lines file
+TRACE_LOG = os.environ.get("WERBEAUTY_TRACE_LOG", "")
+
+_local = threading.local()
+
+
+class Trace:
+    """
+    Spans recorded during one script run.
+
+    Each span is stored as (name, start offset ns, duration ns, depth),
+    in the order the spans finished.
+    """
+
+    def __init__(self, page: str = "", session_id: str = ""):
+        """
+        Args:
+            page: Page being rendered
+            session_id: Streamlit session ID
+        """
+        self.page = page
+        self.session_id = session_id
+        self.timestamp = time.time()
+        self.start_ns = time.perf_counter_ns()
+        self.duration_ns = 0
+        self.spans: List[tuple] = []
+        self.depth = 0
+
+    def summary(self) -> List[Dict]:
+        """
+        Aggregate spans by name.
+
+        Returns:
+            One entry per span name with calls, total_ms and max_ms,
+            slowest total first
+        """
+        totals: Dict[str, Dict] = {}
+        for name, _, duration, _ in self.spans:
+            entry = totals.setdefault(name, {"name": name, "calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["calls"] += 1
+            entry["total_ms"] += duration / 1e6
+            entry["max_ms"] = max(entry["max_ms"], duration / 1e6)
+        return sorted(totals.values(), key=lambda entry: -entry["total_ms"])
+
+    def to_record(self) -> Dict:
+        """Convert the trace to a JSON-serializable log record."""
+        return {
+            "timestamp": self.timestamp,
+            "page": self.page,
+            "session_id": self.session_id,
+            "total_ms": self.duration_ns / 1e6,
+            "spans": [
+                {"name": name, "start_ms": start / 1e6, "ms": duration / 1e6, "depth": depth}
+                for name, start, duration, depth in self.spans
+            ],
+        }
+
+
+class span:
+    """
+    Time a block of code as a named span of the current trace.
+
+    Does nothing when no trace is active on this thread.
+
+    Example:
+        with span("render_grid"):
+            render_product_grid(products)
+    """
+
+    __slots__ = ("name", "trace", "start_ns")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.trace = None
+
+    def __enter__(self):
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            self.trace = trace
+            trace.depth += 1
+            self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        trace = self.trace
+        if trace is not None:
+            end_ns = time.perf_counter_ns()
+            trace.depth -= 1
+            trace.spans.append((self.name, self.start_ns - trace.start_ns, end_ns - self.start_ns, trace.depth))
+        return False
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Decorator that records every call of a function as a span.
+
+    Args:
+        name: Span name; defaults to module.function
+
+    Returns:
+        Decorator
+    """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "trace", None) is None:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_trace(page: str = "", session_id: str = "") -> Trace:
+    """
+    Start collecting spans for the current script run on this thread.
+
+    Args:
+        page: Page being rendered
+        session_id: Streamlit session ID
+
+    Returns:
+        The new trace
+    """
+    trace = Trace(page, session_id)
+    _local.trace = trace
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    """Get the trace collecting on this thread, if any."""
+    return getattr(_local, "trace", None)
+
+
+def finish_trace() -> Optional[Trace]:
+    """
+    Stop collecting and log the trace if TRACE_LOG is set.
+
+    Returns:
+        The finished trace, or None if none was active
+    """
+    trace = getattr(_local, "trace", None)
+    _local.trace = None
+    if trace is None:
+        return None
+    trace.duration_ns = time.perf_counter_ns() - trace.start_ns
+    if TRACE_LOG:
+        try:
+            write_trace_log(trace, TRACE_LOG)
+        except OSError as e:
+            print(f"Error writing trace log: {e}")
+    return trace
+
+
+def write_trace_log(trace: Trace, path: str) -> None:
+    """
+    Append a trace to a JSON Lines log.
+
+    Args:
+        trace: Finished trace
+        path: Log file path
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(trace.to_record(), separators=(",", ":")) + "\n")
+
+
+def summarize_trace_log(path: str) -> Dict:
+    """
+    Summarize a JSON Lines trace log.
+
+    Args:
+        path: Log file path
+
+    Returns:
+        Dictionary with reruns, per-page total_ms lists and per-span
+        aggregates (calls, total_ms, max_ms)
+    """
+    pages: Dict[str, List[float]] = {}
+    spans: Dict[str, Dict] = {}
+    reruns = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Torn final write
+            reruns += 1
+            pages.setdefault(record.get("page") or "?", []).append(record.get("total_ms", 0.0))
+            for entry in record.get("spans", []):
+                stats = spans.setdefault(entry["name"], {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+                stats["calls"] += 1
+                stats["total_ms"] += entry["ms"]
+                stats["max_ms"] = max(stats["max_ms"], entry["ms"])
+    return {"reruns": reruns, "pages": pages, "spans": spans}
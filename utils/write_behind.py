@@ -0,0 +1,153 @@
+"""
+Write-behind queue for WERBEAUTY user data.
+Coalesces frequent per-user field updates (cart, favorites) and writes
+them to the user store in batches.
+"""
+
+import atexit
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from utils.storage import DocumentStore, get_store
+
+
+# Seconds between the first queued change and the write that flushes it
+WRITE_BEHIND_INTERVAL = 2.0
+
+# Number of per-user write locks; users whose emails hash alike share one
+USER_LOCK_STRIPES = 64
+
+_user_locks = [threading.Lock() for _ in range(USER_LOCK_STRIPES)]
+
+
+def user_lock(email: str) -> threading.Lock:
+    """
+    Get the lock that serializes writes to one user's record.
+
+    Hold it across a read-modify-write of the record, and around writes
+    of the whole record, so neither overwrites a change made in between.
+
+    Args:
+        email: User email
+
+    Returns:
+        Lock shared by every writer of the user's record in this process
+    """
+    return _user_locks[hash(email) % USER_LOCK_STRIPES]
+
+
+class WriteBehindQueue:
+    """
+    Pending field updates per user, flushed by a background thread.
+
+    Queuing a field replaces any pending value for the same user and
+    field, so any number of clicks within one interval costs a single
+    read-modify-write of the user record (or a single cart write when
+    the store supports put_cart). Flushes are serialized, so a
+    later value is never overwritten by an earlier one, and each
+    read-modify-write holds the user's lock, so a save_user in between
+    is not overwritten either.
+    """
+
+    def __init__(self, store: Optional[DocumentStore] = None, interval: float = WRITE_BEHIND_INTERVAL):
+        """
+        Args:
+            store: Store to write to; defaults to the configured users store
+            interval: Seconds to collect changes before writing them
+        """
+        self.store = store
+        self.interval = interval
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.writes = 0
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, email: str, field: str, value: Any) -> None:
+        """
+        Queue a new value for one field of a user record.
+
+        Args:
+            email: User email
+            field: Top-level field of the user record, e.g. "cart"
+            value: New value; replaces any value still pending for the field
+        """
+        with self._condition:
+            self.pending.setdefault(email, {})[field] = value
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="werbeauty-write-behind", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def has_pending(self, email: Optional[str] = None) -> bool:
+        """Check whether changes are waiting, for one user or any."""
+        with self._condition:
+            return email in self.pending if email is not None else bool(self.pending)
+
+    def flush(self, email: Optional[str] = None) -> int:
+        """
+        Write pending changes now.
+
+        Args:
+            email: Only flush this user's changes; None flushes every user
+
+        Returns:
+            Number of user records written
+        """
+        with self._write_lock:
+            with self._condition:
+                if email is None:
+                    batch, self.pending = self.pending, {}
+                elif email in self.pending:
+                    batch = {email: self.pending.pop(email)}
+                else:
+                    return 0
+
+            store = self.store or get_store("users")
+            # Stores that keep carts apart (SQLite) take cart-only updates without a read
+            put_cart = getattr(store, "put_cart", None)
+            written = 0
+            for user_email, fields in batch.items():
+                try:
+                    if put_cart is not None and fields.keys() == {"cart"}:
+                        written += put_cart(user_email, fields["cart"])
+                        continue
+                    with user_lock(user_email):
+                        user = store.get(user_email)
+                        if user is None:
+                            continue  # Account was deleted
+                        user.update(fields)
+                        store.put(user_email, user)
+                    written += 1
+                except Exception as e:
+                    print(f"Error writing user data for {user_email}: {e}")
+                    with self._condition:
+                        # Retry on the next flush unless newer values were queued meanwhile
+                        retry = self.pending.setdefault(user_email, {})
+                        for field, value in fields.items():
+                            retry.setdefault(field, value)
+            self.writes += written
+            return written
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self.pending:
+                    self._condition.wait()
+            time.sleep(self.interval)
+            self.flush()
+
+
+_queue = WriteBehindQueue()
+atexit.register(_queue.flush)
+
+
+def get_write_behind() -> WriteBehindQueue:
+    """
+    Get the process-wide user write-behind queue.
+
+    Returns:
+        Shared WriteBehindQueue instance
+    """
+    return _queue